@@ -1,7 +1,7 @@
 # admin.py - Enhanced version with trainer assignment functionality
 
 from django.contrib import admin
-from django.contrib.admin import SimpleListFilter
+from django.contrib.admin import RelatedFieldListFilter, SimpleListFilter
 from django.core.mail import send_mail
 from django.utils.html import format_html
 from django.urls import reverse, path
@@ -9,12 +9,19 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.http import JsonResponse
 from django.utils import timezone
+from django.db.models import Case, CharField, DurationField, ExpressionWrapper, F, Value, When
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
 from .models import (
     Trainer, Customer, SubscriptionPlan, CustomerSubscription, Payment, 
     TrainerAssignment, WorkoutProgress, Goal, Resource, Notification, 
-    TrainerMessage, Profile, User
+    TrainerMessage, Profile, User, Session, TrainerRegistration, ResourceCategory
 )
 from .forms import TrainerAssignmentForm
+from .export_views import EXPORTS, stream_csv
+from .cache_versions import touch_dashboards
+from . import approvals, client_search
+from .entitlements import feature_filter, has_feature
+from .search import ADMIN_SEARCH_LIMIT, get_backend, query_terms
 
 
 class SubscriptionFilter(SimpleListFilter):
@@ -38,17 +45,74 @@ class SubscriptionFilter(SimpleListFilter):
             return queryset.filter(subscription__isnull=True)
         elif self.value() == 'personal_training':
             return queryset.filter(
-                subscription__is_active=True,
-                subscription__plan__trainer_support=True
+                feature_filter('trainer_support')
             )
 
 
+class ProfileUserFieldListFilter(RelatedFieldListFilter):
+    """Filter on a Customer/Trainer relation, labelled from one query.
+
+    The stock filter calls __str__ on every choice, and Customer/Trainer
+    __str__ reads profile.user: two queries per customer or trainer.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        queryset = field.related_model._default_manager.select_related('profile__user')
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return [(obj.pk, str(obj)) for obj in queryset]
+
+
+def with_customer_admin_columns(queryset):
+    """Customers with everything the changelist shows, in a single query.
+
+    Adds subscription_state ('active', 'inactive' or 'none'),
+    subscription_days_left (a timedelta, None without an end date) and
+    trainer_name (None unless the trainer assignment is active).
+    """
+    trainer_user = 'trainer_assignment__trainer__profile__user__'
+    full_name = Trim(Concat(F(f'{trainer_user}first_name'), Value(' '), F(f'{trainer_user}last_name')))
+    return queryset.select_related(
+        'profile__user', 'subscription__plan', 'trainer_assignment__trainer__profile__user'
+    ).annotate(
+        subscription_state=Case(
+            When(subscription__isnull=True, then=Value('none')),
+            When(subscription__is_active=True, then=Value('active')),
+            default=Value('inactive'),
+            output_field=CharField(),
+        ),
+        subscription_days_left=ExpressionWrapper(
+            F('subscription__end_date') - Value(timezone.now()), output_field=DurationField()
+        ),
+        trainer_name=Case(
+            When(
+                trainer_assignment__is_active=True,
+                then=Coalesce(NullIf(full_name, Value('')), F(f'{trainer_user}username')),
+            ),
+            default=None,
+            output_field=CharField(),
+        ),
+    )
+
+
+def report_batch_results(model_admin, request, results, summary):
+    """Show the per-row outcome of a batched approval/rejection"""
+    done = [r for r in results if r['status'] in ('approved', 'rejected')]
+    model_admin.message_user(request, summary.format(count=len(done)), messages.SUCCESS)
+    for result in results:
+        if result['status'] == 'skipped':
+            model_admin.message_user(request, f"{result['label']}: skipped ({result['detail']})", messages.INFO)
+        elif result['status'] == 'failed':
+            model_admin.message_user(request, f"{result['label']}: failed ({result['detail']})", messages.ERROR)
+
+
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
     list_display = ('get_full_name', 'get_email', 'get_subscription_status', 
                    'get_trainer_status', 'trainer_assignment_actions')
     list_filter = (SubscriptionFilter, 'profile__role', 'trainer_assignment__is_active',
-                   'trainer_assignment__trainer')  # Add trainer filter
+                   ('trainer_assignment__trainer', ProfileUserFieldListFilter))  # Add trainer filter
     search_fields = ('profile__user__first_name', 'profile__user__last_name', 
                     'profile__user__email', 'profile__user__username')
     actions = ['assign_trainers_bulk', 'remove_trainer_assignments']
@@ -56,7 +120,13 @@ class CustomerAdmin(admin.ModelAdmin):
     # Add this to allow the lookup fields
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.select_related('profile__user', 'trainer_assignment__trainer__profile__user')
+        return with_customer_admin_columns(qs)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Prefix search over the indexed name/email terms instead of four LIKE '%q%' scans"""
+        if not client_search.query_words(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        return client_search.filter_customers(queryset, search_term), False
     
     # Override changelist_view to handle custom filtering
     def changelist_view(self, request, extra_context=None):
@@ -143,7 +213,7 @@ class CustomerAdmin(admin.ModelAdmin):
         clients = Customer.objects.filter(
             trainer_assignment__trainer=trainer,
             trainer_assignment__is_active=True
-        ).select_related('profile__user', 'subscription__plan')
+        ).select_related('profile__user', 'subscription__plan', 'trainer_assignment')
         
         context = {
             'title': f'Clients assigned to {trainer.profile.user.get_full_name()}',
@@ -164,101 +234,64 @@ class CustomerAdmin(admin.ModelAdmin):
     get_email.short_description = 'Email'
 
     def get_subscription_status(self, obj):
-        try:
-            if hasattr(obj, 'subscription') and obj.subscription.is_active:
-                plan = obj.subscription.plan
-                color = 'green' if obj.subscription.days_remaining > 7 else 'orange'
-                return format_html(
-                    '<span style="color: {};">{} ({} days left)</span>',
-                    color,
-                    plan.name,
-                    obj.subscription.days_remaining
-                )
-            else:
-                return format_html('<span style="color: red;">No Active Subscription</span>')
-        except:
-            return format_html('<span style="color: red;">No Subscription</span>')
+        if obj.subscription_state != 'active':
+            label = 'No Subscription' if obj.subscription_state == 'none' else 'No Active Subscription'
+            return format_html('<span style="color: red;">{}</span>', label)
+
+        days_left = obj.subscription_days_left
+        if days_left is None:
+            return format_html('<span style="color: green;">{} (no end date)</span>', obj.subscription.plan.name)
+        days_left = max(0, days_left.days)
+        color = 'green' if days_left > 7 else 'orange'
+        return format_html(
+            '<span style="color: {};">{} ({} days left)</span>',
+            color,
+            obj.subscription.plan.name,
+            days_left
+        )
     get_subscription_status.short_description = 'Subscription'
+    get_subscription_status.admin_order_field = 'subscription_days_left'
 
     def get_trainer_status(self, obj):
-        try:
-            assignment = TrainerAssignment.objects.select_related(
-                'trainer__profile__user'
-            ).get(customer=obj, is_active=True)
-            
-            # Get trainer name safely
-            trainer_name = (
-                assignment.trainer.profile.user.get_full_name() or 
-                assignment.trainer.profile.user.username or 
-                f"User {assignment.trainer.profile.user.id}"
-            )
-            
-            return format_html(
-                '<span style="color: green;">Assigned to {}</span>',
-                trainer_name
-            )
-            
-        except TrainerAssignment.DoesNotExist:
+        if not obj.trainer_name:
             return format_html('<span style="color: red;">No Trainer Assigned</span>')
-        except Exception as e:
-            print(f"Error getting trainer status for customer {obj.id}: {e}")
-            return format_html('<span style="color: red;">Error Loading Trainer</span>')
+        return format_html(
+            '<span style="color: green;">Assigned to {}</span>',
+            obj.trainer_name
+        )
+    get_trainer_status.short_description = 'Trainer Status'
+    get_trainer_status.admin_order_field = 'trainer_name'
 
     def trainer_assignment_actions(self, obj):
-        actions = []
-        
-        # Check if customer has personal training subscription
-        has_personal_training = False
-        try:
-            if (hasattr(obj, 'subscription') and obj.subscription.is_active 
-                and obj.subscription.plan.trainer_support):
-                has_personal_training = True
-        except:
-            pass
+        # Everything below comes from get_queryset's select_related/annotations
+        has_personal_training = (
+            obj.subscription_state == 'active' and obj.subscription.plan.trainer_support
+        )
+        if not has_personal_training:
+            return format_html('<span style="color: #666;">No Personal Training Plan</span>')
 
-        if has_personal_training:
-            try:
-                # Get assignment with proper select_related
-                assignment = TrainerAssignment.objects.select_related(
-                    'trainer__profile__user'
-                ).get(customer=obj, is_active=True)
-                
-                # Get trainer name safely
-                trainer_name = (
-                    assignment.trainer.profile.user.get_full_name() or 
-                    assignment.trainer.profile.user.username or 
-                    f"User {assignment.trainer.profile.user.id}"
-                )
-                
-                # Show trainer info and management options
-                trainer_change_url = reverse('admin:assign_trainer', args=[obj.id])
-                message_url = reverse('admin:send_admin_message', 
-                                    args=[obj.id, assignment.trainer.id])
-                actions.append(f'''
-                    <div style="margin-bottom: 5px;">
-                        <strong>Trainer:</strong> {trainer_name}
-                    </div>
-                    <a href="{trainer_change_url}" class="button" style="margin-right: 5px;">
-                        Change Trainer
-                    </a>
-                    <a href="{message_url}" class="button" style="margin-right: 5px;">
-                        Send Message
-                    </a>
-                ''')
-                
-            except TrainerAssignment.DoesNotExist:
-                # No active assignment found
-                assign_url = reverse('admin:assign_trainer', args=[obj.id])
-                actions.append(f'<a href="{assign_url}" class="button">Assign Trainer</a>')
-            except Exception as e:
-                # Any other error
-                print(f"Error getting trainer assignment for customer {obj.id}: {e}")
-                assign_url = reverse('admin:assign_trainer', args=[obj.id])
-                actions.append(f'<a href="{assign_url}" class="button">Assign Trainer</a>')
-        else:
-            actions.append('<span style="color: #666;">No Personal Training Plan</span>')
+        assign_url = reverse('admin:assign_trainer', args=[obj.id])
+        if not obj.trainer_name:
+            return format_html('<a href="{}" class="button">Assign Trainer</a>', assign_url)
 
-        return format_html(''.join(actions))
+        message_url = reverse('admin:send_admin_message', args=[obj.id, obj.trainer_assignment.trainer_id])
+        return format_html(
+            '''
+            <div style="margin-bottom: 5px;">
+                <strong>Trainer:</strong> {}
+            </div>
+            <a href="{}" class="button" style="margin-right: 5px;">
+                Change Trainer
+            </a>
+            <a href="{}" class="button" style="margin-right: 5px;">
+                Send Message
+            </a>
+            ''',
+            obj.trainer_name,
+            assign_url,
+            message_url
+        )
+    trainer_assignment_actions.short_description = 'Trainer Actions'
 
     # Keep all your other existing methods (assign_trainer_view, etc.)
     # ... (rest of the methods remain the same)
@@ -268,8 +301,7 @@ class CustomerAdmin(admin.ModelAdmin):
         customer = get_object_or_404(Customer, id=customer_id)
         
         # Check if customer has personal training subscription
-        if not (hasattr(customer, 'subscription') and customer.subscription.is_active 
-                and customer.subscription.plan.trainer_support):
+        if not has_feature(customer, 'trainer_support'):
             messages.error(request, 'Customer does not have an active personal training subscription.')
             return redirect('admin:accounts_customer_changelist')
 
@@ -336,16 +368,13 @@ class CustomerAdmin(admin.ModelAdmin):
             return redirect('admin:accounts_customer_changelist')
 
         # GET request - show the form
-        # Get all trainers and add their statistics
-        all_trainers = Trainer.objects.filter(is_verified=True).select_related('profile__user')
-        available_trainers = []
+        # Trainers with their client counts, least busy first, in one query
+        available_trainers = list(
+            Trainer.objects.filter(is_verified=True).with_client_counts().order_by('active_clients', 'id')
+        )
         
-        for trainer in all_trainers:
-            # Calculate active client count
-            active_clients_count = trainer.assigned_customers.filter(is_active=True).count()
-            
-            # Add attributes to trainer object - Make sure we have the name
-            trainer.active_clients_count = active_clients_count
+        for trainer in available_trainers:
+            trainer.active_clients_count = trainer.active_clients
             trainer.display_name = trainer.profile.user.get_full_name() or trainer.profile.user.username
             trainer.display_email = trainer.profile.user.email
             
@@ -354,20 +383,15 @@ class CustomerAdmin(admin.ModelAdmin):
                 trainer.display_name = f"User {trainer.profile.user.id}"
             
             # Calculate availability
-            if active_clients_count < 5:
+            if trainer.active_clients < 5:
                 trainer.availability_text = "High"
                 trainer.availability_class = "high"
-            elif active_clients_count < 10:
+            elif trainer.active_clients < 10:
                 trainer.availability_text = "Medium" 
                 trainer.availability_class = "medium"
             else:
                 trainer.availability_text = "Low"
                 trainer.availability_class = "low"
-            
-            available_trainers.append(trainer)
-        
-        # Sort by active clients count (least busy first)
-        available_trainers.sort(key=lambda t: t.active_clients_count)
         
         # Get current assignment for pre-filling form
         current_assignment = None
@@ -395,14 +419,6 @@ class CustomerAdmin(admin.ModelAdmin):
         except TrainerAssignment.DoesNotExist:
             pass
         
-        # Debug: Print trainer and assignment information
-        print(f"Found {len(available_trainers)} trainers:")
-        for trainer in available_trainers:
-            print(f"- ID: {trainer.id}, Name: '{trainer.display_name}', Clients: {trainer.active_clients_count}")
-        
-        if current_assignment:
-            print(f"Current assignment - Trainer: '{current_trainer_name}', ID: {selected_trainer_id}")
-        
         context = {
             'title': f'Assign Trainer to {customer.profile.user.get_full_name()}',
             'customer': customer,
@@ -421,8 +437,7 @@ class CustomerAdmin(admin.ModelAdmin):
         """Dashboard view for trainer assignments"""
         # Get statistics
         total_customers = Customer.objects.filter(
-            subscription__is_active=True,
-            subscription__plan__trainer_support=True
+            feature_filter('trainer_support')
         ).count()
         
         assigned_customers = TrainerAssignment.objects.filter(is_active=True).count()
@@ -443,8 +458,8 @@ class CustomerAdmin(admin.ModelAdmin):
 
         # Get trainer workload
         trainer_workload = []
-        for trainer in Trainer.objects.filter(is_verified=True).select_related('profile__user'):
-            active_assignments = trainer.assigned_customers.filter(is_active=True).count()
+        for trainer in Trainer.objects.filter(is_verified=True).with_client_counts():
+            active_assignments = trainer.active_clients
             trainer_workload.append({
                 'trainer': trainer,
                 'active_clients': active_assignments,
@@ -518,8 +533,7 @@ class CustomerAdmin(admin.ModelAdmin):
     def assign_trainers_bulk(self, request, queryset):
         """Bulk assign trainers to selected customers"""
         personal_training_customers = queryset.filter(
-            subscription__is_active=True,
-            subscription__plan__trainer_support=True
+            feature_filter('trainer_support')
         )
         
         if not personal_training_customers.exists():
@@ -609,18 +623,20 @@ class TrainerAdmin(admin.ModelAdmin):
         return obj.profile.user.email
     get_email.short_description = 'Email'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_client_counts()
+
     def get_client_count(self, obj):
-        active_count = obj.assigned_customers.filter(is_active=True).count()
-        total_count = obj.assigned_customers.count()
-        return f"{active_count} active / {total_count} total"
+        return f"{obj.active_clients} active / {obj.total_clients} total"
     get_client_count.short_description = 'Assigned Clients'
+    get_client_count.admin_order_field = 'active_clients'
 
     def trainer_actions(self, obj):
         actions = []
         
         if obj.is_verified:
             # View assigned clients
-            client_count = obj.assigned_customers.filter(is_active=True).count()
+            client_count = obj.active_clients
             actions.append(f'''
                 <div style="margin-bottom: 5px;">
                     <strong>Status:</strong> <span style="color: green;">Verified</span>
@@ -647,45 +663,35 @@ class TrainerAdmin(admin.ModelAdmin):
     trainer_actions.allow_tags = True
 
     def approve_trainers(self, request, queryset):
-        approved_count = 0
-        for trainer in queryset:
-            if not trainer.is_verified:
-                trainer.is_verified = True
-                trainer.profile.user.is_staff = True
-                trainer.profile.user.save()
-                trainer.save()
-                
-                send_mail(
-                    subject="Trainer Account Approved",
-                    message="Congratulations! Your trainer account has been approved. You can now log in and start working with clients.",
-                    from_email="noreply@fitnesshub.com",
-                    recipient_list=[trainer.profile.user.email],
-                    fail_silently=True,
-                )
-                approved_count += 1
-        
-        messages.success(request, f"Approved {approved_count} trainers and sent notification emails.")
+        results = approvals.approve_trainers(queryset)
+        report_batch_results(self, request, results, "Approved {count} trainers; notification emails queued.")
     approve_trainers.short_description = "Approve selected trainers"
 
     def reject_trainers(self, request, queryset):
-        rejected_count = 0
-        for trainer in queryset:
-            email = trainer.profile.user.email
-            trainer.profile.user.delete()
-            
-            send_mail(
-                subject="Trainer Application Rejected",
-                message="We regret to inform you that your trainer application has been rejected. Please contact support for more information.",
-                from_email="noreply@fitnesshub.com",
-                recipient_list=[email],
-                fail_silently=True,
-            )
-            rejected_count += 1
-        
-        messages.success(request, f"Rejected {rejected_count} trainer applications and sent notifications.")
+        results = approvals.reject_trainers(queryset)
+        report_batch_results(self, request, results, "Rejected {count} trainer applications; notification emails queued.")
     reject_trainers.short_description = "Reject selected trainers"
 
 
+@admin.register(TrainerRegistration)
+class TrainerRegistrationAdmin(admin.ModelAdmin):
+    list_display = ('email', 'username', 'phone', 'status', 'created_at', 'approval_date')
+    list_filter = ('status', 'created_at')
+    search_fields = ('email', 'username', 'phone')
+    readonly_fields = ('password', 'approved_by', 'approval_date', 'user_account', 'created_at', 'updated_at')
+    actions = ['approve_selected', 'reject_selected']
+
+    def approve_selected(self, request, queryset):
+        results = approvals.approve_registrations(queryset, request.user)
+        report_batch_results(self, request, results, "Approved {count} registrations; notification emails queued.")
+    approve_selected.short_description = "Approve selected registrations"
+
+    def reject_selected(self, request, queryset):
+        results = approvals.reject_registrations(queryset, request.user)
+        report_batch_results(self, request, results, "Rejected {count} registrations; notification emails queued.")
+    reject_selected.short_description = "Reject selected registrations"
+
+
 @admin.register(TrainerAssignment)
 class TrainerAssignmentAdmin(admin.ModelAdmin):
     list_display = ('get_customer', 'get_trainer', 'assigned_date', 'is_active', 'assignment_actions')
@@ -693,6 +699,7 @@ class TrainerAssignmentAdmin(admin.ModelAdmin):
     search_fields = ('customer__profile__user__first_name', 'customer__profile__user__last_name',
                     'trainer__profile__user__first_name', 'trainer__profile__user__last_name')
     date_hierarchy = 'assigned_date'
+    list_select_related = ('customer__profile__user', 'trainer__profile__user')
 
     def get_customer(self, obj):
         return obj.customer.profile.user.get_full_name()
@@ -759,20 +766,43 @@ class CustomerSubscriptionAdmin(admin.ModelAdmin):
     get_days_remaining.admin_order_field = 'end_date'
 
 # Keep other existing admin registrations as they were
+def make_csv_export_action(kind):
+    """Admin action that streams the selected rows as CSV"""
+    def export_as_csv(modeladmin, request, queryset):
+        export = EXPORTS[kind]
+        queryset = export['queryset']().filter(pk__in=queryset.values('pk')).order_by('pk')
+        return stream_csv(queryset, export['columns'], f"{kind}_{timezone.now().strftime('%Y%m%d%H%M%S')}")
+    export_as_csv.short_description = "Export selected as CSV"
+    return export_as_csv
+
+
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ('customer', 'amount', 'payment_method', 'status', 'payment_date')
     list_filter = ('status', 'payment_method', 'payment_date')
     search_fields = ('customer__profile__user__username', 'transaction_id')
     readonly_fields = ('transaction_id',)
+    actions = [make_csv_export_action('payments')]
 
 
 @admin.register(WorkoutProgress)
 class WorkoutProgressAdmin(admin.ModelAdmin):
     list_display = ('customer', 'date', 'weight', 'bmi', 'sessions_attended')
-    list_filter = ('date', 'customer')
+    list_filter = ('date', ('customer', ProfileUserFieldListFilter))
     search_fields = ('customer__profile__user__username',)
     date_hierarchy = 'date'
+    list_select_related = ('customer__profile__user',)
+    actions = [make_csv_export_action('progress')]
+
+
+@admin.register(Session)
+class SessionAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'trainer', 'session_date', 'session_time', 'session_type', 'status')
+    list_filter = ('status', 'session_type', 'session_date')
+    search_fields = ('customer__profile__user__username', 'trainer__profile__user__username')
+    date_hierarchy = 'session_date'
+    list_select_related = ('customer__profile__user', 'trainer__profile__user')
+    actions = [make_csv_export_action('sessions')]
 
 
 @admin.register(Goal)
@@ -792,24 +822,52 @@ class ResourceAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description')
     actions = ['share_with_customers']
 
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index instead of icontains on every row"""
+        terms = query_terms(search_term)
+        if not terms:
+            return super().get_search_results(request, queryset, search_term)
+        ids = get_backend().search(terms, {}, 0, ADMIN_SEARCH_LIMIT)
+        return queryset.filter(pk__in=ids), False
+
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
             path('share-resource/<int:resource_id>/', 
                  self.admin_site.admin_view(self.share_resource_view), 
                  name='share_resource'),
+            path('upload/',
+                 self.admin_site.admin_view(self.upload_file_view),
+                 name='upload_resource_file'),
+            path('upload/<int:resource_id>/',
+                 self.admin_site.admin_view(self.upload_file_view),
+                 name='upload_resource_file'),
         ]
         return custom_urls + urls
 
     def resource_actions(self, obj):
         """Actions for sharing resources"""
         share_url = reverse('admin:share_resource', args=[obj.id])
+        upload_url = reverse('admin:upload_resource_file', args=[obj.id])
         return format_html(
-            '<a href="{}" class="button">Share with Customers</a>',
-            share_url
+            '<a href="{}" class="button">Share with Customers</a> '
+            '<a href="{}" class="button">Upload File</a>',
+            share_url, upload_url
         )
     resource_actions.short_description = 'Actions'
 
+    def upload_file_view(self, request, resource_id=None):
+        """Chunked upload page for large files (see accounts.uploads)"""
+        resource = get_object_or_404(Resource, id=resource_id) if resource_id else None
+        context = {
+            'title': f'Upload file for {resource.title}' if resource else 'Upload new resource',
+            'resource': resource,
+            'categories': ResourceCategory.objects.order_by('name'),
+            'resource_types': Resource.RESOURCE_TYPE,
+            'opts': self.model._meta,
+        }
+        return render(request, 'admin/resource_upload.html', context)
+
     def share_resource_view(self, request, resource_id):
         """View for sharing resources with customers"""
         from .forms import ResourceSharingForm
@@ -823,9 +881,8 @@ class ResourceAdmin(admin.ModelAdmin):
             
             if customer_ids:
                 customers = Customer.objects.filter(
-                    id__in=customer_ids,
-                    subscription__is_active=True,
-                    subscription__plan__trainer_support=True
+                    feature_filter('trainer_support'),
+                    id__in=customer_ids
                 )
                 
                 shared_count = 0
@@ -857,8 +914,7 @@ class ResourceAdmin(admin.ModelAdmin):
         # GET request - show form
         # Get customers with personal training subscriptions
         customers = Customer.objects.filter(
-            subscription__is_active=True,
-            subscription__plan__trainer_support=True
+            feature_filter('trainer_support')
         ).select_related('profile__user', 'trainer_assignment__trainer__profile__user')
         
         context = {
@@ -916,11 +972,13 @@ class NotificationAdmin(admin.ModelAdmin):
     
     def mark_as_read(self, request, queryset):
         queryset.update(is_read=True)
+        touch_dashboards(customer_ids=queryset.values_list('customer_id', flat=True))
         self.message_user(request, f"{queryset.count()} notifications marked as read.")
     mark_as_read.short_description = "Mark selected notifications as read"
     
     def mark_as_unread(self, request, queryset):
         queryset.update(is_read=False)
+        touch_dashboards(customer_ids=queryset.values_list('customer_id', flat=True))
         self.message_user(request, f"{queryset.count()} notifications marked as unread.")
     mark_as_unread.short_description = "Mark selected notifications as unread"
 
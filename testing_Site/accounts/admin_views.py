@@ -8,7 +8,6 @@ from django.views import View
 from django.utils.decorators import method_decorator
 from django.core.mail import send_mail
 from django.utils import timezone
-from django.db.models import Count, Q, Avg
 from django.core.paginator import Paginator
 
 from .models import (
@@ -16,6 +15,7 @@ from .models import (
     Notification, SubscriptionPlan, CustomerSubscription
 )
 from .forms import TrainerAssignmentForm, AdminMessageForm, ResourceSharingForm
+from .entitlements import feature_filter, has_feature
 
 
 @method_decorator(staff_member_required, name='dispatch')
@@ -42,8 +42,7 @@ class AdminDashboardView(View):
     def get_dashboard_stats(self):
         """Calculate dashboard statistics"""
         personal_training_customers = Customer.objects.filter(
-            subscription__is_active=True,
-            subscription__plan__trainer_support=True
+            feature_filter('trainer_support')
         )
         
         assigned_customers = TrainerAssignment.objects.filter(is_active=True).count()
@@ -77,9 +76,7 @@ class AdminDashboardView(View):
     
     def get_trainer_workload(self):
         """Get trainer workload information"""
-        trainers = Trainer.objects.filter(is_verified=True).annotate(
-            active_clients=Count('assigned_customers', filter=Q(assigned_customers__is_active=True))
-        ).select_related('profile__user').order_by('-active_clients')
+        trainers = Trainer.objects.filter(is_verified=True).with_client_counts().order_by('-active_clients')
         
         workload_data = []
         for trainer in trainers:
@@ -101,8 +98,7 @@ class AdminDashboardView(View):
     def get_unassigned_customers(self, limit=5):
         """Get customers who need trainer assignment"""
         return Customer.objects.filter(
-            subscription__is_active=True,
-            subscription__plan__trainer_support=True
+            feature_filter('trainer_support')
         ).exclude(
             trainer_assignment__is_active=True
         ).select_related('profile__user', 'subscription__plan')[:limit]
@@ -194,18 +190,11 @@ class AdminTrainerAssignmentView(View):
     
     def has_personal_training_subscription(self, customer):
         """Check if customer has active personal training subscription"""
-        try:
-            return (hasattr(customer, 'subscription') and 
-                   customer.subscription.is_active and 
-                   customer.subscription.plan.trainer_support)
-        except:
-            return False
+        return has_feature(customer, 'trainer_support')
     
     def get_available_trainers(self):
         """Get list of available trainers with their workload"""
-        return Trainer.objects.filter(is_verified=True).annotate(
-            active_clients=Count('assigned_customers', filter=Q(assigned_customers__is_active=True))
-        ).select_related('profile__user').order_by('active_clients')
+        return Trainer.objects.filter(is_verified=True).with_client_counts().order_by('active_clients')
     
     def send_assignment_notifications(self, customer, trainer):
         """Send notifications about the assignment"""
@@ -465,9 +454,8 @@ def bulk_assign_trainers_view(request):
         notes = request.POST.get('notes', '')
         
         customers = Customer.objects.filter(
-            id__in=customer_ids,
-            subscription__is_active=True,
-            subscription__plan__trainer_support=True
+            feature_filter('trainer_support'),
+            id__in=customer_ids
         )
         
         if assignment_method == 'auto':
@@ -486,8 +474,7 @@ def bulk_assign_trainers_view(request):
     
     # GET request - show form
     customers = Customer.objects.filter(
-        subscription__is_active=True,
-        subscription__plan__trainer_support=True
+        feature_filter('trainer_support')
     ).exclude(trainer_assignment__is_active=True)
     
     trainers = Trainer.objects.filter(is_verified=True)
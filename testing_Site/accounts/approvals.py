@@ -0,0 +1,139 @@
+# approvals.py - Batched approval and rejection of trainer registrations
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import membership
+from .cache_versions import touch_dashboards
+from .mail_queue import queue_mass_mail
+from .models import Trainer, TrainerRegistration
+
+FROM_EMAIL = "noreply@fitnesshub.com"
+
+APPROVED_SUBJECT = "Trainer Account Approved"
+APPROVED_MESSAGE = (
+    "Congratulations! Your trainer account has been approved. "
+    "You can now log in and start working with clients."
+)
+REJECTED_SUBJECT = "Trainer Application Rejected"
+REJECTED_MESSAGE = (
+    "We regret to inform you that your trainer application has been rejected. "
+    "Please contact support for more information."
+)
+
+
+def _result(label, status, detail=''):
+    return {'label': label, 'status': status, 'detail': detail}
+
+
+def _split_name(username):
+    parts = username.split() if username else []
+    return (parts[0] if parts else ""), " ".join(parts[1:])
+
+
+def approve_registrations(registrations, admin_user):
+    """Approve pending registrations in one transaction.
+
+    Users are created with a single bulk_create using the password hash stored
+    at registration time, registrations are updated with one bulk_update, and
+    the approval emails are queued for after commit. Returns one result dict
+    (label, status, detail) per registration.
+    """
+    results = []
+    now = timezone.now()
+    with transaction.atomic():
+        registrations = list(registrations.select_for_update())
+        taken = set(User.objects.filter(
+            username__in=[r.email for r in registrations]
+        ).values_list('username', flat=True))
+
+        to_approve = []
+        for registration in registrations:
+            if registration.status == 'approved':
+                results.append(_result(registration.email, 'skipped', 'already approved'))
+            elif registration.email in taken:
+                results.append(_result(registration.email, 'failed', 'a user with this email already exists'))
+            else:
+                to_approve.append(registration)
+
+        users = User.objects.bulk_create([
+            User(
+                username=registration.email,
+                email=registration.email,
+                password=registration.password,
+                first_name=_split_name(registration.username)[0],
+                last_name=_split_name(registration.username)[1],
+            )
+            for registration in to_approve
+        ])
+
+        for registration, user in zip(to_approve, users):
+            registration.status = 'approved'
+            registration.approved_by = admin_user
+            registration.approval_date = now
+            registration.user_account = user
+            registration.updated_at = now
+            results.append(_result(registration.email, 'approved'))
+        TrainerRegistration.objects.bulk_update(
+            to_approve, ['status', 'approved_by', 'approval_date', 'user_account', 'updated_at']
+        )
+        if users:
+            # bulk_create skips post_save; the new usernames must reach the filter
+            membership.invalidate()
+
+        queue_mass_mail(
+            (APPROVED_SUBJECT, APPROVED_MESSAGE, FROM_EMAIL, [registration.email])
+            for registration in to_approve
+        )
+    return results
+
+
+def reject_registrations(registrations, admin_user, reason=""):
+    """Reject registrations with a single UPDATE and queue the emails"""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(registrations.select_for_update().values_list('email', 'status'))
+        emails = [email for email, status in rows if status != 'approved']
+        TrainerRegistration.objects.filter(email__in=emails).update(
+            status='rejected', approved_by=admin_user, approval_date=now,
+            rejection_reason=reason, updated_at=now,
+        )
+        queue_mass_mail((REJECTED_SUBJECT, REJECTED_MESSAGE, FROM_EMAIL, [email]) for email in emails)
+
+    return [
+        _result(email, 'skipped', 'already approved') if status == 'approved' else _result(email, 'rejected')
+        for email, status in rows
+    ]
+
+
+def approve_trainers(trainers):
+    """Verify trainers with one UPDATE per table and queue the emails"""
+    with transaction.atomic():
+        rows = list(trainers.select_for_update().values_list(
+            'pk', 'is_verified', 'profile__user_id', 'profile__user__email', 'profile__user__username',
+        ))
+        pending = [row for row in rows if not row[1]]
+        pending_ids = [row[0] for row in pending]
+
+        Trainer.objects.filter(pk__in=pending_ids).update(is_verified=True, updated_at=timezone.now())
+        User.objects.filter(pk__in=[row[2] for row in pending]).update(is_staff=True)
+        # QuerySet.update() bypasses the signals that bump dashboard versions
+        touch_dashboards(trainer_ids=pending_ids)
+
+        queue_mass_mail((APPROVED_SUBJECT, APPROVED_MESSAGE, FROM_EMAIL, [row[3]]) for row in pending)
+
+    return [
+        _result(username, 'skipped', 'already verified') if verified else _result(username, 'approved')
+        for _, verified, _, _, username in rows
+    ]
+
+
+def reject_trainers(trainers):
+    """Delete the trainers' user accounts in one cascade and queue the emails"""
+    with transaction.atomic():
+        rows = list(trainers.values_list('profile__user_id', 'profile__user__email', 'profile__user__username'))
+        User.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        queue_mass_mail((REJECTED_SUBJECT, REJECTED_MESSAGE, FROM_EMAIL, [row[1]]) for row in rows)
+
+    return [_result(username, 'rejected') for _, _, username in rows]
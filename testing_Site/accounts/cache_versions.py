@@ -0,0 +1,65 @@
+# cache_versions.py - Per-object version stamps used to key and invalidate caches
+
+import time
+
+from django.core.cache import cache
+from django.db.models import Q
+
+VERSION_TIMEOUT = 60 * 60 * 24 * 30  # 30 days
+
+
+def _version_key(namespace, key):
+    return f"version:{namespace}:{key}"
+
+
+def get_version(namespace, key):
+    """Return the current version stamp (a float timestamp) for namespace/key.
+
+    A stamp is created on first access so callers always get a stable value
+    until the next bump_version().
+    """
+    cache_key = _version_key(namespace, key)
+    version = cache.get(cache_key)
+    if version is None:
+        version = time.time()
+        # add() keeps the first writer's stamp if two requests race here
+        if not cache.add(cache_key, version, VERSION_TIMEOUT):
+            version = cache.get(cache_key, version)
+    return version
+
+
+def bump_version(namespace, *keys):
+    """Invalidate everything cached under the given keys"""
+    now = time.time()
+    cache.set_many({_version_key(namespace, key): now for key in keys if key is not None}, VERSION_TIMEOUT)
+
+
+def dashboard_user_ids(trainer_ids=(), customer_ids=()):
+    """User ids whose dashboard pages show data of the given trainers/customers.
+
+    A customer's data also appears on the pages of their assigned trainer.
+    """
+    from .models import Profile
+
+    trainer_ids, customer_ids = list(trainer_ids), list(customer_ids)
+    return Profile.objects.filter(
+        Q(trainer__id__in=trainer_ids)
+        | Q(customer__id__in=customer_ids)
+        | Q(trainer__assigned_customers__customer_id__in=customer_ids)
+    ).values_list('user_id', flat=True).distinct()
+
+
+def touch_dashboards(trainer_ids=(), customer_ids=()):
+    """Bump the page version (used for dashboard ETags) of everyone affected"""
+    bump_version('user', *dashboard_user_ids(trainer_ids, customer_ids))
+
+
+def touch_session_calendars(trainer_ids=(), customer_ids=()):
+    """Bump the calendar and page versions for the given trainers/customers.
+
+    Used by the Session signal handlers and by set-based updates (bulk_create,
+    QuerySet.update) that bypass signals.
+    """
+    user_ids = list(dashboard_user_ids(trainer_ids, customer_ids))
+    bump_version('calendar', *user_ids)
+    bump_version('user', *user_ids)
@@ -0,0 +1,193 @@
+# calendar_views.py - Tokenized iCalendar (ICS) feeds for trainer and customer schedules
+
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse, HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_GET
+
+from .cache_versions import get_version
+from .models import Session
+
+FEED_SALT = 'accounts.calendar_feed'
+FEED_CACHE_TIMEOUT = 60 * 60  # 1 hour
+FEED_CACHE_MAX_BYTES = 512 * 1024  # larger feeds are always streamed
+FEED_CHUNK_SIZE = 500
+
+
+def get_calendar_token(user):
+    """Signed, URL-safe token identifying the feed owner"""
+    return signing.Signer(salt=FEED_SALT).sign(str(user.pk)).replace(':', '.')
+
+
+def get_calendar_feed_url(request, user):
+    """Absolute feed URL for calendar clients to subscribe to"""
+    path = reverse('calendar_feed', args=[get_calendar_token(user)])
+    return request.build_absolute_uri(path)
+
+
+def _user_id_from_token(token):
+    try:
+        return int(signing.Signer(salt=FEED_SALT).unsign(token.replace('.', ':')))
+    except (signing.BadSignature, ValueError):
+        raise Http404("Calendar feed not found")
+
+
+def _shared_cache():
+    # The version stamps live in the cache; a per-process cache would keep
+    # answering 304 or the old body in workers that missed the bump
+    return getattr(settings, 'SHARED_CACHE', False)
+
+
+def _feed_etag(request, token):
+    if not _shared_cache():
+        return None
+    user_id = _user_id_from_token(token)
+    version = get_version('calendar', user_id)
+    return hashlib.md5(f"{user_id}:{version}".encode()).hexdigest()
+
+
+def _feed_last_modified(request, token):
+    if not _shared_cache():
+        return None
+    user_id = _user_id_from_token(token)
+    return datetime.fromtimestamp(get_version('calendar', user_id), tz=dt_timezone.utc)
+
+
+def _escape(value):
+    """Escape text per RFC 5545 section 3.3.11"""
+    return (
+        str(value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Fold content lines longer than 75 octets"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        chunk = encoded[:limit]
+        # Do not split a multi-byte character
+        while True:
+            try:
+                text = chunk.decode('utf-8')
+                break
+            except UnicodeDecodeError:
+                chunk = chunk[:-1]
+        parts.append(text)
+        encoded = encoded[len(chunk):]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _session_event(session, user_id, host, stamp):
+    start = timezone.make_aware(
+        datetime.combine(session.session_date, session.session_time),
+        timezone.get_default_timezone()
+    )
+    end = start + timedelta(minutes=session.duration_minutes)
+
+    if session.trainer.profile.user_id == user_id:
+        other = session.customer.profile.user
+    else:
+        other = session.trainer.profile.user
+    other_name = other.get_full_name() or other.username
+
+    status = 'CANCELLED' if session.status in ('cancelled', 'no_show') else (
+        'CONFIRMED' if session.status in ('confirmed', 'completed') else 'TENTATIVE'
+    )
+
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:session-{session.id}@{host}',
+        f'DTSTAMP:{stamp}',
+        f'DTSTART:{_format_utc(start)}',
+        f'DTEND:{_format_utc(end)}',
+        f'SUMMARY:{_escape(session.get_session_type_display())} with {_escape(other_name)}',
+        f'STATUS:{status}',
+    ]
+    if session.notes:
+        lines.append(f'DESCRIPTION:{_escape(session.notes)}')
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) for line in lines)
+
+
+def _generate_feed(user_id, host, cache_key):
+    """Yield the calendar chunk by chunk, caching the body if it stays small and cache_key is set"""
+    stamp = _format_utc(timezone.now())
+    collected = []
+    size = 0
+
+    def emit(text):
+        nonlocal size, collected
+        if collected is not None:
+            size += len(text)
+            if size <= FEED_CACHE_MAX_BYTES:
+                collected.append(text)
+            else:
+                collected = None
+        return text
+
+    yield emit(''.join(_fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//FitnessHub//Sessions//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:FitnessHub Sessions',
+    ]))
+
+    sessions = Session.objects.filter(
+        Q(trainer__profile__user_id=user_id) | Q(customer__profile__user_id=user_id)
+    ).select_related(
+        'customer__profile__user', 'trainer__profile__user'
+    ).order_by('session_date', 'session_time')
+
+    for session in sessions.iterator(chunk_size=FEED_CHUNK_SIZE):
+        yield emit(_session_event(session, user_id, host, stamp))
+
+    yield emit(_fold('END:VCALENDAR'))
+
+    if cache_key and collected is not None:
+        cache.set(cache_key, ''.join(collected), FEED_CACHE_TIMEOUT)
+
+
+@require_GET
+@condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified)
+def calendar_feed(request, token):
+    """ICS feed of a user's sessions, for calendar client subscriptions"""
+    user_id = _user_id_from_token(token)
+    cache_key = None
+    body = None
+    if _shared_cache():
+        cache_key = f"calendar_feed:{user_id}:{get_version('calendar', user_id)}"
+        body = cache.get(cache_key)
+    if body is not None:
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+    else:
+        response = StreamingHttpResponse(
+            _generate_feed(user_id, request.get_host().split(':')[0], cache_key),
+            content_type='text/calendar; charset=utf-8'
+        )
+
+    response['Content-Disposition'] = 'inline; filename="sessions.ics"'
+    response['Cache-Control'] = 'private, max-age=300'
+    return response
+
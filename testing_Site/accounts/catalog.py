@@ -0,0 +1,105 @@
+# catalog.py - Keyset-paginated resource listing and cached category counts
+#
+# Pages are ordered newest first and continue from an opaque cursor (the
+# created_at and id of the last row shown). Each page is one index range
+# scan no matter how deep the visitor scrolls, and rows added meanwhile do
+# not shift or repeat items the way OFFSET pages would.
+
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .cache_versions import get_version
+from .models import Resource
+
+PAGE_SIZE = 24
+COUNTS_TIMEOUT = 60 * 60
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(resource):
+    raw = f"{resource.created_at.isoformat()}|{resource.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def catalog_page(include_premium, category_id=None, cursor=None, limit=PAGE_SIZE):
+    """(resources, next_cursor) for one page; next_cursor is None on the last page"""
+    queryset = Resource.objects.filter(is_active=True).select_related('category')
+    if not include_premium:
+        queryset = queryset.filter(is_premium=False)
+    if category_id:
+        queryset = queryset.filter(category_id=category_id)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+    resources = list(queryset.order_by('-created_at', '-pk')[:limit + 1])
+    if len(resources) > limit:
+        return resources[:limit], encode_cursor(resources[limit - 1])
+    return resources, None
+
+
+def _category_breakdown():
+    """[(category_id, category_name, category_active, is_premium, count)] for active resources.
+
+    Cached per content version, but only with SHARED_CACHE: other workers'
+    LocMem caches would not see the version bump and keep old counts.
+    """
+    shared = getattr(settings, 'SHARED_CACHE', False)
+    key = f"resource_counts:{get_version('site', 'content')}" if shared else None
+    rows = cache.get(key) if shared else None
+    if rows is None:
+        rows = [
+            (row['category_id'], row['category__name'], row['category__is_active'], row['is_premium'], row['count'])
+            for row in Resource.objects.filter(is_active=True)
+            .values('category_id', 'category__name', 'category__is_active', 'is_premium')
+            .annotate(count=Count('id'))
+            .order_by()
+        ]
+        if shared:
+            cache.set(key, rows, COUNTS_TIMEOUT)
+    return rows
+
+
+def category_counts(include_premium):
+    """Per-category totals for a plan tier: with premium content, or free resources only.
+
+    Both tiers come from one cached GROUP BY over (category, is_premium),
+    invalidated with the site content version on every resource change.
+    Resources in inactive categories count towards the total but get no
+    category of their own. Returns (total, premium_total, [{'id', 'name', 'count'}, ...]).
+    """
+    total = 0
+    totals = {}
+    names = {}
+    premium_total = 0
+    for category_id, name, category_active, is_premium, count in _category_breakdown():
+        if is_premium:
+            if not include_premium:
+                continue
+            premium_total += count
+        total += count
+        if category_id is not None and not category_active:
+            continue
+        totals[category_id] = totals.get(category_id, 0) + count
+        names[category_id] = name or 'Uncategorized'
+    categories = sorted(
+        ({'id': pk, 'name': names[pk], 'count': count} for pk, count in totals.items()),
+        key=lambda category: category['name'],
+    )
+    return total, premium_total, categories
@@ -0,0 +1,88 @@
+# client_search.py - Prefix search over customer names, usernames and emails
+#
+# Every customer has a few CustomerSearchTerm rows: lower-cased, accent-free
+# tokens of their first/last name, username, email and email local part.
+# A query word matches by prefix as an index range scan (term >= 'ali' AND
+# term < 'ali\U0010ffff') instead of LIKE '%ali%' over four joined columns,
+# so typeahead stays fast with 100k customers. Each word must match.
+# Signals keep the terms current; bulk inserts call index_customers() or
+# `manage.py rebuild_client_search`.
+
+import re
+import unicodedata
+
+from django.db import transaction
+
+from .models import Customer, CustomerSearchTerm
+
+MAX_WORDS = 4
+MAX_TERM_LENGTH = 255
+TOP_K = 10
+WORD_RE = re.compile(r'[\w@.+-]+')
+EMAIL_SPLIT_RE = re.compile(r'[._+-]+')
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower().strip()
+
+
+def terms_for_user(user):
+    terms = set()
+    for name in (user.first_name, user.last_name):
+        terms.update(normalize(name).split())
+    terms.add(normalize(user.username))
+    email = normalize(user.email)
+    if email:
+        terms.add(email)
+        terms.update(EMAIL_SPLIT_RE.split(email.split('@', 1)[0]))
+    return {term[:MAX_TERM_LENGTH] for term in terms if term}
+
+
+def index_customers(customers):
+    """Replace the search terms of customers (with profile__user loaded)"""
+    customers = list(customers)
+    rows = [
+        CustomerSearchTerm(customer_id=customer.pk, term=term)
+        for customer in customers
+        for term in terms_for_user(customer.profile.user)
+    ]
+    with transaction.atomic():
+        CustomerSearchTerm.objects.filter(customer_id__in=[c.pk for c in customers]).delete()
+        CustomerSearchTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+def rebuild(chunk_size=2000):
+    CustomerSearchTerm.objects.all().delete()
+    batch = []
+    for customer in Customer.objects.select_related('profile__user').iterator(chunk_size=chunk_size):
+        batch.append(customer)
+        if len(batch) >= chunk_size:
+            index_customers(batch)
+            batch = []
+    index_customers(batch)
+
+
+def query_words(query):
+    return WORD_RE.findall(normalize(query))[:MAX_WORDS]
+
+
+def filter_customers(queryset, query, customer_field='pk'):
+    """Narrow queryset to rows whose customer matches every word of query by prefix"""
+    for word in query_words(query):
+        matches = CustomerSearchTerm.objects.filter(
+            term__gte=word, term__lt=word + '\U0010ffff',
+        ).values('customer_id')
+        queryset = queryset.filter(**{f'{customer_field}__in': matches})
+    return queryset
+
+
+def top_matches(queryset, query, limit=TOP_K):
+    """First limit customers from queryset matching query, ordered by name"""
+    if not query_words(query):
+        return []
+    return list(
+        filter_customers(queryset, query)
+        .select_related('profile__user')
+        .order_by('profile__user__first_name', 'profile__user__last_name', 'pk')[:limit]
+    )
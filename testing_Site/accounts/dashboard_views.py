@@ -3,11 +3,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse, Http404
+from django.http import JsonResponse, HttpResponse, Http404, FileResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth import update_session_auth_hash, logout
 from django.contrib.auth.forms import PasswordChangeForm
 from django.core.paginator import Paginator
+from django.urls import reverse
 from django.utils import timezone
 from django.db.models import Q, Sum, Count, Avg
 from django.core.files.storage import default_storage
@@ -17,25 +18,22 @@ from datetime import datetime, timedelta
 
 from .models import (
     Customer, SubscriptionPlan, CustomerSubscription, Payment, 
-    TrainerAssignment, WorkoutProgress, Goal, Resource, ResourceCategory,
+    TrainerAssignment, WorkoutProgress, Goal, Resource,
     Notification, TrainerMessage, Profile, Trainer, Session, TrainerRating
 )
+from .calendar_views import get_calendar_feed_url
+from .roles import get_role
+from .invoices import get_or_create_invoice
+from .catalog import InvalidCursor, catalog_page, category_counts
+from .entitlements import get_entitlements
+from .search_views import int_param, search_from_request
 
 def get_customer_or_redirect(user):
     """Helper function to get customer or return redirect response"""
-    try:
-        if not hasattr(user, 'profile'):
-            return None, redirect('login')
-        
-        if user.profile.role != 'customer':
-            return None, redirect('login')
-        
-        if not hasattr(user.profile, 'customer'):
-            return None, redirect('login')
-        
-        return user.profile.customer, None
-    except Exception:
+    customer = get_role(user).customer
+    if customer is None:
         return None, redirect('login')
+    return customer, None
 
 @login_required
 def customer_dashboard(request):
@@ -391,7 +389,7 @@ def payment_history(request):
     if redirect_response:
         return redirect_response
     
-    payments = customer.payments.all().order_by('-payment_date')
+    payments = customer.payments.select_related('subscription__plan').order_by('-payment_date')
     
     # Calculate payment statistics
     try:
@@ -499,6 +497,7 @@ def trainer_info(request):
         'total_sessions': total_sessions,
         'monthly_sessions': monthly_sessions,
         'attendance_rate': attendance_rate,
+        'calendar_feed_url': get_calendar_feed_url(request, request.user),
     }
     
     return render(request, 'accounts/dashboard/trainer_info.html', context)
@@ -741,21 +740,35 @@ def resources_downloads(request):
         return redirect_response
     
     current_subscription = getattr(customer, 'subscription', None)
-    has_active_subscription = current_subscription and current_subscription.is_active
+    entitlements = get_entitlements(customer)
+    has_active_subscription = entitlements.active
     
     # Filter resources based on subscription
-    if has_active_subscription and current_subscription.plan.premium_content:
-        resources = Resource.objects.filter(is_active=True).order_by('-created_at')
+    include_premium = entitlements.premium_content
+    category_id = int_param(request, 'category')
+    search = search_from_request(request, include_premium)
+    next_cursor = None
+    if search is not None:
+        resources = search.resources
     else:
-        resources = Resource.objects.filter(is_active=True, is_premium=False).order_by('-created_at')
+        try:
+            resources, next_cursor = catalog_page(include_premium, category_id, request.GET.get('cursor'))
+        except InvalidCursor:
+            resources, next_cursor = catalog_page(include_premium, category_id)
     
-    # Get resource categories
-    categories = ResourceCategory.objects.filter(is_active=True)
+    # Per-category counts for the visitor's plan tier (one cached GROUP BY)
+    total_resources, premium_resources, categories = category_counts(include_premium)
     
     context = {
         'customer': customer,
         'resources': resources,
+        'next_cursor': next_cursor,
+        'selected_category': category_id,
+        'search': search,
+        'query': request.GET.get('q', '').strip(),
         'categories': categories,
+        'total_resources': total_resources,
+        'premium_resources': premium_resources,
         'current_subscription': current_subscription,
         'has_active_subscription': has_active_subscription,
     }
@@ -864,8 +877,7 @@ def download_resource(request, resource_id):
     resource = get_object_or_404(Resource, id=resource_id, is_active=True)
     
     # Check if customer has access
-    subscription = getattr(customer, 'subscription', None)
-    if resource.is_premium and (not subscription or not subscription.is_active or not subscription.plan.premium_content):
+    if resource.is_premium and not get_entitlements(customer).premium_content:
         messages.error(request, "Premium subscription required to access this resource.")
         return redirect('resources_downloads')
     
@@ -938,13 +950,41 @@ def request_trainer_change(request):
 
 @login_required
 def download_invoice(request, subscription_id):
-    """Download invoice - placeholder"""
+    """Download the PDF invoice for the latest (or ?payment=) payment of a subscription"""
     customer, redirect_response = get_customer_or_redirect(request.user)
     if redirect_response:
         return redirect_response
     
-    messages.info(request, "Invoice download feature coming soon!")
-    return redirect('subscription_details')
+    subscription = get_object_or_404(CustomerSubscription, id=subscription_id, customer=customer)
+    payments = Payment.objects.filter(
+        customer=customer,
+        subscription=subscription
+    ).select_related('customer__profile__user', 'subscription__plan')
+    
+    payment_id = request.GET.get('payment')
+    if payment_id:
+        try:
+            payment = payments.filter(id=int(payment_id)).first()
+        except ValueError:
+            payment = None
+    else:
+        payment = payments.order_by('-payment_date').first()
+    
+    if not payment:
+        messages.error(request, "No payment found for this subscription.")
+        return redirect('subscription_details')
+    
+    try:
+        path = get_or_create_invoice(payment)
+        return FileResponse(
+            default_storage.open(path, 'rb'),
+            as_attachment=True,
+            filename=f"invoice_{payment.id}.pdf",
+            content_type='application/pdf'
+        )
+    except Exception as e:
+        messages.error(request, f"Error generating invoice: {str(e)}")
+        return redirect('subscription_details')
 
 # API endpoints for AJAX calls
 @login_required
@@ -960,6 +1000,39 @@ def api_notifications_count(request):
     except Exception:
         return JsonResponse({'count': 0})
 
+@login_required
+def api_resources(request):
+    """Next page of the resource catalog for infinite scroll (?cursor=&category=)"""
+    customer, redirect_response = get_customer_or_redirect(request.user)
+    if redirect_response:
+        return JsonResponse({'error': 'Customer access required'}, status=403)
+    
+    try:
+        resources, next_cursor = catalog_page(
+            get_entitlements(customer).premium_content, int_param(request, 'category'), request.GET.get('cursor'),
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    return JsonResponse({
+        'results': [
+            {
+                'id': resource.id,
+                'title': resource.title,
+                'description': resource.description,
+                'resource_type': resource.resource_type,
+                'resource_type_display': resource.get_resource_type_display(),
+                'category': resource.category.name if resource.category else None,
+                'is_premium': resource.is_premium,
+                'file_url': resource.file.url if resource.file else None,
+                'link_url': resource.file_url if resource.resource_type == 'link' else None,
+                'download_url': reverse('download_resource', args=[resource.id]),
+            }
+            for resource in resources
+        ],
+        'next_cursor': next_cursor,
+    })
+
 @login_required
 def api_subscription_status(request):
     """Get subscription status"""
@@ -0,0 +1,105 @@
+# entitlements.py - What a customer's subscription lets them use
+#
+# A customer's entitlements are a small bitmap built from their active plan's
+# feature flags, cached per customer. Subscription saves/deletes drop the
+# customer's entry; plan changes bump the ('site', 'plans') version, which
+# every cached entry is checked against. The cache is only used with
+# SHARED_CACHE: invalidations in one worker never reach another worker's
+# LocMem cache, so without it every lookup runs the single-row query. Code
+# that filters customers in SQL uses feature_filter() so the predicate lives
+# in one place.
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .cache_versions import bump_version, get_version
+
+# Plan feature flags, in bit order; append only, cached bitmaps depend on it
+FEATURES = (
+    'workout_videos', 'meal_plans', 'trainer_support', 'progress_tracking',
+    'live_sessions', 'personal_sessions', 'nutrition_guidance', 'premium_content',
+)
+FEATURE_BITS = {name: 1 << index for index, name in enumerate(FEATURES)}
+# Set whenever the customer has an active subscription, whatever the plan
+ACTIVE = 1 << len(FEATURES)
+
+ENTITLEMENTS_TIMEOUT = 60 * 60 * 24
+
+
+class Entitlements:
+    """Read-only view of a bitmap: entitlements.active, entitlements.premium_content, ..."""
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @property
+    def active(self):
+        return bool(self.bits & ACTIVE)
+
+    def has(self, feature):
+        return bool(self.bits & FEATURE_BITS[feature])
+
+    def __getattr__(self, name):
+        if name in FEATURE_BITS:
+            return self.has(name)
+        raise AttributeError(name)
+
+    def __repr__(self):
+        enabled = [name for name in FEATURES if self.has(name)]
+        return f"<Entitlements active={self.active} {enabled}>"
+
+
+def _cache_key(customer_id):
+    return f"entitlements:{customer_id}"
+
+
+def compute_bits(customer_id):
+    """Bitmap of the customer's active plan, from one single-row query"""
+    from .models import CustomerSubscription
+
+    flags = CustomerSubscription.objects.filter(customer_id=customer_id, is_active=True).values_list(
+        *(f'plan__{name}' for name in FEATURES)
+    ).first()
+    if flags is None:
+        return 0
+    bits = ACTIVE
+    for name, enabled in zip(FEATURES, flags):
+        if enabled:
+            bits |= FEATURE_BITS[name]
+    return bits
+
+
+def get_entitlements(customer):
+    """Entitlements of a Customer (or customer id), cached until their subscription or a plan changes"""
+    if customer is None:
+        return Entitlements()
+    customer_id = getattr(customer, 'pk', customer)
+    if not getattr(settings, 'SHARED_CACHE', False):
+        return Entitlements(compute_bits(customer_id))
+    plans_version = get_version('site', 'plans')
+    cached = cache.get(_cache_key(customer_id))
+    if cached is not None and cached[1] == plans_version:
+        return Entitlements(cached[0])
+    bits = compute_bits(customer_id)
+    cache.set(_cache_key(customer_id), (bits, plans_version), ENTITLEMENTS_TIMEOUT)
+    return Entitlements(bits)
+
+
+def has_feature(customer, feature):
+    return get_entitlements(customer).has(feature)
+
+
+def invalidate_customers(*customer_ids):
+    cache.delete_many([_cache_key(customer_id) for customer_id in customer_ids if customer_id is not None])
+
+
+def invalidate_plans():
+    bump_version('site', 'plans')
+
+
+def feature_filter(feature, prefix=''):
+    """Q for customers whose active plan has feature; prefix reaches Customer from another model"""
+    return Q(**{f'{prefix}subscription__is_active': True, f'{prefix}subscription__plan__{feature}': True})
@@ -0,0 +1,201 @@
+# export_views.py - Streaming CSV/XLSX exports for payments, sessions and progress
+
+import csv
+import tempfile
+from datetime import datetime
+
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse, FileResponse, Http404
+from django.utils import timezone
+
+from .models import Payment, Session, WorkoutProgress
+from .dashboard_views import get_customer_or_redirect
+from .trainer_dashboard_views import get_trainer_or_redirect
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX export is optional
+    Workbook = None
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object that returns what is written, for csv.writer streaming"""
+
+    def write(self, value):
+        return value
+
+
+# Column definitions: (header, accessor)
+PAYMENT_COLUMNS = [
+    ('id', lambda p: p.id),
+    ('transaction_id', lambda p: p.transaction_id),
+    ('customer', lambda p: p.customer.profile.user.username),
+    ('email', lambda p: p.customer.profile.user.email),
+    ('amount', lambda p: p.amount),
+    ('payment_method', lambda p: p.payment_method),
+    ('status', lambda p: p.status),
+    ('payment_date', lambda p: p.payment_date.isoformat()),
+    ('plan', lambda p: p.subscription.plan.name if p.subscription_id else ''),
+]
+
+SESSION_COLUMNS = [
+    ('id', lambda s: s.id),
+    ('session_date', lambda s: s.session_date.isoformat()),
+    ('session_time', lambda s: s.session_time.strftime('%H:%M')),
+    ('duration_minutes', lambda s: s.duration_minutes),
+    ('session_type', lambda s: s.session_type),
+    ('status', lambda s: s.status),
+    ('customer', lambda s: s.customer.profile.user.username),
+    ('trainer', lambda s: s.trainer.profile.user.username),
+    ('notes', lambda s: s.notes or ''),
+]
+
+PROGRESS_COLUMNS = [
+    ('id', lambda w: w.id),
+    ('customer', lambda w: w.customer.profile.user.username),
+    ('date', lambda w: w.date.isoformat()),
+    ('weight', lambda w: w.weight if w.weight is not None else ''),
+    ('bmi', lambda w: w.bmi if w.bmi is not None else ''),
+    ('sessions_attended', lambda w: w.sessions_attended),
+    ('trainer_notes', lambda w: w.trainer_notes),
+    ('customer_notes', lambda w: w.customer_notes),
+]
+
+EXPORTS = {
+    'payments': {
+        'queryset': lambda: Payment.objects.select_related(
+            'customer__profile__user', 'subscription__plan'
+        ),
+        'date_field': 'payment_date__date',
+        'columns': PAYMENT_COLUMNS,
+    },
+    'sessions': {
+        'queryset': lambda: Session.objects.select_related(
+            'customer__profile__user', 'trainer__profile__user'
+        ),
+        'date_field': 'session_date',
+        'columns': SESSION_COLUMNS,
+    },
+    'progress': {
+        'queryset': lambda: WorkoutProgress.objects.select_related('customer__profile__user'),
+        'date_field': 'date',
+        'columns': PROGRESS_COLUMNS,
+    },
+}
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def filter_export_queryset(queryset, date_field, params):
+    """Apply ?start=, ?end= (YYYY-MM-DD) and ?after=<id> to an export queryset.
+
+    Rows are always ordered by primary key so an interrupted download can be
+    resumed by passing the last received id as ``after``.
+    """
+    start = _parse_date(params.get('start'))
+    end = _parse_date(params.get('end'))
+    if start:
+        queryset = queryset.filter(**{f'{date_field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{date_field}__lte': end})
+
+    after = params.get('after')
+    if after and after.isdigit():
+        queryset = queryset.filter(pk__gt=int(after))
+
+    return queryset.order_by('pk')
+
+
+def _csv_rows(queryset, columns, include_header):
+    writer = csv.writer(Echo())
+    if include_header:
+        yield writer.writerow([header for header, _ in columns])
+    for obj in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow([accessor(obj) for _, accessor in columns])
+
+
+def stream_csv(queryset, columns, filename, include_header=True):
+    """Stream a queryset as CSV in constant memory"""
+    response = StreamingHttpResponse(
+        _csv_rows(queryset, columns, include_header),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def stream_xlsx(queryset, columns, filename):
+    """Write a queryset to an XLSX file with openpyxl's write-only mode and stream it"""
+    if Workbook is None:
+        raise Http404("XLSX export requires openpyxl")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=filename[:31])
+    sheet.append([header for header, _ in columns])
+    for obj in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        sheet.append([
+            value if isinstance(value, (int, float, str)) else str(value)
+            for value in (accessor(obj) for _, accessor in columns)
+        ])
+
+    # Spool to disk so large workbooks never sit in worker memory
+    tmp = tempfile.TemporaryFile()
+    workbook.save(tmp)
+    tmp.seek(0)
+    return FileResponse(tmp, as_attachment=True, filename=f"{filename}.xlsx")
+
+
+def export_response(request, kind, queryset):
+    """Build the CSV/XLSX response for an already scoped queryset"""
+    export = EXPORTS[kind]
+    queryset = filter_export_queryset(queryset, export['date_field'], request.GET)
+    filename = f"{kind}_{timezone.now().strftime('%Y%m%d%H%M%S')}"
+
+    if request.GET.get('format') == 'xlsx':
+        return stream_xlsx(queryset, export['columns'], filename)
+
+    # Resumed downloads append to the partial file, so skip the header row
+    include_header = not request.GET.get('after')
+    return stream_csv(queryset, export['columns'], filename, include_header=include_header)
+
+
+@staff_member_required
+def admin_export(request, kind):
+    """Staff export of all payments, sessions or progress entries"""
+    if kind not in EXPORTS:
+        raise Http404("Unknown export")
+    return export_response(request, kind, EXPORTS[kind]['queryset']())
+
+
+@login_required
+def customer_payments_export(request):
+    """Export the logged-in customer's payment history"""
+    customer, redirect_response = get_customer_or_redirect(request.user)
+    if redirect_response:
+        return redirect_response
+
+    queryset = EXPORTS['payments']['queryset']().filter(customer=customer)
+    return export_response(request, 'payments', queryset)
+
+
+@login_required
+def trainer_sessions_export(request):
+    """Export the logged-in trainer's sessions"""
+    trainer, redirect_response = get_trainer_or_redirect(request.user)
+    if redirect_response:
+        messages.error(request, "Access denied. Verified trainer account required.")
+        return redirect_response
+
+    queryset = EXPORTS['sessions']['queryset']().filter(trainer=trainer)
+    return export_response(request, 'sessions', queryset)
@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.models import User
 from .models import Profile, Trainer
 from .models import Trainer, TrainerAssignment, TrainerMessage, Resource, Customer
+from .entitlements import feature_filter
 
 class CustomerSignupForm(forms.ModelForm):
     username = forms.CharField()
@@ -50,7 +51,7 @@ class TrainerSignupForm(forms.ModelForm):
 
 class TrainerAssignmentForm(forms.ModelForm):
     trainer = forms.ModelChoiceField(
-        queryset=Trainer.objects.filter(is_verified=True),
+        queryset=Trainer.objects.filter(is_verified=True).with_client_counts(),
         empty_label="Select a trainer...",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
@@ -73,7 +74,8 @@ class TrainerAssignmentForm(forms.ModelForm):
         self.fields['trainer'].label_from_instance = self.trainer_label_from_instance
 
     def trainer_label_from_instance(self, trainer):
-        active_clients = trainer.assigned_customers.filter(is_active=True).count()
+        # active_clients is annotated by the field's queryset
+        active_clients = trainer.active_clients
         rating = trainer.average_rating or 0
         return f"{trainer.profile.user.get_full_name()} - {active_clients} clients - {rating:.1f}★"
 
@@ -107,8 +109,7 @@ class AdminMessageForm(forms.Form):
 class ResourceSharingForm(forms.Form):
     customers = forms.ModelMultipleChoiceField(
         queryset=Customer.objects.filter(
-            subscription__is_active=True,
-            subscription__plan__trainer_support=True
+            feature_filter('trainer_support')
         ),
         widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'}),
         required=True
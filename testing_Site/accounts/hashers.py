@@ -0,0 +1,80 @@
+# hashers.py - Password hashers with tunable cost and bounded concurrency
+#
+# PASSWORD_HASHER_PROFILE in settings picks the preferred algorithm and
+# PASSWORD_HASHER_PARAMS (keyed by algorithm name) its cost; see
+# `manage.py tune_password_hasher` for measuring them on this hardware.
+# The classes keep Django's algorithm names, so existing hashes still verify.
+# ModelBackend rehashes on successful login whenever the stored hash uses
+# another algorithm or different parameters (must_update), which upgrades
+# users transparently after a profile or cost change.
+
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher,
+)
+
+_slots = None
+_slots_lock = threading.Lock()
+_held = threading.local()
+
+
+@contextmanager
+def hashing_slot():
+    """Limit concurrent hash computations to PASSWORD_HASH_CONCURRENCY.
+
+    Memory-hard hashes running on every core at once thrash the CPU caches
+    and memory bandwidth; queueing bursts of logins keeps p99 close to the
+    single-hash cost times the queue depth instead of degrading for everyone.
+    """
+    global _slots
+    # verify() calls encode() for PBKDF2 and scrypt; a thread holds one slot
+    if getattr(_held, 'slot', False):
+        yield
+        return
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                limit = getattr(settings, 'PASSWORD_HASH_CONCURRENCY', None) or os.cpu_count() or 1
+                _slots = threading.BoundedSemaphore(limit)
+    with _slots:
+        _held.slot = True
+        try:
+            yield
+        finally:
+            _held.slot = False
+
+
+class TunedHasherMixin:
+    """Reads cost parameters from PASSWORD_HASHER_PARAMS[<algorithm>]"""
+
+    def __init__(self):
+        params = getattr(settings, 'PASSWORD_HASHER_PARAMS', {}).get(self.algorithm, {})
+        for name, value in params.items():
+            if not hasattr(type(self), name):
+                raise ValueError(f"Unknown {self.algorithm} hasher parameter: {name}")
+            setattr(self, name, value)
+
+    def encode(self, *args, **kwargs):
+        with hashing_slot():
+            return super().encode(*args, **kwargs)
+
+    def verify(self, password, encoded):
+        with hashing_slot():
+            return super().verify(password, encoded)
+
+
+class TunedArgon2PasswordHasher(TunedHasherMixin, Argon2PasswordHasher):
+    """Argon2id; parameters: time_cost, memory_cost (KiB), parallelism"""
+
+
+class TunedScryptPasswordHasher(TunedHasherMixin, ScryptPasswordHasher):
+    """scrypt; parameters: work_factor (N), block_size (r), parallelism (p), maxmem"""
+
+
+class TunedPBKDF2PasswordHasher(TunedHasherMixin, PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 (params key 'pbkdf2_sha256'); parameters: iterations"""
+
@@ -0,0 +1,89 @@
+# images.py - Resized, EXIF-free variants for uploaded profile pictures
+
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is required by ImageField, but keep imports safe
+    Image = ImageOps = None
+
+# Size class -> longest edge in pixels (2x the largest CSS size it is shown at)
+SIZE_CLASSES = {
+    'sm': 96,
+    'md': 192,
+    'lg': 512,
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+VARIANTS_DIR = 'variants'
+
+
+def variant_name(original_name, size, fmt='webp'):
+    """Storage path of a variant, e.g. profiles/variants/photo.jpg_sm.webp"""
+    directory, filename = os.path.split(original_name)
+    # The whole filename, not just the stem: photo.jpg and photo.png belong
+    # to different users and must not share variants
+    return f"{directory}/{VARIANTS_DIR}/{filename}_{size}.{fmt}"
+
+
+def generate_variants(original_name, storage=None, force=False):
+    """Create every size/format variant of an image already in storage.
+
+    EXIF orientation is applied to the pixels and all metadata is dropped, so
+    variants carry no camera or location data. Returns the number of files
+    written.
+    """
+    if Image is None:
+        return 0
+
+    storage = storage or default_storage
+    targets = [
+        (size, fmt)
+        for size in SIZE_CLASSES
+        for fmt in FORMATS
+        if force or not storage.exists(variant_name(original_name, size, fmt))
+    ]
+    if not targets:
+        return 0
+
+    with storage.open(original_name, 'rb') as original:
+        image = Image.open(original)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+
+    written = 0
+    for size, fmt in targets:
+        edge = SIZE_CLASSES[size]
+        variant = image.copy()
+        variant.thumbnail((edge, edge), Image.LANCZOS)
+
+        pil_format, save_options = FORMATS[fmt]
+        buffer = BytesIO()
+        variant.save(buffer, pil_format, **save_options)
+
+        name = variant_name(original_name, size, fmt)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(buffer.getvalue()))
+        written += 1
+
+    return written
+
+
+def variant_url(image_field, size='md', fmt='webp', storage=None):
+    """URL of a variant, falling back to the original until it has been processed"""
+    if not image_field:
+        return ''
+    storage = storage or default_storage
+    name = variant_name(image_field.name, size, fmt)
+    if storage.exists(name):
+        return storage.url(name)
+    return image_field.url
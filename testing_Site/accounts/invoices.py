@@ -0,0 +1,90 @@
+# invoices.py - Invoice rendering with content-addressed PDF artifacts in media storage
+
+import hashlib
+import json
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .pdf import render_text_pdf
+
+# Bump when the invoice layout changes so old artifacts are not reused
+INVOICE_LAYOUT_VERSION = 1
+INVOICE_DIR = 'invoices'
+COMPANY_NAME = 'FitnessHub'
+
+
+def build_invoice_data(payment):
+    """Plain, JSON-serializable snapshot of everything printed on the invoice"""
+    user = payment.customer.profile.user
+    subscription = payment.subscription
+    plan = subscription.plan if subscription else None
+
+    return {
+        'layout': INVOICE_LAYOUT_VERSION,
+        'invoice_number': f"INV-{payment.payment_date.strftime('%Y%m')}-{payment.id:06d}",
+        'transaction_id': payment.transaction_id,
+        'issued': payment.payment_date.strftime('%Y-%m-%d'),
+        'customer_name': user.get_full_name() or user.username,
+        'customer_email': user.email,
+        'plan': plan.name if plan else 'One-off payment',
+        'period_start': subscription.start_date.strftime('%Y-%m-%d') if subscription else '',
+        'period_end': subscription.end_date.strftime('%Y-%m-%d') if subscription and subscription.end_date else '',
+        'amount': str(payment.amount),
+        'payment_method': payment.get_payment_method_display(),
+        'status': payment.get_status_display(),
+    }
+
+
+def invoice_digest(data):
+    """Content address for an invoice: SHA-256 of its canonical JSON"""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def invoice_path(digest):
+    return f"{INVOICE_DIR}/{digest[:2]}/{digest}.pdf"
+
+
+def render_invoice_pdf(data):
+    """Render invoice data to PDF bytes. Pure function, safe to run in worker processes."""
+    lines = [
+        (f"{COMPANY_NAME} - Invoice", 18, True),
+        '',
+        f"Invoice number: {data['invoice_number']}",
+        f"Issued: {data['issued']}",
+        f"Transaction: {data['transaction_id']}",
+        '',
+        ('Billed to', 12, True),
+        data['customer_name'],
+        data['customer_email'],
+        '',
+        ('Details', 12, True),
+        f"Plan: {data['plan']}",
+    ]
+    if data['period_start']:
+        lines.append(f"Service period: {data['period_start']} to {data['period_end'] or 'open-ended'}")
+    lines += [
+        f"Payment method: {data['payment_method']}",
+        f"Payment status: {data['status']}",
+        '',
+        (f"Total: ${data['amount']}", 14, True),
+        '',
+        f"Thank you for training with {COMPANY_NAME}.",
+    ]
+    return render_text_pdf(lines)
+
+
+def store_invoice(data, pdf_bytes=None):
+    """Save the rendered invoice once; returns its storage path"""
+    path = invoice_path(invoice_digest(data))
+    if not default_storage.exists(path):
+        if pdf_bytes is None:
+            pdf_bytes = render_invoice_pdf(data)
+        default_storage.save(path, ContentFile(pdf_bytes))
+    return path
+
+
+def get_or_create_invoice(payment):
+    """Storage path of the payment's invoice, rendering it only on first request"""
+    return store_invoice(build_invoice_data(payment))
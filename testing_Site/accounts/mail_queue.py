@@ -0,0 +1,41 @@
+# mail_queue.py - Send notification emails off the request thread
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# One worker keeps a single SMTP conversation at a time; a batch of
+# messages is sent over one connection by send_mass_mail.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='accounts-mail')
+
+
+def _deliver(datatuple):
+    try:
+        sent = send_mass_mail(datatuple, fail_silently=False)
+        logger.info("Delivered %s queued emails", sent)
+    except Exception:
+        logger.exception("Failed to deliver %s queued emails", len(datatuple))
+
+
+def queue_mass_mail(datatuple):
+    """Queue (subject, message, from_email, recipient_list) tuples for delivery.
+
+    Nothing is sent unless the surrounding transaction commits. Delivery
+    happens on a background thread unless MAIL_QUEUE_ASYNC is False.
+    """
+    datatuple = [item for item in datatuple if item[3]]
+    if not datatuple:
+        return
+
+    def submit():
+        if getattr(settings, 'MAIL_QUEUE_ASYNC', True):
+            _executor.submit(_deliver, datatuple)
+        else:
+            _deliver(datatuple)
+
+    transaction.on_commit(submit)
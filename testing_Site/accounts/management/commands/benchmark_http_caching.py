@@ -0,0 +1,88 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+# Middleware added for response compression and HTTP caching; "before"
+# numbers are measured with these removed.
+CACHING_MIDDLEWARE = {
+    'accounts.middleware.ThresholdGZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+    'accounts.middleware.PublicPageCacheMiddleware',
+    'accounts.middleware.UserVersionETagMiddleware',
+}
+
+ANONYMOUS_URLS = ['home', 'select_signup', 'login']
+CUSTOMER_URLS = ['customer_dashboard', 'subscription_plans', 'payment_history', 'workout_progress', 'goals_management']
+TRAINER_URLS = ['trainer_dashboard', 'trainer_clients', 'trainer_sessions', 'trainer_schedule', 'trainer_reports']
+
+
+class Command(BaseCommand):
+    help = "Measure bytes-on-wire and time to first byte with and without the caching middleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="Log in as this user to benchmark their dashboard pages")
+        parser.add_argument('--repeat', type=int, default=20, help="Requests per URL and mode (default 20)")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['username']:
+            user = User.objects.filter(username=options['username']).select_related('profile').first()
+            if user is None:
+                raise CommandError(f"No user named {options['username']!r}")
+
+        urls = list(ANONYMOUS_URLS)
+        if user is not None:
+            role = getattr(getattr(user, 'profile', None), 'role', 'customer')
+            urls = TRAINER_URLS if role == 'trainer' else CUSTOMER_URLS
+
+        without = [m for m in settings.MIDDLEWARE if m not in CACHING_MIDDLEWARE]
+        with override_settings(MIDDLEWARE=without):
+            before = self.measure(urls, user, options['repeat'])
+        after = self.measure(urls, user, options['repeat'])
+
+        header = f"{'url':<22}{'bytes before':>14}{'bytes after':>13}{'ttfb before':>13}{'ttfb after':>12}{'304 ttfb':>10}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name in urls:
+            b, a = before[name], after[name]
+            self.stdout.write(
+                f"{name:<22}{b['bytes']:>14}{a['bytes']:>13}"
+                f"{b['ttfb']:>11.1f}ms{a['ttfb']:>10.1f}ms"
+                + (f"{a['revalidate']:>8.1f}ms" if a['revalidate'] is not None else f"{'-':>10}")
+            )
+
+    def measure(self, urls, user, repeat):
+        client = Client(HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        if user is not None:
+            client.force_login(user)
+
+        results = {}
+        for name in urls:
+            path = reverse(name)
+            timings, size, etag = [], 0, None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = client.get(path)
+                # The test client runs the whole handler before returning, so
+                # this is the server-side time until the first byte is ready.
+                timings.append((time.perf_counter() - start) * 1000)
+                size = len(b''.join(response)) if response.streaming else len(response.content)
+                etag = response.get('ETag')
+
+            revalidate = None
+            if etag:
+                revalidations = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    client.get(path, HTTP_IF_NONE_MATCH=etag)
+                    revalidations.append((time.perf_counter() - start) * 1000)
+                revalidate = statistics.median(revalidations)
+
+            results[name] = {'bytes': size, 'ttfb': statistics.median(timings), 'revalidate': revalidate}
+        return results
@@ -0,0 +1,140 @@
+import http.client
+import random
+import threading
+import time
+from collections import defaultdict
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.urls import reverse
+
+from accounts.profiling import percentile
+
+# (actor, url name, weight): dashboards, messaging and the polling endpoints
+# the dashboards call every few seconds
+REQUEST_MIX = [
+    ('customer', 'customer_dashboard', 12),
+    ('customer', 'api_notifications_count', 20),
+    ('customer', 'api_subscription_status', 8),
+    ('customer', 'notifications_list', 6),
+    ('customer', 'customer_messages', 6),
+    ('customer', 'workout_progress', 4),
+    ('customer', 'payment_history', 3),
+    ('customer', 'trainer_info', 3),
+    ('trainer', 'trainer_dashboard', 8),
+    ('trainer', 'trainer_dashboard_updates', 15),
+    ('trainer', 'trainer_messages', 5),
+    ('trainer', 'trainer_clients', 4),
+    ('trainer', 'trainer_sessions', 3),
+    ('anonymous', 'home', 4),
+    ('anonymous', 'login', 2),
+]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of dashboard, messaging and polling requests as seeded users "
+        "(see seed_fitness_data) and report throughput and latency percentiles per route"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=20, help="Distinct customers and trainers to act as")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed', help="Username prefix used by seed_fitness_data")
+        parser.add_argument('--transport', choices=['client', 'wsgi'], default='client',
+                            help="In-process test client, or HTTP against a local wsgiref server")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        users = {
+            role: list(User.objects.filter(
+                username__startswith=f"{options['prefix']}_{role}_", profile__role=role,
+            ).order_by('pk')[:options['users']])
+            for role in ('customer', 'trainer')
+        }
+        if not users['customer'] or not users['trainer']:
+            raise CommandError("No seeded users found; run seed_fitness_data first")
+
+        self.host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        sessions = self.login_all(users)
+        urls = {name: reverse(name) for _, name, _ in REQUEST_MIX}
+
+        plan = rng.choices(REQUEST_MIX, weights=[weight for _, _, weight in REQUEST_MIX], k=options['requests'])
+        server = self.start_server() if options['transport'] == 'wsgi' else None
+
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        started = time.perf_counter()
+        try:
+            for actor, name, _ in plan:
+                session = rng.choice(sessions[actor]) if actor != 'anonymous' else None
+                start = time.perf_counter()
+                status = self.fetch(server, session, urls[name])
+                timings[name].append((time.perf_counter() - start) * 1000)
+                if status >= 400:
+                    errors[name] += 1
+        finally:
+            if server is not None:
+                server.shutdown()
+        elapsed = time.perf_counter() - started
+
+        self.report(timings, errors, elapsed, options['requests'], options['transport'])
+
+    def login_all(self, users):
+        """A logged-in test client per user; the wsgi transport reuses their session cookies"""
+        sessions = {'anonymous': [None]}
+        for role, role_users in users.items():
+            sessions[role] = []
+            for user in role_users:
+                client = Client(raise_request_exception=False, HTTP_HOST=self.host)
+                client.force_login(user)
+                sessions[role].append(client)
+        return sessions
+
+    def start_server(self):
+        server = make_server('127.0.0.1', 0, get_wsgi_application(), handler_class=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def fetch(self, server, client, url):
+        if server is None:
+            # A view that raises counts as a 500 error instead of aborting the run
+            response = (client or Client(raise_request_exception=False, HTTP_HOST=self.host)).get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            return response.status_code
+
+        headers = {'Host': self.host, 'Accept-Encoding': 'gzip'}
+        if client is not None:
+            headers['Cookie'] = '; '.join(f'{key}={morsel.value}' for key, morsel in client.cookies.items())
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=30)
+        try:
+            connection.request('GET', url, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    def report(self, timings, errors, elapsed, total, transport):
+        self.stdout.write(f"{total} requests in {elapsed:.2f}s via {transport}: {total / elapsed:.1f} req/s\n")
+        header = f"{'route':<28}{'count':>7}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, values in sorted(timings.items(), key=lambda item: -percentile(sorted(item[1]), 95)):
+            values.sort()
+            self.stdout.write(
+                f"{name:<28}{len(values):>7}{sum(values) / len(values):>9.1f}"
+                f"{percentile(values, 50):>9.1f}{percentile(values, 95):>9.1f}{percentile(values, 99):>9.1f}"
+                f"{errors[name]:>8}"
+            )
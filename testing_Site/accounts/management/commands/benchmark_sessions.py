@@ -0,0 +1,91 @@
+import random
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'accounts.sessions',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.signed_cookies',
+]
+
+# Roughly what a logged-in session holds: auth keys plus the cached role
+SAMPLE_SESSION = {
+    '_auth_user_id': '1',
+    '_auth_user_backend': 'django.contrib.auth.backends.ModelBackend',
+    '_auth_user_hash': 'a' * 64,
+    '_accounts_role': {'role': 'customer', 'customer_id': 1, 'trainer_id': None},
+}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.reads = self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            self.reads += 1
+        else:
+            self.writes += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the session work SessionMiddleware does per request (load, occasional "
+        "modification, save) against each session engine and report time and queries per request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--write-ratio', type=float, default=0.05,
+                            help="Share of requests that modify the session (messages, login, role cache)")
+        parser.add_argument('--save-every-request', action='store_true',
+                            help="Behave as if SESSION_SAVE_EVERY_REQUEST were on")
+        parser.add_argument('--engine', action='append', dest='engines',
+                            help=f"Engine module to measure (repeatable; default: all of {', '.join(ENGINES)})")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        engines = options['engines'] or ENGINES
+        self.stdout.write(f"Configured SESSION_ENGINE: {settings.SESSION_ENGINE}\n")
+        header = f"{'engine':<50}{'us/request':>12}{'reads/req':>11}{'writes/req':>12}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for engine in engines:
+            micros, counter = self.measure(engine, options)
+            total = options['requests']
+            self.stdout.write(
+                f"{engine:<50}{micros:>12.1f}{counter.reads / total:>11.3f}{counter.writes / total:>12.3f}"
+            )
+
+    def measure(self, engine, options):
+        store_class = import_module(engine).SessionStore
+        rng = random.Random(options['seed'])
+
+        session = store_class()
+        session.update(SAMPLE_SESSION)
+        session.save()
+        session_key = session.session_key
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            for i in range(options['requests']):
+                # What SessionMiddleware and AuthenticationMiddleware do per request
+                session = store_class(session_key)
+                session.get('_auth_user_id')
+                if rng.random() < options['write_ratio']:
+                    session['last_request'] = i
+                if (session.modified or options['save_every_request']) and not session.is_empty():
+                    session.save()
+                session_key = session.session_key
+            elapsed = time.perf_counter() - start
+
+        store_class(session_key).delete()
+        return elapsed / options['requests'] * 1_000_000, counter
@@ -0,0 +1,44 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired database sessions in batches of primary keys, so a large backlog "
+        "never becomes one long DELETE holding the table lock. Replaces clearsessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        store_class = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store_class, 'get_model_class'):
+            # cache and signed_cookies sessions expire on their own
+            store_class.clear_expired()
+            self.stdout.write(f"{settings.SESSION_ENGINE} has no session table; nothing to purge")
+            return
+        model = store_class.get_model_class()
+
+        now = timezone.now()
+        batch_size = max(1, options['batch_size'])
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            count, _ = model.objects.filter(session_key__in=keys).delete()
+            deleted += count
+            self.stdout.write(f"  deleted {deleted} expired sessions")
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions"))
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from accounts.invoices import build_invoice_data, invoice_digest, invoice_path, render_invoice_pdf, store_invoice
+from accounts.models import Payment
+
+
+def _render(item):
+    digest, data = item
+    return digest, data, render_invoice_pdf(data)
+
+
+class Command(BaseCommand):
+    help = "Pre-generate invoices for all completed payments in a month (defaults to last month)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Month to generate, as YYYY-MM")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Rendering processes (default: CPU count)")
+        parser.add_argument('--chunk-size', type=int, default=50,
+                            help="Invoices handed to each worker at a time")
+
+    def handle(self, *args, **options):
+        start, end = self.get_month_range(options['month'])
+
+        payments = Payment.objects.filter(
+            status='completed',
+            payment_date__date__gte=start,
+            payment_date__date__lt=end,
+        ).select_related('customer__profile__user', 'subscription__plan').order_by('pk')
+
+        # Only dispatch invoices that are not in storage yet
+        pending = {}
+        total = 0
+        for payment in payments.iterator(chunk_size=1000):
+            total += 1
+            data = build_invoice_data(payment)
+            digest = invoice_digest(data)
+            if not default_storage.exists(invoice_path(digest)):
+                pending[digest] = data
+
+        self.stdout.write(f"{total} payments in {start:%Y-%m}, {len(pending)} invoices to render")
+        if not pending:
+            return
+
+        # Forked workers must not inherit open database connections
+        connections.close_all()
+
+        created = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for digest, data, pdf_bytes in executor.map(
+                _render, pending.items(), chunksize=options['chunk_size']
+            ):
+                store_invoice(data, pdf_bytes)
+                created += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated {created} invoices"))
+
+    def get_month_range(self, month):
+        if month:
+            try:
+                year, month_number = (int(part) for part in month.split('-'))
+                start = date(year, month_number, 1)
+            except ValueError:
+                raise CommandError("--month must be in YYYY-MM format")
+        else:
+            first_of_this_month = timezone.now().date().replace(day=1)
+            start = (first_of_this_month - timedelta(days=1)).replace(day=1)
+
+        end = date(start.year + (start.month // 12), start.month % 12 + 1, 1)
+        return start, end
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts.images import generate_variants
+from accounts.models import Profile, TrainerProfile
+
+
+def _process(args):
+    name, force = args
+    try:
+        return name, generate_variants(name, force=force), None
+    except Exception as e:
+        return name, 0, str(e)
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG variants for existing profile pictures"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes (default: CPU count)")
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate variants that already exist")
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in (Profile, TrainerProfile):
+            names.update(
+                model.objects.exclude(profile_picture='')
+                .exclude(profile_picture__isnull=True)
+                .values_list('profile_picture', flat=True)
+            )
+
+        self.stdout.write(f"Processing {len(names)} profile pictures")
+        if not names:
+            return
+
+        # Workers only touch storage; do not share DB connections across fork
+        connections.close_all()
+
+        written = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for name, count, error in executor.map(
+                _process, [(name, options['force']) for name in sorted(names)], chunksize=8
+            ):
+                if error:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error}")
+                else:
+                    written += count
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} variants ({failed} failures)"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.otp_store import purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired pending signups (unverified OTP signups) in one statement. "
+        "Schedule it alongside clearsessions, e.g. hourly from cron."
+    )
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired pending signups"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from accounts.uploads import purge_stale
+
+
+class Command(BaseCommand):
+    help = (
+        "Discard chunked resource uploads that received no chunk for RESOURCE_UPLOAD_EXPIRY "
+        "seconds, deleting their partial files. Schedule it daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=None,
+                            help="Age in seconds (defaults to RESOURCE_UPLOAD_EXPIRY)")
+
+    def handle(self, *args, **options):
+        deleted = purge_stale(options['older_than'])
+        self.stdout.write(self.style.SUCCESS(f"Discarded {deleted} stale uploads"))
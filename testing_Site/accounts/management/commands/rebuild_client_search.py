@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from accounts import client_search
+from accounts.models import CustomerSearchTerm
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the customer search terms used by client typeahead, trainer_clients and the "
+        "customer admin. Saves keep them current; run this after bulk imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        client_search.rebuild(chunk_size=max(1, options['chunk_size']))
+        self.stdout.write(self.style.SUCCESS(f"Indexed {CustomerSearchTerm.objects.count()} search terms"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from accounts.search import get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the resource search index from scratch. Saves keep it current; run this "
+        "after bulk imports (bulk_create/update bypass the indexing signals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild(chunk_size=max(1, options['chunk_size']))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt resource search index ({type(backend).__name__})"))
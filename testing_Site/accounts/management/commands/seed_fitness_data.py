@@ -0,0 +1,234 @@
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts import client_search, entitlements, membership
+from accounts.cache_versions import bump_version
+from accounts.models import (
+    Profile, Customer, Trainer, SubscriptionPlan, CustomerSubscription, Payment,
+    TrainerAssignment, WorkoutProgress, Goal, Notification, TrainerMessage, Session,
+)
+
+SEED_PASSWORD = 'seed-password-123'
+
+PLANS = [
+    # name, price, days, trainer_support, premium_content
+    ('Basic', Decimal('19.99'), 30, False, False),
+    ('Pro', Decimal('39.99'), 30, True, False),
+    ('Elite', Decimal('99.99'), 90, True, True),
+]
+FIRST_NAMES = ['Ali', 'Sara', 'Omar', 'Ayesha', 'Bilal', 'Hina', 'Usman', 'Zara', 'Hamza', 'Maryam']
+LAST_NAMES = ['Khan', 'Ahmed', 'Malik', 'Hussain', 'Sheikh', 'Butt', 'Raza', 'Iqbal']
+NOTIFICATION_TYPES = [choice for choice, _ in Notification.NOTIFICATION_TYPE]
+GOAL_TYPES = [choice for choice, _ in Goal.GOAL_TYPES]
+PAYMENT_METHODS = [choice for choice, _ in Payment.PAYMENT_METHOD]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic customers, trainers, subscriptions, payments, sessions, progress and "
+        "notifications with bulk_create. The same --seed always produces the same data. "
+        f"Every seeded user has the password '{SEED_PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--trainers', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--chunk-size', type=int, default=500, help="Customers created per transaction")
+        parser.add_argument('--notifications', type=int, default=20, help="Notifications per customer")
+        parser.add_argument('--messages', type=int, default=10, help="Trainer messages per assigned customer")
+        parser.add_argument('--sessions', type=int, default=8, help="Sessions per assigned customer")
+        parser.add_argument('--progress-days', type=int, default=30, help="Daily progress entries per customer")
+        parser.add_argument('--payments', type=int, default=6, help="Payments per customer")
+        parser.add_argument('--anchor', help="Date the data is generated around, YYYY-MM-DD (default today)")
+        parser.add_argument('--prefix', default='seed', help="Username prefix of generated users")
+        parser.add_argument('--flush', action='store_true', help="Delete previously seeded users first")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.anchor = self.parse_anchor(options['anchor'])
+        self.password_hash = make_password(SEED_PASSWORD)
+
+        seeded = User.objects.filter(username__startswith=f"{self.prefix}_")
+        if seeded.exists():
+            if not options['flush']:
+                raise CommandError(f"Users with prefix '{self.prefix}_' exist; use --flush or another --prefix")
+            deleted, _ = seeded.delete()
+            self.stdout.write(f"Deleted {deleted} previously seeded rows")
+
+        plans = self.get_plans()
+        trainers = self.create_trainers(options['trainers'])
+        if not trainers:
+            raise CommandError("At least one trainer is required")
+
+        # Next free (date, time) slot per trainer; Session is unique on both
+        self.trainer_slots = {trainer.pk: 0 for trainer in trainers}
+
+        created = 0
+        chunk_size = max(1, options['chunk_size'])
+        while created < options['customers']:
+            count = min(chunk_size, options['customers'] - created)
+            with transaction.atomic():
+                self.create_customer_chunk(created, count, plans, trainers, options)
+            created += count
+            self.stdout.write(f"  {created}/{options['customers']} customers")
+
+        # bulk_create skips the signals that normally invalidate dashboard ETags
+        bump_version('user', *[trainer.profile.user_id for trainer in trainers])
+        membership.invalidate()
+        entitlements.invalidate_plans()
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['trainers']} trainers and {options['customers']} customers (seed {options['seed']})"
+        ))
+
+    def parse_anchor(self, value):
+        if not value:
+            return timezone.localdate()
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError("--anchor must be YYYY-MM-DD")
+
+    def get_plans(self):
+        plans = []
+        for name, price, days, trainer_support, premium in PLANS:
+            plan, _ = SubscriptionPlan.objects.get_or_create(
+                name=name,
+                defaults={
+                    'description': f'{name} membership', 'price': price, 'duration_days': days,
+                    'trainer_support': trainer_support, 'premium_content': premium,
+                    'personal_sessions': trainer_support, 'workout_videos': premium,
+                },
+            )
+            plans.append(plan)
+        return plans
+
+    def create_users(self, role, start, count):
+        users = User.objects.bulk_create([
+            User(
+                username=f"{self.prefix}_{role}_{start + i}",
+                email=f"{self.prefix}_{role}_{start + i}@example.com",
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                password=self.password_hash,
+            )
+            for i in range(count)
+        ])
+        return Profile.objects.bulk_create([
+            Profile(user=user, phone=f"+92300{self.rng.randrange(10**7):07d}", role=role) for user in users
+        ])
+
+    def create_trainers(self, count):
+        profiles = self.create_users('trainer', 0, count)
+        trainers = Trainer.objects.bulk_create([
+            Trainer(
+                profile=profile,
+                address=f"{self.rng.randint(1, 300)} Fitness Avenue, Lahore",
+                is_verified=True,
+                experience_years=self.rng.randint(1, 15),
+                hourly_rate=Decimal(self.rng.randrange(20, 80)),
+                specializations=self.rng.choice(['Strength', 'Yoga', 'HIIT', 'Nutrition']),
+            )
+            for profile in profiles
+        ])
+        for trainer, profile in zip(trainers, profiles):
+            trainer.profile = profile
+        return trainers
+
+    def next_slot(self, trainer):
+        offset = self.trainer_slots[trainer.pk]
+        self.trainer_slots[trainer.pk] = offset + 1
+        day, hour = divmod(offset, 10)
+        return self.anchor + timedelta(days=day - 30), time(8 + hour, 0)
+
+    def create_customer_chunk(self, start, count, plans, trainers, options):
+        rng = self.rng
+        profiles = self.create_users('customer', start, count)
+        customers = Customer.objects.bulk_create([
+            Customer(
+                profile=profile,
+                gender=rng.choice(['M', 'F', 'O']),
+                height=rng.randint(150, 200),
+                weight=rng.randint(50, 120),
+                fitness_level=rng.choice(['beginner', 'intermediate', 'advanced']),
+            )
+            for profile in profiles
+        ])
+        for customer, profile in zip(customers, profiles):
+            customer.profile = profile
+        client_search.index_customers(customers)
+
+        anchor_dt = timezone.make_aware(datetime.combine(self.anchor, time(12, 0)))
+        subscriptions = []
+        for customer in customers:
+            plan = rng.choice(plans)
+            started = anchor_dt - timedelta(days=rng.randint(0, plan.duration_days - 1))
+            subscriptions.append(CustomerSubscription(
+                customer=customer, plan=plan, start_date=started,
+                end_date=started + timedelta(days=plan.duration_days),
+                is_active=True, auto_renew=rng.random() < 0.5,
+            ))
+        CustomerSubscription.objects.bulk_create(subscriptions)
+
+        payments, notifications, progress, goals = [], [], [], []
+        assignments, messages, sessions = [], [], []
+        for customer, subscription in zip(customers, subscriptions):
+            for i in range(options['payments']):
+                payments.append(Payment(
+                    customer=customer, subscription=subscription, amount=subscription.plan.price,
+                    payment_method=rng.choice(PAYMENT_METHODS),
+                    status='completed' if rng.random() < 0.9 else 'failed',
+                    transaction_id=f"{self.prefix}-{customer.pk}-{i}",
+                    payment_date=anchor_dt - timedelta(days=30 * i),
+                ))
+            for i in range(options['notifications']):
+                notifications.append(Notification(
+                    customer=customer, title=f"Update #{i + 1}", message="Synthetic notification",
+                    notification_type=rng.choice(NOTIFICATION_TYPES), is_read=rng.random() < 0.6,
+                ))
+            weight = Decimal(customer.weight)
+            for day in range(options['progress_days']):
+                weight += Decimal(rng.choice(['-0.3', '-0.1', '0.0', '0.1']))
+                progress.append(WorkoutProgress(
+                    customer=customer, date=self.anchor - timedelta(days=day),
+                    weight=weight, sessions_attended=rng.randint(0, 2),
+                ))
+            for i in range(rng.randint(1, 4)):
+                goals.append(Goal(
+                    customer=customer, title=f"Goal {i + 1}", description="Synthetic goal",
+                    goal_type=rng.choice(GOAL_TYPES), target_value=Decimal(rng.randint(10, 100)),
+                    current_value=Decimal(rng.randint(0, 10)), status='active', is_active=True,
+                ))
+
+            if not subscription.plan.trainer_support:
+                continue
+            trainer = rng.choice(trainers)
+            assignments.append(TrainerAssignment(customer=customer, trainer=trainer))
+            for i in range(options['messages']):
+                messages.append(TrainerMessage(
+                    customer=customer, trainer=trainer, subject=f"Check-in {i + 1}",
+                    message="Synthetic message", content="Synthetic message", is_read=rng.random() < 0.5,
+                ))
+            for _ in range(options['sessions']):
+                session_date, session_time = self.next_slot(trainer)
+                upcoming = session_date >= self.anchor
+                sessions.append(Session(
+                    customer=customer, trainer=trainer, session_date=session_date, session_time=session_time,
+                    status=rng.choice(['scheduled', 'confirmed']) if upcoming
+                    else rng.choice(['completed', 'completed', 'cancelled', 'no_show']),
+                    is_confirmed=not upcoming or rng.random() < 0.5,
+                ))
+
+        for model, objs in (
+            (Payment, payments), (Notification, notifications), (WorkoutProgress, progress),
+            (Goal, goals), (TrainerAssignment, assignments), (TrainerMessage, messages), (Session, sessions),
+        ):
+            model.objects.bulk_create(objs, batch_size=1000)
@@ -0,0 +1,128 @@
+import importlib.util
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.profiling import percentile
+
+PASSWORD = 'correct horse battery staple'
+
+
+def make_hasher(base, params):
+    hasher = base()
+    for name, value in params.items():
+        setattr(hasher, name, value)
+    return hasher
+
+
+def time_hash(hasher, samples):
+    """Median seconds for one encode() with the given parameters"""
+    salt = hasher.salt()
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.encode(PASSWORD, salt)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password hashing cost on this machine and print PASSWORD_HASHER_PARAMS "
+        "for the strongest parameters that fit a per-hash latency budget"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithm', choices=['argon2', 'scrypt', 'pbkdf2'], default='scrypt')
+        parser.add_argument('--budget-ms', type=float, default=100, help="Target time for one hash")
+        parser.add_argument('--samples', type=int, default=3)
+        parser.add_argument('--burst', type=int, default=16,
+                            help="Concurrent logins simulated to report p99 under load")
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help="Hashes allowed at once during the burst (PASSWORD_HASH_CONCURRENCY)")
+
+    def handle(self, *args, **options):
+        budget = options['budget_ms'] / 1000
+        tune = getattr(self, f"tune_{options['algorithm']}")
+        base, key, params, seconds = tune(budget, options['samples'])
+        if params is None:
+            raise CommandError("Even the cheapest parameters exceed the budget; raise --budget-ms")
+
+        self.stdout.write(f"Chosen {key} parameters: {params} ({seconds * 1000:.1f} ms per hash)")
+        self.report_burst(make_hasher(base, params), options['burst'], options['concurrency'])
+
+        profile = 'pbkdf2' if key == 'pbkdf2_sha256' else key
+        self.stdout.write("\nSet in the environment:")
+        self.stdout.write(f"  PASSWORD_HASHER_PROFILE={profile}")
+        self.stdout.write(f"  PASSWORD_HASHER_PARAMS='{json.dumps({key: params})}'")
+
+    def pick(self, base, candidates, budget, samples):
+        """Strongest candidate (candidates are ordered weakest first) within budget"""
+        chosen, chosen_time = None, None
+        for params in candidates:
+            seconds = time_hash(make_hasher(base, params), samples)
+            self.stdout.write(f"  {params}: {seconds * 1000:.1f} ms")
+            if seconds > budget:
+                break
+            chosen, chosen_time = params, seconds
+        return chosen, chosen_time
+
+    def tune_argon2(self, budget, samples):
+        if importlib.util.find_spec('argon2') is None:
+            raise CommandError("argon2-cffi is not installed (pip install argon2-cffi)")
+        # OWASP-style ladder: raise memory first, then passes
+        candidates = [
+            {'memory_cost': memory, 'time_cost': passes, 'parallelism': 1}
+            for memory in (19456, 47104, 65536, 131072)
+            for passes in (1, 2, 3)
+        ]
+        candidates.sort(key=lambda p: p['memory_cost'] * p['time_cost'])
+        params, seconds = self.pick(Argon2PasswordHasher, candidates, budget, samples)
+        return Argon2PasswordHasher, 'argon2', params, seconds
+
+    def tune_scrypt(self, budget, samples):
+        candidates = [
+            {'work_factor': 2 ** n, 'block_size': 8, 'parallelism': 1, 'maxmem': 2 ** n * 8 * 128 * 2}
+            for n in range(12, 21)
+        ]
+        params, seconds = self.pick(ScryptPasswordHasher, candidates, budget, samples)
+        return ScryptPasswordHasher, 'scrypt', params, seconds
+
+    def tune_pbkdf2(self, budget, samples):
+        # Cost is linear in iterations: measure once and scale
+        probe = 100_000
+        seconds = time_hash(make_hasher(PBKDF2PasswordHasher, {'iterations': probe}), samples)
+        iterations = int(probe * budget / seconds) // 10_000 * 10_000
+        if iterations < 10_000:
+            return PBKDF2PasswordHasher, 'pbkdf2_sha256', None, None
+        params = {'iterations': iterations}
+        return PBKDF2PasswordHasher, 'pbkdf2_sha256', params, seconds * iterations / probe
+
+    def report_burst(self, hasher, burst, concurrency):
+        """Latency of burst simultaneous verifications, optionally throttled"""
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+
+        def verify(_):
+            start = time.perf_counter()
+            if slots is None:
+                hasher.verify(PASSWORD, encoded)
+            else:
+                with slots:
+                    hasher.verify(PASSWORD, encoded)
+            return (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=burst) as executor:
+            latencies = sorted(executor.map(verify, range(burst)))
+
+        self.stdout.write(
+            f"Burst of {burst} logins (concurrency {concurrency or 'unlimited'}): "
+            f"p50 {percentile(latencies, 50):.1f} ms, p99 {percentile(latencies, 99):.1f} ms"
+        )
@@ -0,0 +1,52 @@
+import os
+import re
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.static_assets import VENDOR_ASSETS
+
+SOURCE_MAP_RE = re.compile(rb'\n?/[*/]# sourceMappingURL=[^\n]*')
+
+
+class Command(BaseCommand):
+    help = "Download the CDN libraries used by the templates into static/vendor"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Re-download files that already exist")
+
+    def handle(self, *args, **options):
+        if not settings.STATICFILES_DIRS:
+            raise CommandError("STATICFILES_DIRS is empty; nowhere to vendor assets")
+        static_dir = settings.STATICFILES_DIRS[0]
+
+        downloads = {}
+        for asset in VENDOR_ASSETS.values():
+            downloads[asset['path']] = asset['url']
+            downloads.update(asset.get('extra', {}))
+
+        fetched = 0
+        for path, url in sorted(downloads.items()):
+            target = os.path.join(static_dir, *path.split('/'))
+            if os.path.exists(target) and not options['force']:
+                continue
+
+            self.stdout.write(f"Fetching {url}")
+            try:
+                with urlopen(url, timeout=30) as response:
+                    content = response.read()
+            except OSError as e:
+                raise CommandError(f"Could not download {url}: {e}")
+
+            # Source maps are not vendored; a dangling reference would break
+            # ManifestStaticFilesStorage post-processing.
+            if path.endswith(('.css', '.js')):
+                content = SOURCE_MAP_RE.sub(b'', content)
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(content)
+            fetched += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Vendored {fetched} files into {static_dir}/vendor"))
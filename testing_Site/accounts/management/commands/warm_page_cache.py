@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from accounts.page_cache import CACHED_PAGES, invalidate_page_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Invalidate the anonymous full-page cache and pre-render the cached pages. "
+        "Run after every deploy (after collectstatic) so visitors never get HTML "
+        "pointing at old static file hashes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-invalidate', action='store_true', help="Only fill missing entries")
+
+    def handle(self, *args, **options):
+        if not options['no_invalidate']:
+            invalidate_page_cache()
+            self.stdout.write("Page cache invalidated")
+
+        hosts = [h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*']
+        client = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+
+        for name in CACHED_PAGES:
+            path = reverse(name)
+            response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}")
+            self.stdout.write(f"{path}: {response.get('X-Page-Cache', 'not cached')}")
+
+        self.stdout.write(self.style.SUCCESS(f"Warmed {len(CACHED_PAGES)} pages"))
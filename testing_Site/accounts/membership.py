@@ -0,0 +1,169 @@
+# membership.py - Bloom filter over registered usernames and emails
+#
+# might_exist() answers "definitely not registered" from memory, so the
+# availability checks only query the database when the filter says "maybe".
+# Each process keeps its own filter, built on first use from User and
+# TrainerRegistration (the database is not available in AppConfig.ready()).
+# Creating a user or registration adds it locally, bumps a generation
+# counter in the cache and stores the new items under that generation; other
+# processes see the new generation on their next check and add the items
+# they missed, rebuilding from the tables only if some have expired (or
+# after invalidate(), which publishes no items). That only works with SHARED_CACHE: with per-process
+# LocMem caches the other workers never see the bump, so without it
+# might_exist() always answers "maybe". Even then a check can race a signup
+# in another process, so the filter only serves the read-only availability
+# checks; code about to insert a user queries the database itself.
+# Bulk inserts skip post_save and must call invalidate() themselves.
+
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+GENERATION_KEY = 'membership:generation'
+ADDED_KEY = 'membership:added:{}'
+# Items recorded per generation are kept this long for other processes to catch up
+ADDED_TIMEOUT = 60 * 60
+# Further behind than this many generations, a rebuild is cheaper than catching up
+MAX_CATCH_UP = 1000
+MIN_CAPACITY = 10_000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+_filter = None
+_generation = None
+_lock = threading.Lock()
+
+
+def _item(kind, value):
+    # Case-insensitive on purpose: extra "maybe" answers only cost a query
+    return f"{kind}:{value.strip().lower()}"
+
+
+def _current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 0, None)
+        generation = cache.get(GENERATION_KEY, 0)
+    return generation
+
+
+def _build():
+    from django.contrib.auth.models import User
+    from .models import TrainerRegistration
+
+    total = User.objects.count() + TrainerRegistration.objects.count()
+    bloom = BloomFilter(
+        capacity=max(MIN_CAPACITY, total * 2),
+        error_rate=getattr(settings, 'MEMBERSHIP_FILTER_ERROR_RATE', 0.01),
+    )
+    for username, email in User.objects.values_list('username', 'email').iterator(chunk_size=5000):
+        bloom.add(_item('username', username))
+        if email:
+            bloom.add(_item('email', email))
+    for email in TrainerRegistration.objects.values_list('email', flat=True).iterator(chunk_size=5000):
+        bloom.add(_item('email', email))
+    return bloom
+
+
+def _catch_up(bloom, start, end):
+    """Add the items recorded in generations start+1..end; False if some are gone"""
+    if end - start > MAX_CATCH_UP:
+        return False
+    keys = [ADDED_KEY.format(generation) for generation in range(start + 1, end + 1)]
+    added = cache.get_many(keys)
+    if len(added) != len(keys):
+        return False
+    for items in added.values():
+        for item in items:
+            bloom.add(item)
+    return True
+
+
+def _get_filter():
+    global _filter, _generation
+    generation = _current_generation()
+    bloom = _filter
+    if bloom is None or generation != _generation or bloom.count > bloom.capacity:
+        with _lock:
+            if _filter is None or _filter.count > _filter.capacity:
+                _filter, _generation = _build(), generation
+            elif generation != _generation:
+                if generation > _generation and _catch_up(_filter, _generation, generation):
+                    _generation = generation
+                else:
+                    _filter, _generation = _build(), generation
+            bloom = _filter
+    return bloom
+
+
+def might_exist(kind, value):
+    """False only if no user/registration has this 'username' or 'email'"""
+    if not value:
+        return False
+    if not getattr(settings, 'SHARED_CACHE', False):
+        return True
+    return _item(kind, value) in _get_filter()
+
+
+def record(**values):
+    """Make sure a saved account is in the filter, e.g. record(username='ali', email='ali@example.com').
+
+    Values already present cost no cache write; new ones are published so
+    other processes add them without a rebuild.
+    """
+    global _generation
+    if not getattr(settings, 'SHARED_CACHE', False):
+        return
+    items = [_item(kind, value) for kind, value in values.items() if value]
+    bloom = _get_filter()
+    missing = [item for item in items if item not in bloom]
+    if not missing:
+        return
+    try:
+        generation = cache.incr(GENERATION_KEY)
+    except ValueError:
+        invalidate()
+        return
+    cache.set(ADDED_KEY.format(generation), missing, ADDED_TIMEOUT)
+    with _lock:
+        for item in missing:
+            _filter.add(item)
+        # Only adopt the new generation if nobody else bumped it in between
+        if generation == _generation + 1:
+            _generation = generation
+
+
+def invalidate():
+    """Make every process rebuild its filter (after bulk inserts or deletes)"""
+    if not cache.add(GENERATION_KEY, 1, None):
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
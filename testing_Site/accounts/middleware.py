@@ -0,0 +1,154 @@
+# middleware.py - Response compression and HTTP caching for the accounts app
+
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.middleware.csrf import get_token
+from django.middleware.gzip import GZipMiddleware
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+from .cache_versions import get_version
+
+# Dashboard pages whose HTML depends only on data covered by the per-user
+# version stamp (see signals.py), so a matching ETag can skip the view.
+DEFAULT_VERSIONED_VIEWS = {
+    'customer_dashboard', 'customer_profile', 'subscription_details', 'subscription_plans',
+    'payment_history', 'trainer_info', 'workout_progress', 'goals_management',
+    'resources_downloads', 'notifications_list', 'customer_messages',
+    'trainer_dashboard', 'trainer_clients', 'trainer_client_detail', 'view_client_progress',
+    'trainer_sessions', 'trainer_schedule', 'trainer_messages', 'trainer_progress',
+    'trainer_resources', 'trainer_reports', 'trainer_profile',
+}
+
+# Anonymous pages without per-visitor content (no form, no CSRF token)
+DEFAULT_PUBLIC_VIEWS = {'home', 'select_signup'}
+
+
+# Content types worth compressing; images, fonts, video and archives are
+# compressed already (text/* is always included)
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'application/xml',
+    'application/x-javascript', 'image/svg+xml',
+}
+
+
+def _compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return (
+        content_type.startswith('text/')
+        or content_type in COMPRESSIBLE_TYPES
+        or content_type.endswith(('+json', '+xml'))
+    )
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware with a configurable minimum size (GZIP_MIN_LENGTH).
+
+    Django's own cut-off is 200 bytes; below about 1KB the gzip header and
+    CPU time outweigh the saving for our HTML and JSON responses. Only text
+    types are compressed, so FileResponses of images, fonts or videos are
+    passed through untouched.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not _compressible(response):
+            return response
+        min_length = getattr(settings, 'GZIP_MIN_LENGTH', 1024)
+        if not response.streaming and len(response.content) < min_length:
+            return response
+        return super().process_response(request, response)
+
+
+def _url_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.url_name if match else None
+
+
+class UserVersionETagMiddleware:
+    """Conditional GET for authenticated dashboard pages.
+
+    The ETag is built from the user's page version stamp, which signals bump
+    whenever data shown on their pages changes, so a revalidation hit returns
+    304 before the view runs any queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_names = set(getattr(settings, 'USER_ETAG_VIEWS', DEFAULT_VERSIONED_VIEWS))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        etag = getattr(request, '_user_page_etag', None)
+        if etag and response.status_code == 200 and not response.has_header('ETag'):
+            response['ETag'] = etag
+            # Browsers may keep the page but must revalidate it every time
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated:
+            return None
+        if _url_name(request) not in self.view_names:
+            return None
+        # Pending flash messages are rendered once; never answer 304 over them
+        storage = getattr(request, '_messages', None)
+        if storage is not None and len(storage):
+            return None
+
+        etag = self.compute_etag(request)
+        request._user_page_etag = etag
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return None
+
+    def compute_etag(self, request):
+        # get_token() returns a freshly masked token on every call; the ETag
+        # uses the underlying secret, which any masked copy validates against.
+        get_token(request)
+        parts = [
+            str(request.user.pk),
+            request.get_full_path(),
+            repr(get_version('user', request.user.pk)),
+            repr(get_version('site', 'content')),
+            # Pages embed the CSRF token and "days remaining" style values
+            request.META.get('CSRF_COOKIE', ''),
+            timezone.localdate().isoformat(),
+        ]
+        digest = hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+        return f'W/"{digest}"'
+
+
+class PublicPageCacheMiddleware:
+    """Cache-Control/Vary for anonymous pages that are identical for every visitor.
+
+    Responses are marked public for PUBLIC_PAGE_MAX_AGE seconds and vary on
+    Cookie, so a shared cache never hands the anonymous copy to a logged-in
+    user (smart_home redirects them to their dashboard).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_names = set(getattr(settings, 'PUBLIC_CACHE_VIEWS', DEFAULT_PUBLIC_VIEWS))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if _url_name(request) not in self.view_names:
+            return response
+
+        patch_vary_headers(response, ('Cookie',))
+        if (
+            request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and not request.user.is_authenticated
+            and not response.cookies
+        ):
+            patch_cache_control(response, public=True, max_age=getattr(settings, 'PUBLIC_PAGE_MAX_AGE', 300))
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_customersubscription_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('session_time', models.TimeField()),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('biweekly', 'Every 2 Weeks')], default='weekly', max_length=20)),
+                ('occurrences', models.PositiveIntegerField(default=1)),
+                ('duration_minutes', models.PositiveIntegerField(default=60)),
+                ('session_type', models.CharField(default='personal', max_length=20)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_series', to='accounts.customer')),
+                ('trainer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_series', to='accounts.trainer')),
+            ],
+            options={
+                'verbose_name': 'Session Series',
+                'verbose_name_plural': 'Session Series',
+                'db_table': 'session_series',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='accounts.sessionseries'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_sessionseries_session_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingSignup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True)),
+                ('email', models.EmailField(max_length=254)),
+                ('data', models.JSONField()),
+                ('otp_digest', models.CharField(max_length=64)),
+                ('otp_expires_at', models.DateTimeField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'pending_signup',
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:00
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_search_table(apps, schema_editor):
+    """FTS5 index for accounts.search; skipped where SQLite FTS5 is unavailable"""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    Resource = apps.get_model('accounts', 'Resource')
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS resource_search USING fts5("
+                "title, description, category, tokenize='porter unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            # SQLite built without FTS5: accounts.search falls back to the ORM backend
+            return
+        cursor.executemany(
+            "INSERT INTO resource_search (rowid, title, description, category) VALUES (%s, %s, %s, %s)",
+            [
+                (pk, title, description or '', category or '')
+                for pk, title, description, category in Resource.objects.values_list(
+                    'pk', 'title', 'description', 'category__name',
+                ).iterator()
+            ],
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS resource_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_pendingsignup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:00
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+EMAIL_SPLIT_RE = re.compile(r'[._+-]+')
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower().strip()
+
+
+def index_existing_customers(apps, schema_editor):
+    # Same tokens as accounts.client_search.terms_for_user, frozen for this migration
+    Customer = apps.get_model('accounts', 'Customer')
+    CustomerSearchTerm = apps.get_model('accounts', 'CustomerSearchTerm')
+    rows = []
+    for customer_id, first, last, username, email in Customer.objects.values_list(
+        'pk', 'profile__user__first_name', 'profile__user__last_name',
+        'profile__user__username', 'profile__user__email',
+    ).iterator():
+        terms = set(_normalize(first).split()) | set(_normalize(last).split()) | {_normalize(username)}
+        email = _normalize(email)
+        if email:
+            terms.add(email)
+            terms.update(EMAIL_SPLIT_RE.split(email.split('@', 1)[0]))
+        rows.extend(CustomerSearchTerm(customer_id=customer_id, term=term[:255]) for term in terms if term)
+    CustomerSearchTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_resource_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=255)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='accounts.customer')),
+            ],
+            options={
+                'db_table': 'customer_search_term',
+                'indexes': [models.Index(fields=['term', 'customer'], name='customer_search_term_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_customers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_customersearchterm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='resource_catalog_idx'),
+        ),
+    ]
@@ -6,6 +6,8 @@ from datetime import timedelta
 from decimal import Decimal
 import json
 
+from .cache_versions import touch_session_calendars
+
 class TrainerRegistration(models.Model):
     # Email as primary key
     email = models.EmailField(primary_key=True, unique=True, max_length=255)
@@ -80,66 +82,41 @@ class TrainerRegistration(models.Model):
     def __str__(self):
         return f"{self.username} ({self.email}) - {self.get_status_display()}"
     
-    def save(self, *args, **kwargs):
-        # Hash password before saving if it's not already hashed
-        from django.contrib.auth.hashers import make_password, check_password
-        
-        if self.password and not self.password.startswith('pbkdf2_'):
-            self.password = make_password(self.password)
-        
-        super().save(*args, **kwargs)
-    
     def set_password(self, raw_password):
         """Set password using Django's password hashing"""
         from django.contrib.auth.hashers import make_password
         self.password = make_password(raw_password)
     
     def check_password(self, raw_password):
-        """Check password using Django's password verification"""
+        """Check password, upgrading the stored hash if the hasher profile changed"""
         from django.contrib.auth.hashers import check_password
-        return check_password(raw_password, self.password)
+        
+        def setter(raw_password):
+            self.set_password(raw_password)
+            TrainerRegistration.objects.filter(pk=self.pk).update(password=self.password)
+        
+        return check_password(raw_password, self.password, setter)
     
     def approve_registration(self, admin_user):
         """Approve trainer registration and create user account"""
-        from django.contrib.auth.models import User
-        
-        if self.status == 'approved':
-            return False, "Registration is already approved"
-        
-        try:
-            # Create Django User account
-            user = User.objects.create_user(
-                username=self.email,  # Using email as username
-                email=self.email,
-                password=None  # We'll set this separately
-            )
-            
-            # Set the hashed password from registration
-            user.password = self.password
-            user.first_name = self.username.split()[0] if self.username else ""
-            user.last_name = " ".join(self.username.split()[1:]) if len(self.username.split()) > 1 else ""
-            user.save()
-            
-            # Update registration status
-            self.status = 'approved'
-            self.approved_by = admin_user
-            self.approval_date = timezone.now()
-            self.user_account = user
-            self.save()
-            
+        from .approvals import approve_registrations
+
+        result = approve_registrations(TrainerRegistration.objects.filter(pk=self.pk), admin_user)[0]
+        self.refresh_from_db()
+        if result['status'] == 'approved':
             return True, "Trainer account created successfully"
-            
-        except Exception as e:
-            return False, f"Error creating account: {str(e)}"
+        if result['status'] == 'skipped':
+            return False, "Registration is already approved"
+        return False, f"Error creating account: {result['detail']}"
     
     def reject_registration(self, admin_user, reason=""):
         """Reject trainer registration"""
-        self.status = 'rejected'
-        self.approved_by = admin_user
-        self.approval_date = timezone.now()
-        self.rejection_reason = reason
-        self.save()
-        
+        from .approvals import reject_registrations
+
+        result = reject_registrations(TrainerRegistration.objects.filter(pk=self.pk), admin_user, reason)[0]
+        self.refresh_from_db()
+        if result['status'] == 'skipped':
+            return False, "Registration is already approved"
         return True, "Registration rejected successfully"
 
 
@@ -246,6 +223,17 @@ class Customer(models.Model):
         return self.profile.user.get_full_name() or self.profile.user.username
 
 
+class TrainerQuerySet(models.QuerySet):
+    def with_client_counts(self):
+        """Annotate active_clients and total_clients with one grouped query"""
+        return self.select_related('profile__user').annotate(
+            active_clients=models.Count(
+                'assigned_customers', filter=models.Q(assigned_customers__is_active=True)
+            ),
+            total_clients=models.Count('assigned_customers'),
+        )
+
+
 class Trainer(models.Model):
     """Trainer-specific profile (legacy model)"""
     profile = models.OneToOneField(Profile, on_delete=models.CASCADE, related_name='trainer')
@@ -260,6 +248,8 @@ class Trainer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TrainerQuerySet.as_manager()
+    
     class Meta:
         db_table = 'trainers'
         verbose_name = 'Trainer'
@@ -521,6 +511,10 @@ class Resource(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        # Keyset pagination of the catalog (accounts.catalog)
+        indexes = [models.Index(fields=['is_active', '-created_at', '-id'], name='resource_catalog_idx')]
+    
     def save(self, *args, **kwargs):
         # Sync file_url with external_url for compatibility
         if self.external_url and not self.file_url:
@@ -593,6 +587,140 @@ class TrainerMessage(models.Model):
         return f"Message from {self.trainer} to {self.customer}"
 
 
+class SessionSeries(models.Model):
+    """Recurring training sessions materialized as individual Session rows"""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('biweekly', 'Every 2 Weeks'),
+    ]
+    
+    FREQUENCY_DAYS = {
+        'daily': 1,
+        'weekly': 7,
+        'biweekly': 14,
+    }
+    
+    MAX_OCCURRENCES = 52
+    
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='session_series')
+    trainer = models.ForeignKey(Trainer, on_delete=models.CASCADE, related_name='session_series')
+    start_date = models.DateField()
+    session_time = models.TimeField()
+    frequency = models.CharField(max_length=20, choices=FREQUENCY_CHOICES, default='weekly')
+    occurrences = models.PositiveIntegerField(default=1)
+    duration_minutes = models.PositiveIntegerField(default=60)
+    session_type = models.CharField(max_length=20, default='personal')
+    notes = models.TextField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'session_series'
+        verbose_name = 'Session Series'
+        verbose_name_plural = 'Session Series'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.customer} - {self.get_frequency_display()} x{self.occurrences} from {self.start_date}"
+    
+    def occurrence_dates(self):
+        """Dates of every occurrence in the series"""
+        step = timedelta(days=self.FREQUENCY_DAYS.get(self.frequency, 7))
+        return [self.start_date + step * i for i in range(self.occurrences)]
+    
+    def materialize(self):
+        """Create the Session rows for this series in bulk.
+        
+        Occurrences are checked against the trainer's existing bookings with a
+        single range query; slots that are already taken are skipped. Returns
+        the created sessions and the list of skipped dates.
+        """
+        dates = self.occurrence_dates()
+        if not dates:
+            return [], []
+        
+        # Every existing row blocks the slot (unique on trainer/date/time)
+        taken = set(Session.objects.filter(
+            trainer=self.trainer,
+            session_time=self.session_time,
+            session_date__range=(dates[0], dates[-1])
+        ).values_list('session_date', flat=True))
+        
+        sessions = [
+            Session(
+                customer=self.customer,
+                trainer=self.trainer,
+                series=self,
+                session_date=session_date,
+                session_time=self.session_time,
+                duration_minutes=self.duration_minutes,
+                session_type=self.session_type,
+                status='scheduled',
+                notes=self.notes,
+            )
+            for session_date in dates if session_date not in taken
+        ]
+        skipped = [session_date for session_date in dates if session_date in taken]
+        
+        Session.objects.bulk_create(sessions)
+        
+        if sessions:
+            touch_session_calendars(trainer_ids=[self.trainer_id], customer_ids=[self.customer_id])
+            Notification.objects.create(
+                customer=self.customer,
+                title="New Recurring Sessions Scheduled",
+                message=(
+                    f"Your trainer has scheduled {len(sessions)} {self.get_frequency_display().lower()} "
+                    f"{self.session_type} sessions at {self.session_time.strftime('%H:%M')}, "
+                    f"from {sessions[0].session_date} to {sessions[-1].session_date}."
+                ),
+                notification_type='session'
+            )
+        
+        return sessions, skipped
+    
+    def upcoming_sessions(self):
+        """Future occurrences that can still be edited or cancelled"""
+        return self.sessions.filter(
+            session_date__gte=timezone.now().date(),
+            status__in=['scheduled', 'confirmed']
+        )
+    
+    def update_upcoming(self, **fields):
+        """Apply field changes to the series and all upcoming occurrences"""
+        allowed = {key: value for key, value in fields.items()
+                   if key in ('duration_minutes', 'session_type', 'notes')}
+        if not allowed:
+            return 0
+        
+        for key, value in allowed.items():
+            setattr(self, key, value)
+        self.save(update_fields=list(allowed))
+        
+        updated = self.upcoming_sessions().update(**allowed)
+        if updated:
+            touch_session_calendars(trainer_ids=[self.trainer_id], customer_ids=[self.customer_id])
+        return updated
+    
+    def cancel_series(self):
+        """Cancel all upcoming occurrences and deactivate the series"""
+        cancelled = self.upcoming_sessions().update(status='cancelled', is_confirmed=False)
+        self.is_active = False
+        self.save(update_fields=['is_active'])
+        
+        if cancelled:
+            touch_session_calendars(trainer_ids=[self.trainer_id], customer_ids=[self.customer_id])
+            Notification.objects.create(
+                customer=self.customer,
+                title="Recurring Sessions Cancelled",
+                message=f"Your trainer has cancelled {cancelled} upcoming sessions from your recurring schedule.",
+                notification_type='session'
+            )
+        
+        return cancelled
+
+
 class Session(models.Model):
     """Training sessions"""
     SESSION_STATUS = [
@@ -612,6 +740,13 @@ class Session(models.Model):
     
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='sessions')
     trainer = models.ForeignKey(Trainer, on_delete=models.CASCADE, related_name='sessions')
+    series = models.ForeignKey(
+        SessionSeries,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sessions'
+    )
     session_date = models.DateField()
     session_time = models.TimeField()
     duration_minutes = models.PositiveIntegerField(default=60)
@@ -652,4 +787,58 @@ class TrainerRating(models.Model):
         unique_together = ('customer', 'trainer')
     
     def __str__(self):
-        return f"{self.customer} rated {self.trainer}: {self.rating} stars"
\ No newline at end of file
+        return f"{self.customer} rated {self.trainer}: {self.rating} stars"
+
+
+class PendingSignup(models.Model):
+    """Signup waiting for email OTP verification (see accounts.otp_store)"""
+    token = models.CharField(max_length=64, unique=True)
+    email = models.EmailField()
+    # username, phone, role, address and the already-hashed password
+    data = models.JSONField()
+    otp_digest = models.CharField(max_length=64)
+    otp_expires_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'pending_signup'
+
+    def __str__(self):
+        return f"{self.email} (expires {self.expires_at:%Y-%m-%d %H:%M})"
+
+
+class CustomerSearchTerm(models.Model):
+    """Normalized name/username/email tokens for prefix search (see accounts.client_search)"""
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=255)
+
+    class Meta:
+        db_table = 'customer_search_term'
+        indexes = [models.Index(fields=['term', 'customer'], name='customer_search_term_idx')]
+
+    def __str__(self):
+        return self.term
+
+
+class ResourceUpload(models.Model):
+    """Chunked upload of a Resource file in progress (see accounts.uploads)"""
+    token = models.CharField(max_length=64, unique=True)
+    # Set when the upload replaces an existing resource's file
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, null=True, blank=True, related_name='uploads')
+    # Fields of the Resource created on completion when resource is empty
+    metadata = models.JSONField(default=dict, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    received = models.PositiveBigIntegerField(default=0)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        db_table = 'resource_upload'
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
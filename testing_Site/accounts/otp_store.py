@@ -0,0 +1,114 @@
+# otp_store.py - Pending signups and their OTPs, kept out of the session
+#
+# signup_customer/signup_trainer store a PendingSignup row and give the
+# browser an opaque token in a cookie; verify_otp and resend_otp find the
+# row by that token. Nothing is written to request.session, the password is
+# hashed before it is stored and the OTP itself is only kept as an HMAC.
+# Expired rows are deleted in bulk by `manage.py purge_pending_signups`.
+
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import PendingSignup
+
+SIGNUP_COOKIE = 'signup_token'
+OTP_LIFETIME = timedelta(minutes=5)
+# How long a visitor can keep resending OTPs before signing up again
+SIGNUP_LIFETIME = timedelta(minutes=30)
+MAX_OTP_ATTEMPTS = 5
+
+
+def _new_otp():
+    return str(100000 + secrets.randbelow(900000))
+
+
+def _otp_digest(token, otp):
+    return salted_hmac('accounts.otp_store', f"{token}:{otp}", algorithm='sha256').hexdigest()
+
+
+def start_signup(data):
+    """Store cleaned signup data and return (pending, otp) for the email"""
+    payload = {key: value for key, value in data.items() if key != 'password'}
+    payload['password'] = make_password(data['password'])
+    token = secrets.token_urlsafe(32)
+    otp = _new_otp()
+    now = timezone.now()
+    pending = PendingSignup.objects.create(
+        token=token,
+        email=data['email'],
+        data=payload,
+        otp_digest=_otp_digest(token, otp),
+        otp_expires_at=now + OTP_LIFETIME,
+        expires_at=now + SIGNUP_LIFETIME,
+    )
+    return pending, otp
+
+
+def get_signup_token(request):
+    return request.COOKIES.get(SIGNUP_COOKIE)
+
+
+def get_pending(request):
+    """The visitor's unexpired PendingSignup, or None"""
+    token = get_signup_token(request)
+    if not token:
+        return None
+    return PendingSignup.objects.filter(token=token, expires_at__gt=timezone.now()).first()
+
+
+def check_otp(pending, otp):
+    """Return 'ok', 'invalid', 'expired' or 'locked'.
+
+    The attempt is reserved with a conditional UPDATE before comparing, so
+    parallel guesses cannot get past MAX_OTP_ATTEMPTS.
+    """
+    if timezone.now() > pending.otp_expires_at:
+        return 'expired'
+    reserved = PendingSignup.objects.filter(
+        pk=pending.pk, attempts__lt=MAX_OTP_ATTEMPTS,
+    ).update(attempts=F('attempts') + 1)
+    if not reserved:
+        return 'locked'
+    if otp and constant_time_compare(_otp_digest(pending.token, otp.strip()), pending.otp_digest):
+        return 'ok'
+    return 'invalid'
+
+
+def renew_otp(pending):
+    """Issue a new OTP for the pending signup and reset its attempts"""
+    otp = _new_otp()
+    pending.otp_digest = _otp_digest(pending.token, otp)
+    pending.otp_expires_at = timezone.now() + OTP_LIFETIME
+    pending.attempts = 0
+    pending.save(update_fields=['otp_digest', 'otp_expires_at', 'attempts'])
+    return otp
+
+
+def finish(pending):
+    PendingSignup.objects.filter(pk=pending.pk).delete()
+
+
+def purge_expired():
+    """Delete every expired pending signup in one statement; returns the count"""
+    deleted, _ = PendingSignup.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def set_signup_cookie(response, pending):
+    response.set_cookie(
+        SIGNUP_COOKIE, pending.token,
+        max_age=int(SIGNUP_LIFETIME.total_seconds()),
+        httponly=True, samesite='Lax', secure=settings.SESSION_COOKIE_SECURE,
+    )
+    return response
+
+
+def clear_signup_cookie(response):
+    response.delete_cookie(SIGNUP_COOKIE, samesite='Lax')
+    return response
@@ -0,0 +1,79 @@
+# page_cache.py - Full-page cache for anonymous marketing/auth pages
+
+import re
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from .cache_versions import bump_version, get_version
+
+# Views wrapped with anonymous_page_cache, by URL name; warm_page_cache
+# requests each of them after a deploy.
+CACHED_PAGES = ['home', 'select_signup', 'login']
+
+# Campaign parameters do not change the page and would fragment the cache
+IGNORED_QUERY_PARAMS = {'gclid', 'fbclid', 'mc_cid', 'mc_eid'}
+
+CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF_TOKEN__'
+CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def _cache_key(request):
+    params = sorted(
+        (key, value) for key, value in request.GET.items()
+        if key not in IGNORED_QUERY_PARAMS and not key.startswith('utm_')
+    )
+    return f"page_cache:{get_version('site', 'pages')}:{request.path}?{urlencode(params)}"
+
+
+def _is_cacheable(request):
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    # Flash messages (e.g. "Invalid username or password") are per visitor
+    storage = getattr(request, '_messages', None)
+    return storage is None or not len(storage)
+
+
+def anonymous_page_cache(view_func):
+    """Serve anonymous GETs of a page from the cache.
+
+    The CSRF token inside cached forms is replaced by a placeholder. Each hit
+    fills it with a fresh token for the visitor, which also sets their CSRF
+    cookie, so forms keep working without the view or template running.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable(request):
+            return view_func(request, *args, **kwargs)
+
+        key = _cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content = cached['content']
+            if CSRF_PLACEHOLDER in content:
+                content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+            response = HttpResponse(content, content_type=cached['content_type'])
+            response['X-Page-Cache'] = 'hit'
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            content = CSRF_INPUT_RE.sub(rf'\g<1>{CSRF_PLACEHOLDER}\g<2>', response.content.decode(response.charset))
+            cache.set(
+                key,
+                {'content': content, 'content_type': response['Content-Type']},
+                getattr(settings, 'PAGE_CACHE_TIMEOUT', 600),
+            )
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    return wrapper
+
+
+def invalidate_page_cache():
+    """Drop every cached page (templates or static file hashes changed)"""
+    bump_version('site', 'pages')
@@ -0,0 +1,76 @@
+# pdf.py - Minimal pure-Python PDF writer for text documents (invoices, reports)
+#
+# Output is deterministic (no timestamps or random IDs) so identical input
+# always yields identical bytes, which keeps content-addressed storage stable.
+
+PAGE_WIDTH = 612   # US Letter, points
+PAGE_HEIGHT = 792
+MARGIN = 56
+LINE_HEIGHT = 16
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+
+
+def _escape(text):
+    """Escape a string for a PDF literal and encode it as Latin-1"""
+    text = str(text).replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return text.encode('latin-1', errors='replace')
+
+
+def _page_stream(lines):
+    """Content stream for one page; lines are (text, font_size, bold) tuples"""
+    out = [b'BT']
+    y = PAGE_HEIGHT - MARGIN
+    for text, size, bold in lines:
+        font = b'/F2' if bold else b'/F1'
+        out.append(b'%s %d Tf 1 0 0 1 %d %d Tm (%s) Tj' % (font, size, MARGIN, y, _escape(text)))
+        y -= LINE_HEIGHT
+    out.append(b'ET')
+    return b'\n'.join(out)
+
+
+def render_text_pdf(lines):
+    """Render a list of lines to PDF bytes.
+
+    Each line is either a plain string or a (text, font_size, bold) tuple.
+    Pages are broken automatically.
+    """
+    normalized = [
+        line if isinstance(line, tuple) else (line, 11, False)
+        for line in lines
+    ] or [('', 11, False)]
+    pages = [normalized[i:i + LINES_PER_PAGE] for i in range(0, len(normalized), LINES_PER_PAGE)]
+
+    # Object layout: 1 catalog, 2 pages, 3 regular font, 4 bold font,
+    # then a (page, content) pair for every page.
+    objects = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        4: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+    }
+    kids = []
+    for index, page_lines in enumerate(pages):
+        page_id = 5 + index * 2
+        content_id = page_id + 1
+        stream = _page_stream(page_lines)
+        objects[page_id] = (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+            % (PAGE_WIDTH, PAGE_HEIGHT, content_id)
+        )
+        objects[content_id] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+        kids.append(b'%d 0 R' % page_id)
+    objects[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(kids), len(kids))
+
+    out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b'%d 0 obj\n%s\nendobj\n' % (obj_id, objects[obj_id])
+
+    xref_offset = len(out)
+    count = max(objects) + 1
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % count
+    for obj_id in range(1, count):
+        out += b'%010d 00000 n \n' % offsets[obj_id]
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%EOF\n' % (count, xref_offset)
+    return bytes(out)
@@ -0,0 +1,158 @@
+# profiling.py - Opt-in, sampled per-view query and latency profiling
+
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template as DjangoTemplate
+
+DEFAULT_SAMPLE_RATE = 0.05
+DEFAULT_BUFFER_SIZE = 5000
+# Only query signatures repeated at least this often in one request are reported
+DUPLICATE_THRESHOLD = 3
+
+# Per-process ring buffer of request records; old entries fall off the end
+_records = deque(maxlen=getattr(settings, 'PROFILING_BUFFER_SIZE', DEFAULT_BUFFER_SIZE))
+_local = threading.local()
+
+NUMBER_RE = re.compile(r'\b\d+\b')
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+IN_LIST_RE = re.compile(r'IN \((?:%s|\?)(?:, ?(?:%s|\?))*\)')
+
+
+def query_signature(sql):
+    """SQL with literals and IN-list lengths collapsed.
+
+    Queries issued in a loop (the N+1 pattern) share one signature.
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class RequestProfile:
+    """Query and render timings collected for one sampled request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.signatures[sql] += 1
+
+    def duplicates(self):
+        merged = Counter()
+        for sql, count in self.signatures.items():
+            merged[query_signature(sql)] += count
+        return [(sig, count) for sig, count in merged.most_common(5) if count >= DUPLICATE_THRESHOLD]
+
+
+_original_render = DjangoTemplate.render
+
+
+def _timed_render(self, context=None, request=None):
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return _original_render(self, context, request)
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        profile.render_time += time.perf_counter() - start
+
+
+class ProfilingMiddleware:
+    """Record query count, SQL time, duplicate queries and render time per view.
+
+    Disabled unless PROFILING_ENABLED is set; then only PROFILING_SAMPLE_RATE
+    of requests are instrumented, so unsampled requests pay one random() call.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+        DjangoTemplate.render = _timed_render
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        _local.profile = profile
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        total = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        _records.append({
+            'url_name': (match.view_name if match else None) or '(unresolved)',
+            'method': request.method,
+            'status': response.status_code,
+            'timestamp': time.time(),
+            'total_ms': total * 1000,
+            'sql_ms': profile.sql_time * 1000,
+            'render_ms': profile.render_time * 1000,
+            'queries': profile.queries,
+            'duplicates': profile.duplicates(),
+        })
+        return response
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(records=None):
+    """Per-URL-name p50/p95/p99 of latency, SQL time, render time and query count"""
+    records = list(_records if records is None else records)
+    by_name = {}
+    for record in records:
+        by_name.setdefault(record['url_name'], []).append(record)
+
+    report = []
+    for name, rows in by_name.items():
+        entry = {'url_name': name, 'samples': len(rows)}
+        for metric in ('total_ms', 'sql_ms', 'render_ms', 'queries'):
+            values = sorted(row[metric] for row in rows)
+            entry[metric] = {f'p{p}': round(percentile(values, p), 2) for p in (50, 95, 99)}
+
+        duplicates = Counter()
+        for row in rows:
+            for signature, count in row['duplicates']:
+                duplicates[signature] = max(duplicates[signature], count)
+        entry['n_plus_one'] = [{'sql': sig, 'max_repeats': count} for sig, count in duplicates.most_common(5)]
+        report.append(entry)
+
+    report.sort(key=lambda entry: entry['total_ms']['p95'], reverse=True)
+    return report
+
+
+def clear():
+    _records.clear()
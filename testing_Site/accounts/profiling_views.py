@@ -0,0 +1,37 @@
+# profiling_views.py - Staff reports for the sampled profiling data
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import render, redirect
+from django.views.decorators.http import require_http_methods
+
+from . import profiling
+
+
+@staff_member_required
+def profiling_report(request):
+    """Admin page listing p50/p95/p99 per URL name, slowest first"""
+    context = {
+        'title': 'View profiling',
+        'report': profiling.summarize(),
+        'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+        'sample_rate': getattr(settings, 'PROFILING_SAMPLE_RATE', profiling.DEFAULT_SAMPLE_RATE),
+    }
+    return render(request, 'admin/profiling_report.html', context)
+
+
+@staff_member_required
+def profiling_report_api(request):
+    """JSON version of profiling_report"""
+    return JsonResponse({
+        'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+        'report': profiling.summarize(),
+    })
+
+
+@staff_member_required
+@require_http_methods(["POST"])
+def profiling_reset(request):
+    profiling.clear()
+    return redirect('profiling_report')
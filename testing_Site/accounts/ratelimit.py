@@ -0,0 +1,118 @@
+# ratelimit.py - Cache-backed sliding-window rate limits for auth endpoints
+#
+# Limits are configured per scope in settings.RATE_LIMITS as
+#     {'login': {'ip': (limit, seconds), 'account': (limit, seconds)}, ...}
+# and applied with the @rate_limit decorator, which runs before the view so a
+# rejected request costs two cache round trips and never reaches the password
+# hasher, SMTP or the database. The counters are only global with a cache
+# shared by all workers (REDIS_URL); with the per-process LocMem default the
+# effective limit is multiplied by the number of worker processes.
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+
+def _digest(value):
+    # Usernames/emails are user input; keep keys short and memcached-safe
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def _window_key(scope, kind, ident, window_index):
+    return f"ratelimit:{scope}:{kind}:{_digest(ident)}:{window_index}"
+
+
+def hit(scope, kind, ident, limit, window):
+    """Count one request and return seconds to wait, or 0 if it is allowed.
+
+    Sliding-window counter: one atomic counter per fixed window, with the
+    previous window's count weighted by how much of it still overlaps the
+    last `window` seconds. That approximates a true sliding log in O(1)
+    cache space per client and smooths out bursts at window boundaries.
+    """
+    now = time.time()
+    index, offset = divmod(now, window)
+    index = int(index)
+    key = _window_key(scope, kind, ident, index)
+
+    # add() only creates the counter; incr() is atomic on every shared backend
+    cache.add(key, 0, window * 2)
+    try:
+        current = cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, window * 2)
+        current = 1
+
+    previous = cache.get(_window_key(scope, kind, ident, index - 1), 0)
+    estimate = previous * (1 - offset / window) + current
+    if estimate <= limit:
+        return 0
+    return max(1, int(window - offset))
+
+
+def reset(scope, kind, ident):
+    """Forget a client's recent requests, e.g. after a successful login"""
+    window = settings.RATE_LIMITS.get(scope, {}).get(kind)
+    if window is None:
+        return
+    index = int(time.time() // window[1])
+    cache.delete_many([_window_key(scope, kind, ident, i) for i in (index - 1, index)])
+
+
+def client_ip(request):
+    """Address used for per-IP limits; set RATE_LIMIT_IP_HEADER behind a proxy"""
+    header = getattr(settings, 'RATE_LIMIT_IP_HEADER', None)
+    if header and request.META.get(header):
+        # X-Forwarded-For style: the left-most address is the client
+        return request.META[header].split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check(request, scope, account=None):
+    """Seconds to wait if either the IP or the account limit is exceeded, else 0"""
+    limits = getattr(settings, 'RATE_LIMITS', {}).get(scope)
+    if not limits:
+        return 0
+    wait = 0
+    if 'ip' in limits:
+        wait = hit(scope, 'ip', client_ip(request), *limits['ip'])
+    if account and 'account' in limits:
+        wait = max(wait, hit(scope, 'account', account.strip().lower(), *limits['account']))
+    return wait
+
+
+def rate_limit(scope, account=None, methods=('POST',), redirect_to=None):
+    """Reject requests over the scope's limits before the view runs.
+
+    `account` maps the request to the username/email being targeted, so
+    guessing one account from many addresses is limited as well. Rejections
+    are a JSON 429, or a flash message and redirect for HTML views when
+    `redirect_to` names a URL.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if methods and request.method not in methods:
+                return view_func(request, *args, **kwargs)
+
+            wait = check(request, scope, account(request) if account else None)
+            if not wait:
+                return view_func(request, *args, **kwargs)
+
+            message = f"Too many attempts. Please try again in {wait} seconds."
+            if redirect_to:
+                messages.error(request, message)
+                response = redirect(redirect_to)
+            else:
+                response = JsonResponse({'error': message, 'retry_after': wait}, status=429)
+            response['Retry-After'] = str(wait)
+            return response
+        return wrapper
+    return decorator
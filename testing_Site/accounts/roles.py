@@ -0,0 +1,153 @@
+# roles.py - Resolve a user's Profile and Customer/Trainer once per request
+
+from django.conf import settings
+from django.utils.functional import LazyObject, empty
+
+from .models import Profile, Customer, Trainer
+
+ROLE_SESSION_KEY = '_accounts_role'
+
+
+class UserRole:
+    """The profile and role object of a user, loaded with a single query.
+
+    customer is only set for customer profiles and trainer only for trainer
+    profiles, matching the checks the dashboard helpers used to do by hand.
+    """
+
+    def __init__(self, profile=None):
+        self._set_profile(profile)
+
+    def _set_profile(self, profile):
+        self.profile = profile
+        self.role = profile.role if profile else None
+        self.customer = getattr(profile, 'customer', None) if self.role == 'customer' else None
+        self.trainer = getattr(profile, 'trainer', None) if self.role == 'trainer' else None
+
+    @property
+    def is_customer(self):
+        return self.customer is not None
+
+    @property
+    def is_verified_trainer(self):
+        return self.trainer is not None and self.trainer.is_verified
+
+
+class SessionUserRole(UserRole):
+    """A UserRole whose role name comes from the session.
+
+    Code that only needs role costs no query; profile, customer and trainer
+    are loaded (and the entry re-checked) the first time one is used. If an
+    admin changed the role since the entry was written, role is corrected at
+    that point.
+    """
+
+    def __init__(self, user, session):
+        self.role = session[ROLE_SESSION_KEY]['role']
+        self._user = user
+        self._session = session
+
+    def __getattr__(self, name):
+        if name not in ('profile', 'customer', 'trainer'):
+            raise AttributeError(name)
+        user, session = self.__dict__.pop('_user'), self.__dict__.pop('_session')
+        profile = _load_from_session(user, session) or _load_profile(user)
+        _prime(user, profile)
+        self._set_profile(profile)
+        _remember(self, user, session)
+        return getattr(self, name)
+
+
+def _unwrap(user):
+    # request.user is a SimpleLazyObject; caches must live on the real User
+    if isinstance(user, LazyObject):
+        if user._wrapped is empty:
+            user._setup()
+        return user._wrapped
+    return user
+
+
+def _load_from_session(user, session):
+    cached = session[ROLE_SESSION_KEY]
+    model = Customer if cached['role'] == 'customer' else Trainer
+    obj = model.objects.select_related('profile').filter(pk=cached['id']).first()
+    # Stale if the row is gone or an admin changed the role since login
+    if obj is None or obj.profile.user_id != user.pk or obj.profile.role != cached['role']:
+        return None
+
+    profile = obj.profile
+    other = Profile.trainer if model is Customer else Profile.customer
+    other.related.set_cached_value(profile, None)
+    return profile
+
+
+def _load_profile(user):
+    try:
+        return Profile.objects.select_related('customer', 'trainer').get(user_id=user.pk)
+    except Profile.DoesNotExist:
+        return None
+
+
+def _prime(user, profile):
+    User = type(user)
+    User.profile.related.set_cached_value(user, profile)
+    if profile is not None:
+        Profile.user.field.set_cached_value(profile, user)
+
+
+def _remember(role, user, session):
+    if session is None or role.role not in ('customer', 'trainer'):
+        return
+    obj = role.customer or role.trainer
+    if obj is not None:
+        entry = {'user_id': user.pk, 'role': role.role, 'id': obj.pk}
+        if session.get(ROLE_SESSION_KEY) != entry:
+            session[ROLE_SESSION_KEY] = entry
+
+
+def get_role(user, session=None):
+    """Return the UserRole for user, resolving it on first use.
+
+    The result is memoised on the user object, and user.profile (plus the
+    profile's customer/trainer) is primed so templates and hasattr() checks
+    do not issue further queries. When a session is passed and
+    ROLE_SESSION_CACHE is on, the role and object id are kept in it across
+    requests, and a request that only looks at role.role runs no query.
+    """
+    user = _unwrap(user)
+    cached = getattr(user, '_accounts_role', None)
+    if cached is not None:
+        return cached
+
+    if not user.is_authenticated:
+        return UserRole()
+
+    use_session = session is not None and getattr(settings, 'ROLE_SESSION_CACHE', True)
+    entry = session.get(ROLE_SESSION_KEY) if use_session else None
+    if entry and entry.get('user_id') == user.pk:
+        role = SessionUserRole(user, session)
+    else:
+        profile = _load_profile(user)
+        _prime(user, profile)
+        role = UserRole(profile)
+        if use_session:
+            _remember(role, user, session)
+    user._accounts_role = role
+    return role
+
+
+class RoleMiddleware:
+    """Attach request.role (a UserRole) to every authenticated request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.user.is_authenticated:
+            request.role = get_role(request.user, getattr(request, 'session', None))
+        else:
+            request.role = UserRole()
+        return None
@@ -0,0 +1,188 @@
+# search.py - Ranked full-text search over the resource library
+#
+# The backend is settings.RESOURCE_SEARCH_BACKEND (a dotted path) or, when
+# unset, SQLite FTS5 if the 0010 migration could create the index table and
+# the portable ORM backend otherwise. Indexing is incremental: signals
+# reindex a resource when it or its category is saved and drop it on delete.
+# Bulk imports skip signals; run `manage.py rebuild_search_index` after them.
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+
+from .models import Resource, ResourceCategory
+
+RESULTS_PER_PAGE = 20
+# Matches considered by the admin changelist search
+ADMIN_SEARCH_LIMIT = 1000
+MAX_TERMS = 8
+TERM_RE = re.compile(r'\w+')
+
+SearchPage = namedtuple('SearchPage', 'resources total facets page num_pages')
+
+
+def query_terms(query):
+    return TERM_RE.findall((query or '').lower())[:MAX_TERMS]
+
+
+class SQLiteFTSBackend:
+    """FTS5 table keyed by Resource id, ranked with bm25 (title > category > description)"""
+
+    table = 'resource_search'
+    # bm25 column weights, in the table's column order
+    weights = (10.0, 2.0, 5.0)
+
+    @staticmethod
+    def match_expression(terms):
+        # Quoted terms keep FTS5 operators in user input literal; the last
+        # term matches as a prefix so results follow the user's typing
+        return ' '.join([*(f'"{term}"' for term in terms[:-1]), f'"{terms[-1]}"*'])
+
+    def _filtered(self, terms, filters):
+        clauses = [f'{self.table} MATCH %s']
+        params = [self.match_expression(terms)]
+        for column in ('is_active', 'category_id', 'is_premium'):
+            if column in filters:
+                clauses.append(f'r.{column} = %s')
+                params.append(filters[column])
+        sql = (
+            f'FROM {self.table} JOIN {Resource._meta.db_table} r ON r.id = {self.table}.rowid '
+            f'WHERE {" AND ".join(clauses)}'
+        )
+        return sql, params
+
+    def search(self, terms, filters, offset, limit):
+        sql, params = self._filtered(terms, filters)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT r.id {sql} ORDER BY bm25({self.table}, {weights}), r.id LIMIT %s OFFSET %s',
+                [*params, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def facets(self, terms, filters):
+        sql, params = self._filtered(terms, {k: v for k, v in filters.items() if k != 'category_id'})
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT r.category_id, COUNT(*) {sql} GROUP BY r.category_id', params)
+            return dict(cursor.fetchall())
+
+    def index(self, resources):
+        rows = [
+            (resource.pk, resource.title, resource.description or '',
+             resource.category.name if resource.category_id else '')
+            for resource in resources
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, description, category) VALUES (%s, %s, %s, %s)', rows,
+            )
+
+    def remove(self, resource_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(pk,) for pk in resource_ids])
+
+    def rebuild(self, chunk_size=1000):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        batch = []
+        for resource in Resource.objects.select_related('category').iterator(chunk_size=chunk_size):
+            batch.append(resource)
+            if len(batch) >= chunk_size:
+                self.index(batch)
+                batch = []
+        self.index(batch)
+
+
+class DatabaseSearchBackend:
+    """Portable fallback: every term must appear in a field; title hits rank first"""
+
+    def _filtered(self, terms, filters):
+        queryset = Resource.objects.filter(**filters)
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(category__name__icontains=term)
+            )
+        return queryset
+
+    def search(self, terms, filters, offset, limit):
+        phrase = ' '.join(terms)
+        queryset = self._filtered(terms, filters).annotate(
+            rank=Case(
+                When(title__icontains=phrase, then=Value(3)),
+                When(category__name__icontains=phrase, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by('-rank', '-created_at', 'id')
+        return list(queryset.values_list('id', flat=True)[offset:offset + limit])
+
+    def facets(self, terms, filters):
+        filters = {k: v for k, v in filters.items() if k != 'category_id'}
+        rows = self._filtered(terms, filters).values('category_id').annotate(count=Count('id')).order_by()
+        return {row['category_id']: row['count'] for row in rows}
+
+    def index(self, resources):
+        pass
+
+    def remove(self, resource_ids):
+        pass
+
+    def rebuild(self, chunk_size=1000):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, 'RESOURCE_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite' and SQLiteFTSBackend.table in connection.introspection.table_names():
+        return SQLiteFTSBackend()
+    return DatabaseSearchBackend()
+
+
+def search_resources(query, category_id=None, include_premium=True, premium=None, page=1,
+                     per_page=RESULTS_PER_PAGE):
+    """Ranked page of active resources matching query, with per-category counts.
+
+    include_premium is what the viewer may see; premium (True/False/None)
+    additionally narrows to premium-only or free-only results. Backends take
+    filters as Resource lookups on is_active, category_id and is_premium.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return SearchPage([], 0, [], 1, 0)
+
+    filters = {'is_active': True}
+    if not include_premium:
+        filters['is_premium'] = False
+    elif premium is not None:
+        filters['is_premium'] = premium
+    if category_id:
+        filters['category_id'] = category_id
+
+    backend = get_backend()
+    counts = backend.facets(terms, filters)
+    total = counts.get(category_id, 0) if category_id else sum(counts.values())
+    num_pages = max(1, -(-total // per_page))
+    page = min(max(1, page), num_pages)
+
+    ids = backend.search(terms, filters, (page - 1) * per_page, per_page)
+    by_id = Resource.objects.select_related('category').in_bulk(ids)
+    resources = [by_id[pk] for pk in ids if pk in by_id]
+
+    names = dict(ResourceCategory.objects.filter(pk__in=[pk for pk in counts if pk]).values_list('pk', 'name'))
+    facets = sorted(
+        ({'id': pk, 'name': names.get(pk, 'Uncategorized'), 'count': count} for pk, count in counts.items()),
+        key=lambda facet: (-facet['count'], facet['name']),
+    )
+    return SearchPage(resources, total, facets, page, num_pages)
@@ -0,0 +1,65 @@
+# search_views.py - Resource search API and the search box on the resource pages
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.urls import reverse
+
+from .entitlements import get_entitlements
+from .search import search_resources
+
+
+def int_param(request, name):
+    try:
+        return int(request.GET.get(name) or 0) or None
+    except ValueError:
+        return None
+
+
+def can_see_premium(request):
+    """Staff and trainers see every resource; customers need a premium plan"""
+    role = request.role
+    if request.user.is_staff or role.trainer is not None:
+        return True
+    return get_entitlements(role.customer).premium_content
+
+
+def search_from_request(request, include_premium):
+    """Run the search described by ?q=&category=&premium=&page=, or None without q"""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return None
+    return search_resources(
+        query,
+        category_id=int_param(request, 'category'),
+        include_premium=include_premium,
+        premium={'1': True, '0': False}.get(request.GET.get('premium')),
+        page=int_param(request, 'page') or 1,
+    )
+
+
+@login_required
+def api_resource_search(request):
+    """Ranked, paginated resource search with category facets"""
+    results = search_from_request(request, can_see_premium(request))
+    if results is None:
+        return JsonResponse({'error': 'Missing search query (q)'}, status=400)
+
+    return JsonResponse({
+        'query': request.GET['q'].strip(),
+        'total': results.total,
+        'page': results.page,
+        'num_pages': results.num_pages,
+        'facets': results.facets,
+        'results': [
+            {
+                'id': resource.id,
+                'title': resource.title,
+                'description': resource.description,
+                'resource_type': resource.resource_type,
+                'category': resource.category.name if resource.category else None,
+                'is_premium': resource.is_premium,
+                'download_url': reverse('download_resource', args=[resource.id]),
+            }
+            for resource in results.resources
+        ],
+    })
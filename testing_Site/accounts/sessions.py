@@ -0,0 +1,55 @@
+# sessions.py - cached_db session engine that coalesces database writes
+#
+# SESSION_ENGINE = 'accounts.sessions'. Reads are served from the cache like
+# Django's cached_db engine. On save, the database row is only rewritten
+# when the session data actually differs from what was loaded. A save of
+# unchanged data, e.g. from SESSION_SAVE_EVERY_REQUEST, refreshes the cached
+# copy and touches the row at most once per SESSION_DB_WRITE_INTERVAL seconds.
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+
+class SessionStore(CachedDBStore):
+
+    def _digest(self, data):
+        return hashlib.md5(self.serializer().dumps(data)).digest()
+
+    @property
+    def _db_saved_key(self):
+        return f"{self.cache_key}:db_saved"
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = self._digest(data)
+        return data
+
+    def _db_write_due(self):
+        interval = getattr(settings, 'SESSION_DB_WRITE_INTERVAL', 0)
+        if not interval:
+            return True
+        saved_at = self._cache.get(self._db_saved_key)
+        return saved_at is None or time.time() - saved_at >= interval
+
+    def save(self, must_create=False):
+        if (
+            not must_create
+            and self.session_key
+            and getattr(self, '_loaded_digest', None) == self._digest(self._get_session())
+            and not self._db_write_due()
+        ):
+            # Same data as the stored row; only the cached copy's lifetime moves
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+            return
+        super().save(must_create)
+        self._loaded_digest = self._digest(self._session)
+        self._cache.set(self._db_saved_key, time.time(), self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key:
+            self._cache.delete(f"{self.cache_key_prefix}{key}:db_saved")
+        super().delete(session_key)
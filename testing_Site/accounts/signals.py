@@ -0,0 +1,160 @@
+# signals.py - Cache invalidation hooks for the accounts app
+
+import logging
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    Session, Profile, TrainerProfile, Customer, Trainer, CustomerSubscription, Payment,
+    TrainerAssignment, WorkoutProgress, Goal, Notification, TrainerMessage, TrainerRating,
+    SubscriptionPlan, Resource, ResourceCategory, TrainerRegistration, SessionSeries,
+)
+from . import client_search, entitlements, membership, search
+from .cache_versions import bump_version, touch_dashboards, touch_session_calendars
+from .images import generate_variants
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def invalidate_session_calendars(sender, instance, **kwargs):
+    """Session changes invalidate the trainer's and customer's calendar feeds"""
+    touch_session_calendars(trainer_ids=[instance.trainer_id], customer_ids=[instance.customer_id])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=TrainerProfile)
+def create_profile_picture_variants(sender, instance, **kwargs):
+    """Generate avatar variants whenever a new picture is uploaded"""
+    picture = instance.profile_picture
+    if picture and picture.name:
+        # Only missing variants are written, so unchanged pictures cost a few stat() calls
+        transaction.on_commit(lambda name=picture.name: _generate_variants(name))
+
+
+def _generate_variants(name):
+    # A missing or corrupt original must not break the profile save
+    try:
+        generate_variants(name)
+    except (OSError, ValueError):
+        logger.exception("Could not generate variants for %s; process_profile_images retries them", name)
+
+
+# Models shown on the customer's pages and on their trainer's client pages
+CUSTOMER_SCOPED_MODELS = (Customer, CustomerSubscription, Payment, WorkoutProgress, Goal, Notification)
+# Models linking a customer and a trainer
+PAIR_SCOPED_MODELS = (TrainerAssignment, TrainerMessage, TrainerRating, SessionSeries)
+# Models shown to every user (plans, resource library)
+SITE_CONTENT_MODELS = (SubscriptionPlan, Resource, ResourceCategory)
+
+
+def invalidate_customer_pages(sender, instance, **kwargs):
+    customer_id = instance.pk if sender is Customer else instance.customer_id
+    touch_dashboards(customer_ids=[customer_id])
+
+
+def invalidate_pair_pages(sender, instance, **kwargs):
+    touch_dashboards(trainer_ids=[instance.trainer_id], customer_ids=[instance.customer_id])
+
+
+def invalidate_site_content(sender, instance, **kwargs):
+    bump_version('site', 'content')
+
+
+for model in CUSTOMER_SCOPED_MODELS:
+    post_save.connect(invalidate_customer_pages, sender=model, dispatch_uid=f'pages_{model.__name__}_save')
+    post_delete.connect(invalidate_customer_pages, sender=model, dispatch_uid=f'pages_{model.__name__}_delete')
+
+for model in PAIR_SCOPED_MODELS:
+    post_save.connect(invalidate_pair_pages, sender=model, dispatch_uid=f'pages_{model.__name__}_save')
+    post_delete.connect(invalidate_pair_pages, sender=model, dispatch_uid=f'pages_{model.__name__}_delete')
+
+for model in SITE_CONTENT_MODELS:
+    post_save.connect(invalidate_site_content, sender=model, dispatch_uid=f'pages_{model.__name__}_save')
+    post_delete.connect(invalidate_site_content, sender=model, dispatch_uid=f'pages_{model.__name__}_delete')
+
+
+@receiver(post_save, sender=Trainer)
+@receiver(post_delete, sender=Trainer)
+def invalidate_trainer_pages(sender, instance, **kwargs):
+    """Trainer details appear on the trainer's own pages and on their clients' pages"""
+    touch_dashboards(trainer_ids=[instance.pk])
+    bump_version('user', *instance.assigned_customers.values_list('customer__profile__user_id', flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=TrainerProfile)
+def invalidate_own_pages(sender, instance, **kwargs):
+    """Name, email and picture changes show up on the user's own pages"""
+    bump_version('user', instance.pk if sender is User else instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def record_user_membership(sender, instance, update_fields=None, **kwargs):
+    """Keep new usernames and changed emails in the availability filter"""
+    # e.g. the last_login update on every login
+    if update_fields is not None and not {'username', 'email'} & set(update_fields):
+        return
+    # After commit, so a process rebuilding from the tables already sees the row
+    transaction.on_commit(lambda: membership.record(username=instance.username, email=instance.email))
+
+
+@receiver(post_save, sender=TrainerRegistration)
+def record_registration_membership(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: membership.record(email=instance.email))
+
+
+@receiver(post_save, sender=Resource)
+def index_resource(sender, instance, **kwargs):
+    """Keep the resource search index in step with each save"""
+    search.get_backend().index([instance])
+
+
+@receiver(post_delete, sender=Resource)
+def unindex_resource(sender, instance, **kwargs):
+    search.get_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=ResourceCategory)
+def reindex_category_resources(sender, instance, created, **kwargs):
+    """Category names are indexed with each resource"""
+    if not created:
+        search.get_backend().index(instance.resource_set.select_related('category'))
+
+
+# User fields that feed the client search terms
+CLIENT_SEARCH_FIELDS = {'first_name', 'last_name', 'username', 'email'}
+
+
+@receiver(post_save, sender=Customer)
+def index_new_customer(sender, instance, created, **kwargs):
+    if created:
+        client_search.index_customers([instance])
+
+
+@receiver(post_save, sender=User)
+def reindex_customer_search(sender, instance, created, update_fields=None, **kwargs):
+    """Refresh a customer's search terms when their name or email changes"""
+    # New users get a Customer (and their terms) afterwards; last_login saves touch nothing
+    if created or (update_fields is not None and not CLIENT_SEARCH_FIELDS & set(update_fields)):
+        return
+    customers = Customer.objects.filter(profile__user=instance).select_related('profile__user')
+    client_search.index_customers(customers)
+
+
+@receiver(post_save, sender=CustomerSubscription)
+@receiver(post_delete, sender=CustomerSubscription)
+def invalidate_subscription_entitlements(sender, instance, **kwargs):
+    entitlements.invalidate_customers(instance.customer_id)
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def invalidate_plan_entitlements(sender, instance, **kwargs):
+    entitlements.invalidate_plans()
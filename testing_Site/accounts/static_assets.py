@@ -0,0 +1,135 @@
+# static_assets.py - Hashed, precompressed static files and vendored front-end libraries
+
+import gzip
+import os
+import posixpath
+import re
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+from django.templatetags.static import static
+
+try:
+    import brotli
+except ImportError:  # .br siblings are only written when brotli is installed
+    brotli = None
+
+# Third-party libraries the templates used to load from CDNs, committed under
+# static/vendor. `manage.py vendor_static_assets --force` re-downloads them
+# after a version bump; a file that is missing falls back to its CDN URL.
+CDNJS = 'https://cdnjs.cloudflare.com/ajax/libs'
+FONTAWESOME_WEBFONTS = [
+    f'{name}.{ext}'
+    for name in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility')
+    for ext in ('woff2', 'ttf')
+]
+
+VENDOR_ASSETS = {
+    'bootstrap.css': {
+        'path': 'vendor/bootstrap/5.3.3/css/bootstrap.min.css',
+        'url': f'{CDNJS}/bootstrap/5.3.3/css/bootstrap.min.css',
+    },
+    'bootstrap.js': {
+        'path': 'vendor/bootstrap/5.3.3/js/bootstrap.bundle.min.js',
+        'url': f'{CDNJS}/bootstrap/5.3.3/js/bootstrap.bundle.min.js',
+    },
+    'fontawesome.css': {
+        'path': 'vendor/fontawesome/6.4.0/css/all.min.css',
+        'url': f'{CDNJS}/font-awesome/6.4.0/css/all.min.css',
+        # Fonts referenced from the stylesheet as ../webfonts/<name>
+        'extra': {
+            f'vendor/fontawesome/6.4.0/webfonts/{name}': f'{CDNJS}/font-awesome/6.4.0/webfonts/{name}'
+            for name in FONTAWESOME_WEBFONTS
+        },
+    },
+    'chart.js': {
+        'path': 'vendor/chartjs/4.4.0/chart.umd.js',
+        'url': 'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.js',
+    },
+}
+
+
+_vendored_urls = {}
+
+
+def vendor_asset_url(name):
+    """Local static URL for a vendored library, or its CDN URL if not vendored yet.
+
+    Found files are remembered; misses are not, so files collected while the
+    process runs are picked up on the next request.
+    """
+    url = _vendored_urls.get(name)
+    if url is not None:
+        return url
+    asset = VENDOR_ASSETS[name]
+    if not _is_vendored(asset['path']):
+        return asset['url']
+    url = _vendored_urls[name] = static(asset['path'])
+    return url
+
+
+def _is_vendored(path):
+    """In the collectstatic manifest, or found by the finders when there is none"""
+    if isinstance(staticfiles_storage, ManifestStaticFilesStorage):
+        if path not in staticfiles_storage.hashed_files:
+            # The manifest may have been written after this process started
+            staticfiles_storage.hashed_files = staticfiles_storage.load_manifest()
+        return path in staticfiles_storage.hashed_files
+    return finders.find(path) is not None
+
+
+# Text formats worth precompressing; images and fonts other than TTF are
+# already compressed.
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.txt', '.html', '.json', '.map', '.ttf', '.ico', '.xml'}
+MIN_COMPRESS_SIZE = 512
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes .gz (and .br) siblings of hashed files.
+
+    collectstatic produces e.g. css/styles.3f2a1b.css, css/styles.3f2a1b.css.gz
+    and css/styles.3f2a1b.css.br; serve_static picks the best encoding.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        for name in self.hashed_files.values():
+            if posixpath.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            with self.open(name) as original:
+                content = original.read()
+            if len(content) < MIN_COMPRESS_SIZE:
+                continue
+
+            self._write_compressed(f'{name}.gz', content, gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._write_compressed(f'{name}.br', content, brotli.compress(content))
+
+    def _write_compressed(self, name, original, compressed):
+        # Skip variants that do not actually save bytes
+        if len(compressed) >= len(original):
+            return
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(compressed))
+
+
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+def is_hashed_name(path):
+    """True for content-hashed names produced by ManifestStaticFilesStorage"""
+    return bool(HASHED_NAME_RE.search(path))
+
+
+def static_root_path(path):
+    """Absolute path inside STATIC_ROOT, or None if it escapes the root"""
+    root = os.path.realpath(staticfiles_storage.location)
+    full = os.path.realpath(os.path.join(root, path))
+    if full != root and not full.startswith(root + os.sep):
+        return None
+    return full
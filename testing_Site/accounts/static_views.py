@@ -0,0 +1,44 @@
+# static_views.py - Serve collected static files with precompression and long-lived caching
+
+import mimetypes
+import os
+
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .static_assets import is_hashed_name, static_root_path
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=3600'
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+@require_safe
+def serve_static(request, path):
+    """Serve a file from STATIC_ROOT for deployments without a front-end server.
+
+    Content-hashed names never change, so they are marked immutable for a
+    year. A precompressed .br/.gz sibling is sent when the client accepts it.
+    """
+    full_path = static_root_path(path)
+    if not full_path or not os.path.isfile(full_path):
+        raise Http404("Static file not found")
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+    serve_path, encoding = full_path, None
+    for name, suffix in ENCODINGS:
+        if name in accept_encoding and os.path.isfile(full_path + suffix):
+            serve_path, encoding = full_path + suffix, name
+            break
+
+    response = FileResponse(open(serve_path, 'rb'), content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_hashed_name(path) else DEFAULT_CACHE_CONTROL
+    return response
@@ -0,0 +1,16 @@
+# accounts/templatetags/asset_tags.py
+from django import template
+
+from accounts.static_assets import vendor_asset_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_asset(name):
+    """
+    Returns the URL of a vendored front-end library (local copy if present, CDN otherwise).
+    Usage: <link href="{% vendor_asset 'bootstrap.css' %}" rel="stylesheet">
+    Names: bootstrap.css, bootstrap.js, fontawesome.css, chart.js
+    """
+    return vendor_asset_url(name)
@@ -0,0 +1,19 @@
+# accounts/templatetags/image_tags.py
+from django import template
+
+from accounts.images import variant_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(image_field, size='md', fmt='webp'):
+    """
+    Returns the URL of a resized variant of a profile picture.
+    Usage: <img src="{% avatar_url user.profile.profile_picture 'sm' %}">
+    Size classes: sm (96px), md (192px), lg (512px).
+    """
+    try:
+        return variant_url(image_field, size, fmt)
+    except ValueError:
+        return ''
@@ -1,3 +1,1134 @@
-from django.test import TestCase
+# tests.py - Query-count regression tests for every named route, and
+# behavioural tests for the features behind them
+#
+# Each route is requested once against a small data set and once after
+# growing it to hundreds of notifications, messages and clients. A page
+# whose query count grows with the data has an N+1 and fails the suite.
 
-# Create your tests here.
+import copy
+import csv
+import hashlib
+import io
+import re
+import shutil
+import tempfile
+from collections import Counter, namedtuple
+from datetime import time as dt_time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from . import client_search, entitlements, invoices, membership, otp_store, search, url as accounts_urls
+from .calendar_views import get_calendar_token
+from .models import (
+    Profile, Customer, Trainer, SubscriptionPlan, CustomerSubscription, Payment,
+    TrainerAssignment, WorkoutProgress, Goal, ResourceCategory, Resource,
+    Notification, TrainerMessage, Session, SessionSeries, ResourceUpload, PendingSignup,
+)
+from .profiling import query_signature
+from .sessions import SessionStore
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+SMALL_SCALE = 3
+LARGE_SCALE = 200
+
+# Absolute ceiling for any page at LARGE_SCALE; override per route below
+DEFAULT_QUERY_CEILING = 40
+QUERY_CEILINGS = {}
+
+# Routes that end the test client's session or need a POST body to do anything
+SKIPPED_ROUTES = {'logout'}
+
+STAFF_ROUTES = {
+    'pending_registrations_count', 'admin_export', 'profiling_report',
+    'profiling_report_api', 'profiling_reset', 'api_resource_search',
+    'resource_upload_start', 'resource_upload_detail', 'resource_upload_complete',
+}
+
+# Every route must answer 200 to a GET unless listed here with the status it
+# is expected to give instead
+EXPECTED_STATUS = {
+    # POST-only endpoints
+    'profiling_reset': 405,
+    'resource_upload_start': 405,
+    'resource_upload_complete': 405,
+    'update_session_status': 405,
+    'add_session_notes': 405,
+    'update_session_series': 405,
+    'cancel_session_series': 405,
+    # Redirect after a GET: to the form, the dashboard or the signup start
+    'verify_otp': 302,
+    'resend_otp': 302,
+    'subscribe_to_plan': 302,
+    'toggle_auto_renew': 302,
+    'cancel_subscription': 302,
+    'rate_trainer': 302,
+    'schedule_session': 302,
+    'request_workout_plan': 302,
+    'request_trainer_change': 302,
+    # The test resource is an external link
+    'download_resource': 302,
+    # Templates these views render are not in the tree (signup_trainer.html,
+    # check_status.html, index.html, trainer_client_detail.html and
+    # trainer_client_progress.html), so they answer 500 until those are added
+    'trainer_signup': 500,
+    'registration_status': 500,
+    'trainer_client_detail': 500,
+    'view_client_progress': 500,
+    'home': 500,
+}
+
+# Custom admin URLs: name -> kwargs keys (resolved in build_kwargs)
+ADMIN_ROUTES = {
+    'admin:assign_trainer': ['customer_id'],
+    'admin:trainer_assignment_dashboard': [],
+    'admin:send_admin_message': ['customer_id', 'trainer_id'],
+    'admin:view_trainer_clients': ['trainer_id'],
+    'admin:share_resource': ['resource_id'],
+    'admin:upload_resource_file': ['resource_id'],
+    'admin:accounts_customer_changelist': [],
+    'admin:accounts_trainer_changelist': [],
+    'admin:accounts_trainerassignment_changelist': [],
+    'admin:accounts_customersubscription_changelist': [],
+    'admin:accounts_payment_changelist': [],
+    'admin:accounts_workoutprogress_changelist': [],
+    'admin:accounts_session_changelist': [],
+    'admin:accounts_goal_changelist': [],
+    'admin:accounts_resource_changelist': [],
+    'admin:accounts_notification_changelist': [],
+    'admin:accounts_trainermessage_changelist': [],
+}
+
+# Query strings for routes that need one to do real work
+ROUTE_QUERIES = {
+    'api_resource_search': 'q=resource',
+}
+
+Route = namedtuple('Route', 'name url actor')
+
+PASSWORD_HASH = make_password('test-password-123')
+
+
+def tearDownModule():
+    shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+
+def create_users(prefix, count, role):
+    """bulk_create count users with profiles of the given role"""
+    start = User.objects.count()
+    users = User.objects.bulk_create([
+        User(
+            username=f'{prefix}{start + i}', email=f'{prefix}{start + i}@example.com',
+            first_name=prefix.title(), last_name=str(start + i), password=PASSWORD_HASH,
+        )
+        for i in range(count)
+    ])
+    return Profile.objects.bulk_create([
+        Profile(user=user, phone='+921234567890', role=role) for user in users
+    ])
+
+
+def create_customers(count, plan):
+    profiles = create_users('customer', count, 'customer')
+    customers = Customer.objects.bulk_create([
+        Customer(profile=profile, fitness_level='beginner', height=175, weight=80) for profile in profiles
+    ])
+    now = timezone.now()
+    CustomerSubscription.objects.bulk_create([
+        CustomerSubscription(
+            customer=customer, plan=plan, start_date=now,
+            end_date=now + timedelta(days=plan.duration_days), is_active=True,
+        )
+        for customer in customers
+    ])
+    return customers
+
+
+def create_trainers(count):
+    profiles = create_users('trainer', count, 'trainer')
+    return Trainer.objects.bulk_create([
+        Trainer(profile=profile, address='1 Gym Street, Lahore', is_verified=True, experience_years=5)
+        for profile in profiles
+    ])
+
+
+class SlotCounter:
+    """Hands out unique (date, time) session slots for a trainer"""
+
+    def __init__(self):
+        self.offset = 0
+
+    def next(self):
+        self.offset += 1
+        day, hour = divmod(self.offset, 10)
+        return timezone.localdate() + timedelta(days=day - 5), dt_time(8 + hour, 0)
+
+
+def add_customer_activity(customer, trainer, count, slots):
+    """Give one customer count rows of everything the dashboards list"""
+    today = timezone.localdate()
+    existing_payments = Payment.objects.count()
+    Notification.objects.bulk_create([
+        Notification(customer=customer, title=f'Notice {i}', message='Body', notification_type='general')
+        for i in range(count)
+    ])
+    TrainerMessage.objects.bulk_create([
+        TrainerMessage(customer=customer, trainer=trainer, subject=f'Subject {i}', message='Hi', content='Hi')
+        for i in range(count)
+    ])
+    start_day = WorkoutProgress.objects.filter(customer=customer).count()
+    WorkoutProgress.objects.bulk_create([
+        WorkoutProgress(
+            customer=customer, date=today - timedelta(days=start_day + i),
+            weight=Decimal('80.0'), sessions_attended=1,
+        )
+        for i in range(count)
+    ])
+    Goal.objects.bulk_create([
+        Goal(
+            customer=customer, title=f'Goal {i}', description='Goal', goal_type='strength',
+            target_value=Decimal('100'), current_value=Decimal('10'), status='active', is_active=True,
+        )
+        for i in range(count)
+    ])
+    Payment.objects.bulk_create([
+        Payment(
+            customer=customer, subscription=customer.subscription, amount=Decimal('29.99'),
+            payment_method='card', status='completed', transaction_id=f'TX{existing_payments + i}',
+        )
+        for i in range(count)
+    ])
+    sessions = []
+    for i in range(count):
+        session_date, session_time = slots.next()
+        sessions.append(Session(
+            customer=customer, trainer=trainer, session_date=session_date, session_time=session_time,
+            status='scheduled' if session_date >= today else 'completed',
+        ))
+    Session.objects.bulk_create(sessions)
+
+
+class RouteQueryCountTests(TestCase):
+    """Every named route must issue a bounded, data-independent number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.plan = SubscriptionPlan.objects.create(
+            name='Premium', description='All features', price=Decimal('49.99'), duration_days=30,
+            trainer_support=True, premium_content=True, workout_videos=True, meal_plans=True,
+            live_sessions=True, personal_sessions=True, nutrition_guidance=True,
+        )
+        cls.staff = User.objects.create_superuser('admin', 'admin@example.com', 'test-password-123')
+
+        cls.trainer = create_trainers(1)[0]
+        cls.customer = Customer.objects.select_related('subscription').get(pk=create_customers(1, cls.plan)[0].pk)
+        TrainerAssignment.objects.create(customer=cls.customer, trainer=cls.trainer)
+
+        cls.category = ResourceCategory.objects.create(name='Workouts')
+        cls.resource = Resource.objects.create(
+            title='Starter plan', description='PDF', resource_type='link',
+            external_url='https://example.com/plan.pdf', category=cls.category,
+        )
+        cls.upload = ResourceUpload.objects.create(
+            token='test-upload', resource=cls.resource, filename='plan.mp4', size=1024, created_by=cls.staff,
+        )
+        cls.series = SessionSeries.objects.create(
+            customer=cls.customer, trainer=cls.trainer, start_date=timezone.localdate() + timedelta(days=400),
+            session_time=dt_time(7, 0), frequency='weekly', occurrences=2,
+        )
+
+        cls.slots = SlotCounter()
+        cls.grow(SMALL_SCALE)
+
+    @classmethod
+    def grow(cls, scale):
+        """Add scale rows per list to the primary customer and scale new clients to the trainer"""
+        add_customer_activity(cls.customer, cls.trainer, scale, cls.slots)
+
+        clients = create_customers(scale, cls.plan)
+        TrainerAssignment.objects.bulk_create([
+            TrainerAssignment(customer=client, trainer=cls.trainer) for client in clients
+        ])
+        for client in Customer.objects.filter(pk__in=[c.pk for c in clients]).select_related('subscription'):
+            add_customer_activity(client, cls.trainer, 1, cls.slots)
+
+        create_trainers(max(1, scale // 10))
+        Resource.objects.bulk_create([
+            Resource(
+                title=f'Resource {i}', description='Video', resource_type='link',
+                external_url=f'https://example.com/{i}', category=cls.category, is_premium=bool(i % 2),
+            )
+            for i in range(scale)
+        ])
+
+    def build_kwargs(self, name, keys):
+        values = {
+            'plan_id': self.plan.pk,
+            'subscription_id': self.customer.subscription.pk,
+            'trainer_id': self.trainer.pk,
+            'customer_id': self.customer.pk,
+            'client_id': self.customer.pk,
+            'resource_id': self.resource.pk,
+            'session_id': Session.objects.filter(customer=self.customer).values_list('pk', flat=True).first(),
+            'series_id': self.series.pk,
+            'kind': 'payments',
+            'uidb64': 'MQ',
+            'token': {
+                'calendar_feed': lambda: get_calendar_token(self.trainer.profile.user),
+                'resource_upload_detail': lambda: self.upload.token,
+                'resource_upload_complete': lambda: self.upload.token,
+            }.get(name, lambda: 'set-password')(),
+        }
+        return {key: values[key] for key in keys}
+
+    def routes(self):
+        routes = []
+        for pattern in accounts_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name or pattern.name in SKIPPED_ROUTES:
+                continue
+            prefix = str(pattern.pattern)
+            if pattern.name in STAFF_ROUTES:
+                actor = 'staff'
+            elif prefix.startswith(('customer/', 'api/customer/')):
+                actor = 'customer'
+            elif prefix.startswith(('trainer/', 'api/trainer/')):
+                actor = 'trainer'
+            else:
+                actor = 'anonymous'
+            kwargs = self.build_kwargs(pattern.name, pattern.pattern.converters.keys())
+            url = reverse(pattern.name, kwargs=kwargs)
+            if pattern.name in ROUTE_QUERIES:
+                url = f'{url}?{ROUTE_QUERIES[pattern.name]}'
+            routes.append(Route(pattern.name, url, actor))
+
+        routes.append(Route('home', reverse('home'), 'anonymous'))
+        for name, keys in ADMIN_ROUTES.items():
+            routes.append(Route(name, reverse(name, kwargs=self.build_kwargs(name, keys)), 'staff'))
+        return routes
+
+    def make_clients(self):
+        # Errors come back as 500 responses and are checked against EXPECTED_STATUS
+        clients = {'anonymous': self.client_class(raise_request_exception=False)}
+        for actor, user in (
+            ('customer', self.customer.profile.user),
+            ('trainer', self.trainer.profile.user),
+            ('staff', self.staff),
+        ):
+            clients[actor] = self.client_class(raise_request_exception=False)
+            clients[actor].force_login(user)
+        return clients
+
+    def measure(self, routes):
+        """Query count and captured SQL per route; each request is rolled back"""
+        cache.clear()
+        clients = self.make_clients()
+        results = {}
+        for route in routes:
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as ctx:
+                    response = clients[route.actor].get(route.url)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                transaction.set_rollback(True)
+            results[route.name] = (len(ctx), [q['sql'] for q in ctx.captured_queries], response.status_code)
+        return results
+
+    @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, PROFILING_ENABLED=False)
+    def test_query_counts_do_not_grow_with_data(self):
+        routes = self.routes()
+        small = self.measure(routes)
+        type(self).grow(LARGE_SCALE - SMALL_SCALE)
+        large = self.measure(routes)
+
+        failures = []
+        for route in routes:
+            small_count, _, _ = small[route.name]
+            large_count, large_sql, status = large[route.name]
+            expected_status = EXPECTED_STATUS.get(route.name, 200)
+            if status != expected_status or small[route.name][2] != expected_status:
+                failures.append(
+                    f"{route.name} [{route.actor}] {route.url} -> HTTP {small[route.name][2]}/{status}, "
+                    f"expected {expected_status}"
+                )
+                continue
+            ceiling = QUERY_CEILINGS.get(route.name, DEFAULT_QUERY_CEILING)
+            if large_count > small_count or large_count > ceiling:
+                repeated = Counter(query_signature(sql) for sql in large_sql).most_common(1)
+                hint = f"\n      most repeated (x{repeated[0][1]}): {repeated[0][0][:200]}" if repeated else ''
+                failures.append(
+                    f"{route.name} [{route.actor}] {route.url} -> HTTP {status}: "
+                    f"{small_count} queries at {SMALL_SCALE} rows, {large_count} at {LARGE_SCALE} "
+                    f"(ceiling {ceiling}){hint}"
+                )
+
+        self.assertFalse(failures, "Query counts grow with data (N+1) or exceed ceilings:\n  " + "\n  ".join(failures))
+
+    def test_every_named_route_is_covered(self):
+        names = {route.name for route in self.routes()}
+        declared = {
+            p.name for p in accounts_urls.urlpatterns
+            if isinstance(p, URLPattern) and p.name and p.name not in SKIPPED_ROUTES
+        }
+        self.assertEqual(declared - names, set())
+
+
+class ResourceSearchTests(TestCase):
+    """Ranking, facets, premium filtering and incremental indexing of the resource search API"""
+
+    backend = None
+
+    @classmethod
+    def setUpClass(cls):
+        if cls.backend:
+            cls.enterClassContext(override_settings(RESOURCE_SEARCH_BACKEND=cls.backend))
+        search.get_backend.cache_clear()
+        cls.addClassCleanup(search.get_backend.cache_clear)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.free_plan = SubscriptionPlan.objects.create(
+            name='Basic', description='Basics', price=Decimal('9.99'), duration_days=30,
+        )
+        cls.premium_plan = SubscriptionPlan.objects.create(
+            name='Premium', description='Everything', price=Decimal('49.99'), duration_days=30,
+            premium_content=True,
+        )
+        cls.free_customer, cls.premium_customer = (
+            create_customers(1, cls.free_plan)[0], create_customers(1, cls.premium_plan)[0],
+        )
+        cls.strength = ResourceCategory.objects.create(name='Kettlebell')
+        cls.mobility = ResourceCategory.objects.create(name='Mobility')
+        # Same text lengths, so only the field the term appears in decides the rank
+        cls.in_title = Resource.objects.create(
+            title='Kettlebell swing', description='Hip hinge drill', resource_type='link',
+            external_url='https://example.com/1', category=cls.mobility,
+        )
+        cls.in_category = Resource.objects.create(
+            title='Morning flowing', description='Hip hinge drill', resource_type='link',
+            external_url='https://example.com/2', category=cls.strength,
+        )
+        cls.in_description = Resource.objects.create(
+            title='Evening routine', description='Kettlebell hinge', resource_type='link',
+            external_url='https://example.com/3', category=cls.mobility,
+        )
+        cls.premium = Resource.objects.create(
+            title='Kettlebell complex', description='Advanced', resource_type='link',
+            external_url='https://example.com/4', category=cls.strength, is_premium=True,
+        )
+
+    def search_as(self, customer, **params):
+        self.client.force_login(customer.profile.user)
+        response = self.client.get(reverse('api_resource_search'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_title_matches_rank_above_category_and_description(self):
+        data = self.search_as(self.free_customer, q='kettlebell')
+        self.assertEqual(
+            [result['id'] for result in data['results']],
+            [self.in_title.pk, self.in_category.pk, self.in_description.pk],
+        )
+
+    def test_facets_count_matches_per_category(self):
+        data = self.search_as(self.premium_customer, q='kettlebell')
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(
+            {facet['name']: facet['count'] for facet in data['facets']},
+            {'Kettlebell': 2, 'Mobility': 2},
+        )
+
+        narrowed = self.search_as(self.premium_customer, q='kettlebell', category=self.strength.pk)
+        self.assertEqual(narrowed['total'], 2)
+        self.assertEqual({result['id'] for result in narrowed['results']}, {self.in_category.pk, self.premium.pk})
+        # Facets ignore the selected category so the other counts stay visible
+        self.assertEqual(len(narrowed['facets']), 2)
+
+    def test_premium_resources_are_hidden_from_free_plans(self):
+        free = self.search_as(self.free_customer, q='complex')
+        self.assertEqual((free['total'], free['results']), (0, []))
+
+        premium = self.search_as(self.premium_customer, q='complex')
+        self.assertEqual([result['id'] for result in premium['results']], [self.premium.pk])
+
+        # ?premium=1 cannot widen what a free plan may see
+        widened = self.search_as(self.free_customer, q='kettlebell', premium='1')
+        self.assertNotIn(self.premium.pk, [result['id'] for result in widened['results']])
+
+    def test_saves_and_deletes_update_the_index(self):
+        resource = Resource.objects.create(
+            title='Sandbag carry', description='Loaded carry', resource_type='link',
+            external_url='https://example.com/5', category=self.strength,
+        )
+        self.assertEqual(search.search_resources('sandbag').total, 1)
+
+        resource.title = 'Farmer walk'
+        resource.save()
+        self.assertEqual(search.search_resources('sandbag').total, 0)
+        self.assertEqual(search.search_resources('farmer').resources, [resource])
+
+        # Renaming a category reindexes its resources
+        self.mobility.name = 'Stretching'
+        self.mobility.save()
+        self.assertEqual(search.search_resources('stretching').total, 2)
+
+        resource.delete()
+        self.assertEqual(search.search_resources('farmer').total, 0)
+
+    def test_last_term_matches_as_a_prefix(self):
+        self.assertEqual(search.search_resources('kettle', include_premium=False).total, 3)
+
+    def test_missing_query_is_rejected(self):
+        self.client.force_login(self.free_customer.profile.user)
+        self.assertEqual(self.client.get(reverse('api_resource_search')).status_code, 400)
+
+
+class DatabaseResourceSearchTests(ResourceSearchTests):
+    """The same contract on the portable ORM backend"""
+
+    backend = 'accounts.search.DatabaseSearchBackend'
+
+
+def create_customer(username, plan=None, first_name='', last_name='', email=None):
+    """One customer created through save(), so signals index them like a real signup"""
+    user = User.objects.create(
+        username=username, email=email or f'{username}@example.com', password=PASSWORD_HASH,
+        first_name=first_name, last_name=last_name,
+    )
+    profile = Profile.objects.create(user=user, phone='+921234567890', role='customer')
+    customer = Customer.objects.create(profile=profile)
+    if plan is not None:
+        now = timezone.now()
+        CustomerSubscription.objects.create(
+            customer=customer, plan=plan, start_date=now, end_date=now + timedelta(days=plan.duration_days),
+        )
+    return customer
+
+
+def message_texts(response):
+    return [str(message) for message in get_messages(response.wsgi_request)]
+
+
+class TempMediaMixin:
+    """Give each test its own MEDIA_ROOT"""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.media_root = media_root
+
+
+class SessionSeriesTests(TestCase):
+    """Recurring sessions are created in bulk and skip slots that are already booked"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.trainer = create_trainers(1)[0]
+        cls.customer = create_customer('series_client')
+        TrainerAssignment.objects.create(customer=cls.customer, trainer=cls.trainer)
+        cls.start = timezone.localdate() + timedelta(days=30)
+
+    def setUp(self):
+        self.client.force_login(self.trainer.profile.user)
+
+    def schedule(self, **extra):
+        return self.client.post(reverse('trainer_schedule'), {
+            'customer_id': self.customer.pk, 'session_date': self.start.isoformat(), 'session_time': '09:00',
+            'session_type': 'personal', 'duration_minutes': 45, 'repeat': 'weekly', 'occurrences': 3, **extra,
+        })
+
+    def book(self, session_date):
+        return Session.objects.create(
+            customer=self.customer, trainer=self.trainer, session_date=session_date, session_time=dt_time(9, 0),
+        )
+
+    def test_weekly_series_creates_one_session_per_week(self):
+        self.assertRedirects(self.schedule(), reverse('trainer_schedule'), fetch_redirect_response=False)
+
+        series = SessionSeries.objects.get()
+        self.assertEqual(
+            list(series.sessions.order_by('session_date').values_list('session_date', 'duration_minutes')),
+            [(self.start + timedelta(weeks=i), 45) for i in range(3)],
+        )
+        self.assertEqual(Notification.objects.filter(customer=self.customer).count(), 1)
+
+    def test_booked_dates_are_skipped(self):
+        self.book(self.start + timedelta(weeks=1))
+        response = self.schedule()
+
+        dates = SessionSeries.objects.get().sessions.values_list('session_date', flat=True)
+        self.assertEqual(sorted(dates), [self.start, self.start + timedelta(weeks=2)])
+        self.assertIn(
+            f"Skipped conflicting dates: {(self.start + timedelta(weeks=1)).isoformat()}", message_texts(response),
+        )
+
+    def test_series_with_every_date_booked_is_not_created(self):
+        self.book(self.start)
+        response = self.schedule(occurrences=1)
+
+        self.assertFalse(SessionSeries.objects.exists())
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertTrue(any(text.startswith("No sessions were scheduled") for text in message_texts(response)))
+
+    def test_too_many_occurrences_are_rejected(self):
+        self.schedule(occurrences=SessionSeries.MAX_OCCURRENCES + 1)
+        self.assertFalse(SessionSeries.objects.exists())
+
+    def test_cancelling_a_series_cancels_its_upcoming_sessions(self):
+        self.schedule()
+        series = SessionSeries.objects.get()
+        self.client.post(reverse('cancel_session_series', args=[series.pk]))
+
+        series.refresh_from_db()
+        self.assertFalse(series.is_active)
+        self.assertEqual(set(series.sessions.values_list('status', flat=True)), {'cancelled'})
+
+
+class CalendarFeedTests(TestCase):
+    """ICS feeds list the owner's sessions and answer 304 while nothing changed"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.trainer = create_trainers(1)[0]
+        cls.customer = create_customer('calendar_client', first_name='Cal', last_name='Endar')
+        cls.session = Session.objects.create(
+            customer=cls.customer, trainer=cls.trainer, session_date=timezone.localdate() + timedelta(days=2),
+            session_time=dt_time(10, 0), notes='Bring water; and a towel',
+        )
+        cls.url = reverse('calendar_feed', args=[get_calendar_token(cls.trainer.profile.user)])
+
+    def setUp(self):
+        cache.clear()
+
+    def fetch(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body.decode()
+
+    def test_feed_lists_the_owners_sessions(self):
+        response, body = self.fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        self.assertIn(f'UID:session-{self.session.pk}@', body)
+        self.assertIn('SUMMARY:Personal Training with Cal Endar', body)
+        self.assertIn('DESCRIPTION:Bring water\; and a towel', body)
+
+    def test_bad_token_is_not_found(self):
+        self.assertEqual(self.client.get(reverse('calendar_feed', args=['1.forged'])).status_code, 404)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_unchanged_feed_answers_304_until_a_session_changes(self):
+        first, _ = self.fetch()
+        etag = first['ETag']
+        self.assertEqual(self.fetch(If_None_Match=etag)[0].status_code, 304)
+
+        added = Session.objects.create(
+            customer=self.customer, trainer=self.trainer, session_date=timezone.localdate() + timedelta(days=3),
+            session_time=dt_time(10, 0),
+        )
+        response, body = self.fetch(If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'UID:session-{added.pk}@', body)
+
+    def test_feed_has_no_validators_without_a_shared_cache(self):
+        response, _ = self.fetch()
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+
+class ExportTests(TestCase):
+    """CSV exports are ordered by id and resume after the last received row"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Basic', description='Basics', price=Decimal('9.99'), duration_days=30)
+        cls.customer = create_customer('export_client', plan=plan)
+        cls.other = create_customer('export_other', plan=plan)
+        cls.payments = [
+            Payment.objects.create(
+                customer=customer, subscription=customer.subscription, amount=Decimal('9.99'),
+                payment_method='card', status='completed', transaction_id=f'EXP{i}',
+            )
+            for i, customer in enumerate([cls.customer, cls.customer, cls.other, cls.customer])
+        ]
+
+    def export(self, **params):
+        self.client.force_login(self.customer.profile.user)
+        response = self.client.get(reverse('customer_payments_export'), params)
+        self.assertEqual(response.status_code, 200)
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_customer_export_lists_only_their_payments(self):
+        rows = self.export()
+        self.assertEqual(rows[0][:2], ['id', 'transaction_id'])
+        self.assertEqual([row[1] for row in rows[1:]], ['EXP0', 'EXP1', 'EXP3'])
+
+    def test_resumed_export_skips_the_header_and_received_rows(self):
+        rows = self.export(after=self.payments[1].pk)
+        self.assertEqual([row[1] for row in rows], ['EXP3'])
+
+    def test_invalid_resume_id_is_ignored(self):
+        self.assertEqual(len(self.export(after='abc')), 3)
+
+    def test_staff_export_rejects_unknown_kinds(self):
+        self.client.force_login(User.objects.create_superuser('export_admin', 'export_admin@example.com', 'x'))
+        self.assertEqual(self.client.get(reverse('admin_export', args=['users'])).status_code, 404)
+
+
+class InvoiceTests(TempMediaMixin, TestCase):
+    """Invoices are rendered once per content and served as PDF"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plan = SubscriptionPlan.objects.create(name='Basic', description='Basics', price=Decimal('9.99'), duration_days=30)
+        cls.customer = create_customer('invoice_client', plan=plan)
+        cls.payment = Payment.objects.create(
+            customer=cls.customer, subscription=cls.customer.subscription, amount=Decimal('9.99'),
+            payment_method='card', status='completed', transaction_id='INV1',
+        )
+        cls.url = reverse('download_invoice', args=[cls.customer.subscription.pk])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.customer.profile.user)
+
+    def test_invoice_is_rendered_once_and_reused(self):
+        with mock.patch('accounts.invoices.render_invoice_pdf', wraps=invoices.render_invoice_pdf) as render:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url, {'payment': self.payment.pk})
+
+        self.assertEqual(render.call_count, 1)
+        for response in (first, second):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'application/pdf')
+            self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_changed_payment_gets_a_new_invoice(self):
+        first = invoices.get_or_create_invoice(self.payment)
+        self.payment.status = 'refunded'
+        self.assertNotEqual(invoices.get_or_create_invoice(self.payment), first)
+
+    def test_unknown_payment_redirects_with_an_error(self):
+        for payment in ('999999', 'abc'):
+            response = self.client.get(self.url, {'payment': payment})
+            self.assertRedirects(response, reverse('subscription_details'), fetch_redirect_response=False)
+
+
+class CoalescingSessionStoreTests(TestCase):
+    """Saving unchanged session data does not rewrite the database row"""
+
+    def setUp(self):
+        cache.clear()
+        self.store = SessionStore()
+        self.store['cart'] = [1]
+        self.store.save(must_create=True)
+
+    def reload(self):
+        store = SessionStore(self.store.session_key)
+        store.load()
+        return store
+
+    def test_unchanged_save_skips_the_database(self):
+        store = self.reload()
+        with self.assertNumQueries(0):
+            store.save()
+
+    def test_changed_save_writes_the_row(self):
+        store = self.reload()
+        store['cart'] = [1, 2]
+        store.save()
+        cache.clear()
+        self.assertEqual(self.reload()['cart'], [1, 2])
+
+    @override_settings(SESSION_DB_WRITE_INTERVAL=0)
+    def test_unchanged_save_writes_when_no_interval_is_set(self):
+        store = self.reload()
+        with CaptureQueriesContext(connection) as ctx:
+            store.save()
+        self.assertTrue(ctx.captured_queries)
+
+
+@override_settings(RATE_LIMITS={
+    'login': {'ip': (10, 60), 'account': (2, 60)},
+    'check_email': {'ip': (100, 60), 'account': (2, 60)},
+})
+class RateLimitTests(TestCase):
+    """Login and email checks are throttled per account and per client address"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_customer('limited')
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, password='wrong-password', username='limited'):
+        return self.client.post(reverse('login'), {'username': username, 'password': password})
+
+    def test_account_is_locked_after_too_many_failures(self):
+        for _ in range(2):
+            self.assertFalse(self.login().has_header('Retry-After'))
+
+        blocked = self.login(password='test-password-123')
+        self.assertRedirects(blocked, reverse('login'), fetch_redirect_response=False)
+        self.assertTrue(int(blocked['Retry-After']) > 0)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_account_limit_ignores_case_and_whitespace(self):
+        self.login(username='Limited')
+        self.login(username=' limited ')
+        self.assertTrue(self.login().has_header('Retry-After'))
+
+    def test_successful_login_resets_the_account_counter(self):
+        self.login()
+        self.assertRedirects(
+            self.login(password='test-password-123'), reverse('customer_dashboard'), fetch_redirect_response=False,
+        )
+        self.client.logout()
+        for _ in range(2):
+            self.assertFalse(self.login().has_header('Retry-After'))
+
+    @override_settings(RATE_LIMITS={'login': {'ip': (3, 60)}})
+    def test_address_limit_spans_accounts(self):
+        for i in range(3):
+            self.assertFalse(self.login(username=f'guess{i}').has_header('Retry-After'))
+        self.assertTrue(self.login(username='guess3').has_header('Retry-After'))
+        # Another client address is not affected
+        other = self.client_class(REMOTE_ADDR='10.0.0.2')
+        self.assertFalse(other.post(reverse('login'), {'username': 'x', 'password': 'y'}).has_header('Retry-After'))
+
+    def test_email_checks_are_limited_per_address(self):
+        url = reverse('check_email_availability')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, {'email': 'probe@example.com'}).status_code, 200)
+
+        blocked = self.client.get(url, {'email': 'probe@example.com'})
+        self.assertEqual(blocked.status_code, 429)
+        self.assertIn('retry_after', blocked.json())
+        self.assertEqual(self.client.get(url, {'email': 'other@example.com'}).status_code, 200)
+
+
+@override_settings(RATE_LIMITS={})
+class OTPSignupTests(TestCase):
+    """Signups wait in PendingSignup until the emailed OTP is confirmed"""
+
+    def setUp(self):
+        cache.clear()
+        response = self.client.post(reverse('signup_customer'), {
+            'username': 'newbie', 'email': 'newbie@example.com',
+            'password': 'Str0ng-pass!', 'phone': '+921234567890',
+        })
+        self.assertRedirects(response, reverse('verify_otp'), fetch_redirect_response=False)
+        self.otp = self.last_otp()
+
+    def last_otp(self):
+        return re.search(r'\d{6}', mail.outbox[-1].body).group()
+
+    def verify(self, otp):
+        return self.client.post(reverse('verify_otp'), {'otp': otp})
+
+    def test_signup_is_kept_out_of_the_session(self):
+        pending = PendingSignup.objects.get()
+        self.assertEqual(self.client.cookies[otp_store.SIGNUP_COOKIE].value, pending.token)
+        self.assertNotIn(self.otp, pending.otp_digest)
+        self.assertNotEqual(pending.data['password'], 'Str0ng-pass!')
+        self.assertFalse(any('otp' in key.lower() for key in self.client.session.keys()))
+
+    def test_correct_otp_creates_the_account(self):
+        response = self.verify(self.otp)
+
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        user = User.objects.get(username='newbie')
+        self.assertTrue(user.check_password('Str0ng-pass!'))
+        self.assertTrue(Customer.objects.filter(profile__user=user).exists())
+        self.assertFalse(PendingSignup.objects.exists())
+
+    def test_wrong_otps_lock_the_signup(self):
+        for _ in range(otp_store.MAX_OTP_ATTEMPTS):
+            response = self.verify('000000')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context['invalid_otp'])
+
+        response = self.verify(self.otp)
+        self.assertRedirects(response, reverse('select_signup'), fetch_redirect_response=False)
+        self.assertFalse(PendingSignup.objects.exists())
+        self.assertFalse(User.objects.filter(username='newbie').exists())
+
+    def test_expired_otp_is_rejected(self):
+        PendingSignup.objects.update(otp_expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.verify(self.otp)
+        self.assertRedirects(response, reverse('verify_otp'), fetch_redirect_response=False)
+        self.assertFalse(User.objects.filter(username='newbie').exists())
+
+    def test_resend_replaces_the_otp_and_resets_attempts(self):
+        self.verify('000000')
+        self.client.post(reverse('resend_otp'))
+        new_otp = self.last_otp()
+
+        self.assertEqual(PendingSignup.objects.get().attempts, 0)
+        if new_otp != self.otp:
+            self.assertTrue(self.verify(self.otp).context['invalid_otp'])
+        self.assertRedirects(self.verify(new_otp), reverse('login'), fetch_redirect_response=False)
+
+    def test_expired_signup_starts_over(self):
+        PendingSignup.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertRedirects(self.verify(self.otp), reverse('select_signup'), fetch_redirect_response=False)
+
+
+@override_settings(SHARED_CACHE=True)
+class MembershipFilterTests(TestCase):
+    """The availability filter never answers "not registered" for a taken name"""
+
+    def setUp(self):
+        cache.clear()
+        self.reset_filter()
+        self.addCleanup(self.reset_filter)
+
+    @staticmethod
+    def reset_filter():
+        membership._filter = membership._generation = None
+
+    def create_user(self, username):
+        with self.captureOnCommitCallbacks(execute=True):
+            return User.objects.create(username=username, email=f'{username}@example.com', password=PASSWORD_HASH)
+
+    def test_registered_names_may_exist_and_new_ones_do_not(self):
+        self.create_user('taken')
+        self.assertTrue(membership.might_exist('username', 'taken'))
+        self.assertTrue(membership.might_exist('email', 'TAKEN@example.com'))
+        self.assertFalse(membership.might_exist('username', 'free'))
+
+    def test_other_processes_catch_up_without_rebuilding(self):
+        self.create_user('first')
+        membership.might_exist('username', 'first')
+        # Another process' filter, built before the next signup
+        stale = (copy.deepcopy(membership._filter), membership._generation)
+
+        self.create_user('second')
+        membership._filter, membership._generation = stale
+        with mock.patch.object(membership, '_build', wraps=membership._build) as build:
+            self.assertTrue(membership.might_exist('username', 'second'))
+        build.assert_not_called()
+
+    def test_missing_catch_up_items_trigger_a_rebuild(self):
+        self.create_user('first')
+        membership.might_exist('username', 'first')
+        stale = (copy.deepcopy(membership._filter), membership._generation)
+        self.create_user('second')
+        cache.delete_many([membership.ADDED_KEY.format(g) for g in range(stale[1] + 1, stale[1] + 10)])
+
+        membership._filter, membership._generation = stale
+        self.assertTrue(membership.might_exist('username', 'second'))
+
+    def test_login_updates_publish_nothing(self):
+        user = self.create_user('returning')
+        membership.might_exist('username', 'returning')
+        generation = cache.get(membership.GENERATION_KEY)
+
+        user.last_login = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=['last_login'])
+        self.assertEqual(cache.get(membership.GENERATION_KEY), generation)
+
+    def test_email_check_endpoint(self):
+        self.create_user('known')
+        url = reverse('check_email_availability')
+        self.assertFalse(self.client.get(url, {'email': 'known@example.com'}).json()['available'])
+        self.assertTrue(self.client.get(url, {'email': 'unknown@example.com'}).json()['available'])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_without_a_shared_cache_everything_may_exist(self):
+        self.assertTrue(membership.might_exist('email', 'anyone@example.com'))
+
+
+class ClientSearchTests(TestCase):
+    """Client search matches every query word as a prefix of a name, username or email part"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.trainer = create_trainers(1)[0]
+        cls.alice = create_customer('alice_w', first_name='Alice', last_name='Émile', email='a.smith@example.com')
+        cls.alina = create_customer('alina', first_name='Alina', last_name='Stone')
+        cls.bob = create_customer('bobby', first_name='Bob', last_name='Alden')
+        TrainerAssignment.objects.create(customer=cls.alice, trainer=cls.trainer)
+
+    def search(self, query):
+        return set(client_search.filter_customers(Customer.objects.all(), query))
+
+    def test_words_match_by_prefix(self):
+        self.assertEqual(self.search('ali'), {self.alice, self.alina})
+        self.assertEqual(self.search('ali emi'), {self.alice})
+        self.assertEqual(self.search('smith'), {self.alice})
+        self.assertEqual(self.search('ald'), {self.bob})
+        self.assertEqual(self.search('lice'), set())
+
+    def test_accents_and_case_are_ignored(self):
+        self.assertEqual(self.search('ÉMILE'), {self.alice})
+
+    def test_renamed_users_are_reindexed(self):
+        user = self.alina.profile.user
+        user.last_name = 'Rivers'
+        user.save()
+        self.assertEqual(self.search('riv'), {self.alina})
+        self.assertEqual(self.search('stone'), set())
+
+    def test_trainers_only_find_their_own_clients(self):
+        self.client.force_login(self.trainer.profile.user)
+        response = self.client.get(reverse('client_search'), {'q': 'ali'})
+        self.assertEqual([result['id'] for result in response.json()['results']], [self.alice.pk])
+
+
+class EntitlementTests(TestCase):
+    """Premium access follows the customer's current plan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.free_plan = SubscriptionPlan.objects.create(name='Basic', description='Basics', price=Decimal('9.99'), duration_days=30)
+        cls.premium_plan = SubscriptionPlan.objects.create(
+            name='Premium', description='Everything', price=Decimal('49.99'), duration_days=30,
+            premium_content=True,
+        )
+        cls.customer = create_customer('entitled', plan=cls.free_plan)
+        cls.resource = Resource.objects.create(
+            title='Premium plan', description='PDF', resource_type='link',
+            external_url='https://example.com/premium.pdf', is_premium=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def download(self):
+        self.client.force_login(self.customer.profile.user)
+        return self.client.get(reverse('download_resource', args=[self.resource.pk]))
+
+    @override_settings(SHARED_CACHE=True)
+    def test_upgrading_the_subscription_grants_access(self):
+        self.assertRedirects(self.download(), reverse('resources_downloads'), fetch_redirect_response=False)
+
+        subscription = CustomerSubscription.objects.get(customer=self.customer)
+        subscription.plan = self.premium_plan
+        subscription.save()
+        self.assertRedirects(self.download(), self.resource.external_url, fetch_redirect_response=False)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_cached_entitlements_follow_plan_changes(self):
+        self.assertFalse(entitlements.get_entitlements(self.customer).premium_content)
+        with self.assertNumQueries(0):
+            self.assertTrue(entitlements.get_entitlements(self.customer).active)
+
+        self.free_plan.premium_content = True
+        self.free_plan.save()
+        self.assertTrue(entitlements.get_entitlements(self.customer).premium_content)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_deactivated_subscription_loses_access(self):
+        self.assertTrue(entitlements.get_entitlements(self.customer).active)
+        CustomerSubscription.objects.filter(customer=self.customer).get().delete()
+        self.assertFalse(entitlements.get_entitlements(self.customer).active)
+
+    def test_without_a_shared_cache_every_lookup_queries(self):
+        entitlements.get_entitlements(self.customer)
+        with self.assertNumQueries(1):
+            self.assertFalse(entitlements.get_entitlements(self.customer).premium_content)
+
+
+class ChunkedUploadTests(TempMediaMixin, TestCase):
+    """Chunked uploads resume from the stored offset and publish only verified files"""
+
+    DATA = b'0123456789' * 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser('uploader', 'uploader@example.com', 'test-password-123')
+        cls.category = ResourceCategory.objects.create(name='Videos')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.staff)
+
+    def start(self, data=DATA, **fields):
+        fields = {
+            'filename': 'squat.mp4', 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest(),
+            'title': 'Squat form', 'category': self.category.pk, **fields,
+        }
+        return self.client.post(reverse('resource_upload_start'), fields)
+
+    def put(self, upload, chunk, offset, **headers):
+        return self.client.put(
+            upload['url'], chunk, content_type='application/octet-stream',
+            headers={'Upload-Offset': str(offset), **headers},
+        )
+
+    def upload_all(self, data=DATA, **fields):
+        upload = self.start(data, **fields).json()
+        for offset in range(0, len(data), 16):
+            self.assertEqual(self.put(upload, data[offset:offset + 16], offset).status_code, 200)
+        return upload
+
+    def test_upload_resumes_and_publishes_the_resource(self):
+        upload = self.start().json()
+        self.assertEqual(self.put(upload, self.DATA[:10], 0).json()['offset'], 10)
+        # A client that lost the connection asks where to carry on
+        self.assertEqual(self.client.get(upload['url']).json()['offset'], 10)
+        self.put(upload, self.DATA[10:], 10)
+
+        response = self.client.post(upload['complete_url'])
+        self.assertEqual(response.status_code, 200)
+        resource = Resource.objects.get(pk=response.json()['resource_id'])
+        self.assertEqual((resource.title, resource.category), ('Squat form', self.category))
+        with resource.file.open('rb') as published:
+            self.assertEqual(published.read(), self.DATA)
+        self.assertFalse(ResourceUpload.objects.exists())
+
+    def test_chunk_at_the_wrong_offset_reports_the_expected_one(self):
+        upload = self.start().json()
+        response = self.put(upload, self.DATA[5:10], 5)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 0)
+
+    def test_chunk_with_a_bad_checksum_is_discarded(self):
+        upload = self.start().json()
+        response = self.put(upload, self.DATA[:10], 0, **{'Upload-Chunk-SHA256': '0' * 64})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(upload['url']).json()['offset'], 0)
+
+    def test_file_checksum_mismatch_resets_the_upload(self):
+        upload = self.upload_all(sha256=hashlib.sha256(b'other').hexdigest())
+        self.assertEqual(self.client.post(upload['complete_url']).status_code, 422)
+        self.assertEqual(self.client.get(upload['url']).json()['offset'], 0)
+        self.assertFalse(Resource.objects.exists())
+
+    def test_incomplete_upload_cannot_be_finished(self):
+        upload = self.start().json()
+        self.put(upload, self.DATA[:10], 0)
+        self.assertEqual(self.client.post(upload['complete_url']).status_code, 409)
+
+    def test_invalid_metadata_is_rejected_before_any_data(self):
+        for fields in ({'category': 99999}, {'title': 'x' * 201}, {'title': ''}, {'size': 0}):
+            self.assertEqual(self.start(**fields).status_code, 400, fields)
+        self.assertFalse(ResourceUpload.objects.exists())
+
+    def test_same_filename_uploads_keep_both_files(self):
+        first, second = self.upload_all(), self.upload_all(self.DATA[::-1])
+        names = [self.client.post(upload['complete_url']).json()['file'] for upload in (first, second)]
+        self.assertNotEqual(names[0], names[1])
+        contents = [Resource.objects.get(file=name).file.read() for name in names]
+        self.assertEqual(contents, [self.DATA, self.DATA[::-1]])
+
+    def test_uploads_are_staff_only(self):
+        self.client.force_login(create_customer('not_staff').profile.user)
+        self.assertEqual(self.start().status_code, 302)
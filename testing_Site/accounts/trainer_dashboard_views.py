@@ -7,36 +7,28 @@ from django.http import JsonResponse, Http404
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
 from django.utils import timezone
-from django.db.models import Q, Count, Avg, Sum
+from django.db.models import Count, Avg, Sum
 from django.views.decorators.csrf import csrf_exempt
+from django.db import transaction
 import json
 from datetime import datetime, timedelta, date
 
 from .models import (
     Trainer, Customer, TrainerAssignment, Session, TrainerMessage,
     WorkoutProgress, Goal, Notification, Profile, User, Resource,
-    CustomerSubscription, Payment
+    CustomerSubscription, Payment, SessionSeries
 )
+from .calendar_views import get_calendar_feed_url
+from . import client_search
+from .roles import get_role
+from .search_views import search_from_request
 
 def get_trainer_or_redirect(user):
     """Helper function to get trainer or return redirect response"""
-    try:
-        if not hasattr(user, 'profile'):
-            return None, redirect('login')
-        
-        if user.profile.role != 'trainer':
-            return None, redirect('login')
-        
-        if not hasattr(user.profile, 'trainer'):
-            return None, redirect('login')
-        
-        trainer = user.profile.trainer
-        if not trainer.is_verified:
-            return None, redirect('login')
-        
-        return trainer, None
-    except Exception:
+    role = get_role(user)
+    if not role.is_verified_trainer:
         return None, redirect('login')
+    return role.trainer, None
 
 @login_required
 def trainer_dashboard(request):
@@ -55,15 +47,7 @@ def trainer_dashboard(request):
         
         # Calculate dashboard statistics
         total_clients = assigned_customers.count()
-        active_subscriptions = 0
-        
-        # Count active subscriptions safely
-        for assignment in assigned_customers:
-            try:
-                if hasattr(assignment.customer, 'subscription') and assignment.customer.subscription.is_active:
-                    active_subscriptions += 1
-            except:
-                continue
+        active_subscriptions = assigned_customers.filter(customer__subscription__is_active=True).count()
         
         # Session statistics
         today = timezone.now().date()
@@ -89,7 +73,7 @@ def trainer_dashboard(request):
             trainer=trainer,
             session_date__gte=today,
             status__in=['scheduled', 'confirmed']
-        ).order_by('session_date', 'session_time')[:5]
+        ).select_related('customer__profile__user').order_by('session_date', 'session_time')[:5]
         
         # Recent messages and notifications
         recent_messages = TrainerMessage.objects.filter(
@@ -152,31 +136,19 @@ def trainer_clients(request):
         trainer=trainer,
         is_active=True
     ).select_related(
-        'customer__profile__user'
+        'customer__profile__user', 'customer__subscription'
     ).prefetch_related(
         'customer__sessions',
         'customer__progress'
-    )
+    ).order_by('-assigned_date', '-id')
     
-    # Apply search filter
+    # Apply search filter (prefix match on indexed name/email terms)
     if search_query:
-        assignments = assignments.filter(
-            Q(customer__profile__user__first_name__icontains=search_query) |
-            Q(customer__profile__user__last_name__icontains=search_query) |
-            Q(customer__profile__user__email__icontains=search_query) |
-            Q(customer__profile__user__username__icontains=search_query)
-        )
+        assignments = client_search.filter_customers(assignments, search_query, customer_field='customer')
     
     # Calculate statistics
     total_clients = assignments.count()
-    active_subscriptions = 0
-    
-    for assignment in assignments:
-        try:
-            if hasattr(assignment.customer, 'subscription') and assignment.customer.subscription.is_active:
-                active_subscriptions += 1
-        except:
-            continue
+    active_subscriptions = assignments.filter(customer__subscription__is_active=True).count()
     
     # Pagination
     paginator = Paginator(assignments, 9)  # 9 clients per page
@@ -380,6 +352,46 @@ def trainer_schedule(request):
             parsed_date = datetime.strptime(session_date, '%Y-%m-%d').date()
             parsed_time = datetime.strptime(session_time, '%H:%M').time()
             
+            # Recurring series are validated and created in bulk
+            repeat = request.POST.get('repeat', '')
+            if repeat in SessionSeries.FREQUENCY_DAYS:
+                occurrences = int(request.POST.get('occurrences', 1))
+                if occurrences < 1 or occurrences > SessionSeries.MAX_OCCURRENCES:
+                    messages.error(request, f"Occurrences must be between 1 and {SessionSeries.MAX_OCCURRENCES}.")
+                    return redirect('trainer_schedule')
+                
+                with transaction.atomic():
+                    series = SessionSeries.objects.create(
+                        trainer=trainer,
+                        customer=customer,
+                        start_date=parsed_date,
+                        session_time=parsed_time,
+                        frequency=repeat,
+                        occurrences=occurrences,
+                        duration_minutes=duration_minutes,
+                        session_type=session_type,
+                        notes=notes
+                    )
+                    created, skipped = series.materialize()
+                    if not created:
+                        # Nothing to schedule: don't keep an empty active series
+                        transaction.set_rollback(True)
+                
+                if not created:
+                    messages.error(
+                        request,
+                        "No sessions were scheduled: every date conflicts with an existing booking ("
+                        + ", ".join(d.strftime('%Y-%m-%d') for d in skipped) + ")."
+                    )
+                    return redirect('trainer_schedule')
+                messages.success(request, f"Scheduled {len(created)} recurring sessions successfully!")
+                if skipped:
+                    messages.warning(
+                        request,
+                        "Skipped conflicting dates: " + ", ".join(d.strftime('%Y-%m-%d') for d in skipped)
+                    )
+                return redirect('trainer_schedule')
+            
             # Check for conflicting sessions
             existing_session = Session.objects.filter(
                 trainer=trainer,
@@ -436,10 +448,19 @@ def trainer_schedule(request):
         session_date__gte=today
     ).select_related('customer__profile__user').order_by('session_date', 'session_time')
     
+    active_series = SessionSeries.objects.filter(
+        trainer=trainer,
+        is_active=True
+    ).select_related('customer__profile__user')
+    
     context = {
         'trainer': trainer,
         'assigned_customers': assigned_customers,
         'upcoming_sessions': upcoming_sessions,
+        'upcoming_count': upcoming_sessions.count(),
+        'active_series': active_series,
+        'calendar_feed_url': get_calendar_feed_url(request, request.user),
+        'frequency_choices': SessionSeries.FREQUENCY_CHOICES,
         'today': today,
         'tomorrow': tomorrow,
     }
@@ -555,11 +576,17 @@ def trainer_resources(request):
         return redirect_response
     
     # Get available resources
-    resources = Resource.objects.filter(is_active=True).order_by('-created_at')
+    search = search_from_request(request, include_premium=True)
+    if search is not None:
+        resources = search.resources
+    else:
+        resources = Resource.objects.filter(is_active=True).select_related('category').order_by('-created_at')
     
     context = {
         'trainer': trainer,
         'resources': resources,
+        'search': search,
+        'query': request.GET.get('q', '').strip(),
     }
     
     return render(request, 'accounts/dashboard/trainer_resources.html', context)
@@ -659,6 +686,50 @@ def trainer_profile(request):
     
     return render(request, 'accounts/dashboard/trainer_profile.html', context)
 
+@login_required
+@require_http_methods(["POST"])
+def update_session_series(request, series_id):
+    """Update duration, type or notes for all upcoming sessions in a series"""
+    trainer, redirect_response = get_trainer_or_redirect(request.user)
+    if redirect_response:
+        return redirect_response
+    
+    series = get_object_or_404(SessionSeries, id=series_id, trainer=trainer, is_active=True)
+    
+    fields = {}
+    try:
+        if request.POST.get('duration_minutes'):
+            fields['duration_minutes'] = int(request.POST.get('duration_minutes'))
+        if request.POST.get('session_type'):
+            fields['session_type'] = request.POST.get('session_type')
+        if 'notes' in request.POST:
+            fields['notes'] = request.POST.get('notes', '')
+    except ValueError:
+        messages.error(request, "Invalid duration.")
+        return redirect('trainer_schedule')
+    
+    with transaction.atomic():
+        updated = series.update_upcoming(**fields)
+    
+    messages.success(request, f"Updated {updated} upcoming sessions in the series.")
+    return redirect('trainer_schedule')
+
+@login_required
+@require_http_methods(["POST"])
+def cancel_session_series(request, series_id):
+    """Cancel all upcoming sessions in a series"""
+    trainer, redirect_response = get_trainer_or_redirect(request.user)
+    if redirect_response:
+        return redirect_response
+    
+    series = get_object_or_404(SessionSeries, id=series_id, trainer=trainer, is_active=True)
+    
+    with transaction.atomic():
+        cancelled = series.cancel_series()
+    
+    messages.success(request, f"Cancelled {cancelled} upcoming sessions in the series.")
+    return redirect('trainer_schedule')
+
 # AJAX/API endpoints
 
 @login_required
@@ -750,4 +821,36 @@ def trainer_dashboard_updates(request):
         })
         
     except Exception as e:
-        return JsonResponse({'error': str(e)})
\ No newline at end of file
+        return JsonResponse({'error': str(e)})
+
+
+@login_required
+def client_search_api(request):
+    """Top matching clients for typeahead: a trainer's own clients, or all customers for staff"""
+    query = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', client_search.TOP_K)), 1), 50)
+    except ValueError:
+        limit = client_search.TOP_K
+
+    if request.user.is_staff:
+        customers = Customer.objects.all()
+    else:
+        trainer, redirect_response = get_trainer_or_redirect(request.user)
+        if redirect_response:
+            return JsonResponse({'error': 'Trainer access required'}, status=403)
+        customers = Customer.objects.filter(trainer_assignment__trainer=trainer, trainer_assignment__is_active=True)
+
+    matches = client_search.top_matches(customers, query, limit)
+    return JsonResponse({
+        'query': query,
+        'results': [
+            {
+                'id': customer.pk,
+                'name': customer.profile.user.get_full_name() or customer.profile.user.username,
+                'username': customer.profile.user.username,
+                'email': customer.profile.user.email,
+            }
+            for customer in matches
+        ],
+    })
@@ -0,0 +1,108 @@
+# upload_views.py - Staff API for chunked, resumable Resource file uploads
+#
+#   POST   api/uploads/                    start: filename, size, sha256 (optional) and
+#                                          resource=<id> or title/description/resource_type/
+#                                          category/is_premium for a new resource
+#   GET    api/uploads/<token>/            current offset, to resume after a failure
+#   PUT    api/uploads/<token>/            raw chunk body; Upload-Offset header, optional
+#                                          Upload-Chunk-SHA256 header
+#   DELETE api/uploads/<token>/            cancel
+#   POST   api/uploads/<token>/complete/   verify the checksum and publish the Resource
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from . import uploads
+from .models import Resource, ResourceUpload
+
+
+def _error(exc):
+    payload = {'error': str(exc)}
+    if isinstance(exc, uploads.OffsetMismatch):
+        payload['offset'] = exc.expected
+    return JsonResponse(payload, status=exc.status)
+
+
+def _status(upload):
+    return {
+        'upload_id': upload.token,
+        'filename': upload.filename,
+        'size': upload.size,
+        'offset': upload.received,
+        'chunk_size': uploads.chunk_size(),
+        'url': reverse('resource_upload_detail', args=[upload.token]),
+        'complete_url': reverse('resource_upload_complete', args=[upload.token]),
+    }
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@staff_member_required
+@require_http_methods(["POST"])
+def resource_upload_start(request):
+    resource = None
+    if request.POST.get('resource'):
+        resource = get_object_or_404(Resource, pk=_int(request.POST['resource']))
+    metadata = {
+        'title': request.POST.get('title', '').strip(),
+        'description': request.POST.get('description', '').strip(),
+        'resource_type': request.POST.get('resource_type') or 'video',
+        'category_id': _int(request.POST.get('category')),
+        'is_premium': request.POST.get('is_premium') in ('1', 'true', 'on'),
+    }
+    try:
+        upload = uploads.start(
+            request.POST.get('filename'), _int(request.POST.get('size')) or 0,
+            sha256=request.POST.get('sha256', ''), user=request.user,
+            resource=resource, metadata=None if resource else metadata,
+        )
+    except uploads.UploadError as exc:
+        return _error(exc)
+    return JsonResponse(_status(upload), status=201)
+
+
+@staff_member_required
+@require_http_methods(["GET", "HEAD", "PUT", "DELETE"])
+def resource_upload_detail(request, token):
+    upload = get_object_or_404(ResourceUpload, token=token)
+    if request.method == 'DELETE':
+        uploads.discard(upload)
+        return JsonResponse({'deleted': True})
+    if request.method == 'PUT':
+        offset = _int(request.headers.get('Upload-Offset'))
+        if offset is None:
+            return JsonResponse({'error': 'Missing Upload-Offset header', 'offset': upload.received}, status=400)
+        try:
+            # request is read as a stream; request.body would buffer the whole chunk
+            uploads.write_chunk(
+                upload, offset, request, _int(request.META.get('CONTENT_LENGTH')) or 0,
+                chunk_sha256=request.headers.get('Upload-Chunk-SHA256', ''),
+            )
+        except uploads.UploadError as exc:
+            return _error(exc)
+    return JsonResponse(_status(upload))
+
+
+@staff_member_required
+@require_http_methods(["POST"])
+def resource_upload_complete(request, token):
+    upload = get_object_or_404(ResourceUpload, token=token)
+    try:
+        resource = uploads.finish(upload)
+    except uploads.UploadError as exc:
+        return _error(exc)
+    return JsonResponse({
+        'resource_id': resource.pk,
+        'title': resource.title,
+        'file': resource.file.name,
+        'sha256': upload.sha256,
+        'admin_url': reverse('admin:accounts_resource_change', args=[resource.pk]),
+    })
@@ -0,0 +1,259 @@
+# uploads.py - Chunked, resumable uploads of large Resource files
+#
+# start() records the expected size (and optionally the SHA-256) of a file.
+# Chunks are then written at explicit offsets into
+# MEDIA_ROOT/resources/.partial/<token>.part, streamed from the request body
+# one block at a time so a worker's memory stays flat whatever the file size.
+# A client that loses its connection asks for the current offset and carries
+# on from there. finish() re-hashes the assembled file from disk, moves it
+# into MEDIA_ROOT/resources with os.replace (same filesystem, so the file
+# appears whole or not at all) and creates or updates the Resource in the
+# same transaction. Needs the FileSystemStorage default storage. Abandoned
+# uploads are removed by `manage.py purge_stale_uploads`.
+
+import hashlib
+import os
+import re
+import secrets
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Resource, ResourceCategory, ResourceUpload
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, the offset check still applies
+    fcntl = None
+
+BLOCK_SIZE = 1024 * 1024
+PARTIAL_DIR = os.path.join('resources', '.partial')
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_SIZE = 20 * 1024 ** 3
+DEFAULT_EXPIRY = 60 * 60 * 24
+
+RESOURCE_FIELDS = ('title', 'description', 'resource_type', 'category_id', 'is_premium')
+
+
+class UploadError(Exception):
+    """Rejected upload request; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class OffsetMismatch(UploadError):
+    """Chunk sent for the wrong offset; the client should resume from expected"""
+
+    def __init__(self, expected):
+        super().__init__(f"Expected offset {expected}", status=409)
+        self.expected = expected
+
+
+def chunk_size():
+    return getattr(settings, 'RESOURCE_UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def max_size():
+    return getattr(settings, 'RESOURCE_UPLOAD_MAX_SIZE', DEFAULT_MAX_SIZE)
+
+
+def partial_path(upload):
+    return os.path.join(settings.MEDIA_ROOT, PARTIAL_DIR, f'{upload.token}.part')
+
+
+@contextmanager
+def _locked(path, mode):
+    """Open the partial file with an exclusive lock; busy uploads answer 409"""
+    try:
+        handle = open(path, mode)
+    except FileNotFoundError:
+        raise UploadError("Upload data is missing; start a new upload", status=410)
+    with handle:
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError("Another request is writing this upload", status=409)
+        yield handle
+
+
+def _normalize_digest(value):
+    value = (value or '').strip().lower()
+    if value and not SHA256_RE.match(value):
+        raise UploadError("sha256 must be 64 hexadecimal characters")
+    return value
+
+
+def start(filename, size, sha256='', user=None, resource=None, metadata=None):
+    """Create an upload for a new Resource (metadata) or to replace resource's file"""
+    filename = os.path.basename((filename or '').replace('\\', '/')).strip()
+    if not filename:
+        raise UploadError("filename is required")
+    if len(filename) > ResourceUpload._meta.get_field('filename').max_length:
+        raise UploadError("filename is too long")
+    if not 0 < size <= max_size():
+        raise UploadError(f"size must be between 1 and {max_size()} bytes")
+    metadata = {key: value for key, value in (metadata or {}).items() if key in RESOURCE_FIELDS}
+    if resource is None:
+        # Checked up front: a bad value would otherwise only fail in finish()
+        if not metadata.get('title'):
+            raise UploadError("title is required for a new resource")
+        if len(metadata['title']) > Resource._meta.get_field('title').max_length:
+            raise UploadError("title is too long")
+        if metadata.get('resource_type', 'video') not in dict(Resource.RESOURCE_TYPE):
+            raise UploadError("Unknown resource_type")
+        category_id = metadata.get('category_id')
+        if category_id is not None and not ResourceCategory.objects.filter(pk=category_id, is_active=True).exists():
+            raise UploadError("Unknown category")
+
+    upload = ResourceUpload.objects.create(
+        token=secrets.token_urlsafe(32), resource=resource, metadata=metadata, filename=filename,
+        size=size, sha256=_normalize_digest(sha256), created_by=user,
+    )
+    path = partial_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def write_chunk(upload, offset, stream, length, chunk_sha256=''):
+    """Append length bytes read from stream at offset; returns the new offset.
+
+    The stream is copied BLOCK_SIZE bytes at a time. A chunk that arrives
+    short or fails its optional checksum is cut off again, so the client
+    simply resends it.
+    """
+    if offset != upload.received:
+        raise OffsetMismatch(upload.received)
+    if not 0 < length <= chunk_size():
+        raise UploadError(f"Chunks must be between 1 and {chunk_size()} bytes")
+    if offset + length > upload.size:
+        raise UploadError("Chunk runs past the declared size")
+    chunk_sha256 = _normalize_digest(chunk_sha256)
+
+    digest = hashlib.sha256()
+    with _locked(partial_path(upload), 'r+b') as part:
+        # Drops whatever an interrupted request left after the last good chunk
+        part.seek(offset)
+        part.truncate()
+        remaining = length
+        while remaining:
+            block = stream.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            part.write(block)
+            digest.update(block)
+            remaining -= len(block)
+        if remaining or (chunk_sha256 and digest.hexdigest() != chunk_sha256):
+            part.truncate(offset)
+            raise UploadError("Chunk checksum mismatch" if not remaining else "Chunk ended early")
+        part.flush()
+        os.fsync(part.fileno())
+
+        updated = ResourceUpload.objects.filter(pk=upload.pk, received=offset).update(
+            received=offset + length, updated_at=timezone.now(),
+        )
+        if not updated:
+            part.truncate(offset)
+            raise OffsetMismatch(ResourceUpload.objects.filter(pk=upload.pk).values_list('received', flat=True).first())
+    upload.received = offset + length
+    return upload.received
+
+
+def _file_digest(handle):
+    digest = hashlib.sha256()
+    handle.seek(0)
+    for block in iter(lambda: handle.read(BLOCK_SIZE), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def _reserve_name(upload):
+    """Pick a free name under resources/ and create it empty; returns (name, path).
+
+    get_available_name() alone only checks that nothing exists yet, so two
+    uploads of the same filename finishing together could both be given the
+    same name. Creating the file with O_EXCL claims it; os.replace() then
+    swaps the real content in.
+    """
+    max_length = Resource._meta.get_field('file').max_length
+    base = os.path.join('resources', default_storage.get_valid_name(upload.filename))
+    while True:
+        name = default_storage.get_available_name(base, max_length=max_length)
+        path = default_storage.path(name)
+        try:
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            continue
+        return name, path
+
+
+def finish(upload):
+    """Verify the assembled file and publish it as the Resource's file; returns the Resource"""
+    if upload.received != upload.size:
+        raise UploadError(f"Upload incomplete: {upload.received} of {upload.size} bytes", status=409)
+
+    source = partial_path(upload)
+    with _locked(source, 'r+b') as part:
+        sha256 = _file_digest(part)
+        if upload.sha256 and sha256 != upload.sha256:
+            # No way to tell which chunk is bad: start over from byte 0
+            part.truncate(0)
+            ResourceUpload.objects.filter(pk=upload.pk).update(received=0, updated_at=timezone.now())
+            raise UploadError("Checksum mismatch; the upload was reset", status=422)
+
+        name, target = _reserve_name(upload)
+        moved = False
+        try:
+            with transaction.atomic():
+                locked = ResourceUpload.objects.select_for_update().filter(pk=upload.pk).first()
+                if locked is None:
+                    raise UploadError("Upload already finished", status=404)
+                resource = locked.resource or Resource(**{
+                    'resource_type': 'video', 'description': '', **locked.metadata,
+                })
+                previous = resource.file.name if resource.pk else None
+                resource.file.name = name
+                resource.save()
+                locked.delete()
+                # Last step, so a failed move rolls the rows back with it
+                os.replace(source, target)
+                moved = True
+                if previous and previous != name:
+                    transaction.on_commit(lambda: default_storage.delete(previous), robust=True)
+        except BaseException:
+            if moved:
+                os.replace(target, source)
+            else:
+                os.remove(target)
+            raise
+    upload.sha256 = sha256
+    return resource
+
+
+def discard(upload):
+    """Cancel an upload and delete its partial file"""
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def purge_stale(expiry=None):
+    """Discard uploads untouched for RESOURCE_UPLOAD_EXPIRY seconds; returns the count"""
+    expiry = expiry or getattr(settings, 'RESOURCE_UPLOAD_EXPIRY', DEFAULT_EXPIRY)
+    stale = ResourceUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(seconds=expiry))
+    count = 0
+    for upload in stale.iterator():
+        discard(upload)
+        count += 1
+    return count
@@ -3,6 +3,11 @@ from . import views
 from django.contrib.auth import views as auth_views
 from . import dashboard_views
 from . import trainer_dashboard_views
+from . import calendar_views
+from . import export_views
+from . import profiling_views
+from . import search_views
+from . import upload_views
 
 urlpatterns = [
     # Trainer registration (existing)
@@ -14,6 +19,13 @@ urlpatterns = [
     
     # Admin utilities (existing)
     path('api/pending-count/', views.pending_registrations_count, name='pending_registrations_count'),
+    path('api/exports/<str:kind>/', export_views.admin_export, name='admin_export'),
+    path('api/profiling/', profiling_views.profiling_report_api, name='profiling_report_api'),
+    path('admin-tools/profiling/', profiling_views.profiling_report, name='profiling_report'),
+    path('admin-tools/profiling/reset/', profiling_views.profiling_reset, name='profiling_reset'),
+    path('api/uploads/', upload_views.resource_upload_start, name='resource_upload_start'),
+    path('api/uploads/<str:token>/', upload_views.resource_upload_detail, name='resource_upload_detail'),
+    path('api/uploads/<str:token>/complete/', upload_views.resource_upload_complete, name='resource_upload_complete'),
 
     # Customer and Trainer Signup (existing)
     path("sign-up/customer/", views.signup_customer, name="signup_customer"),
@@ -48,6 +60,7 @@ urlpatterns = [
     path('customer/subscription/cancel/', dashboard_views.cancel_subscription, name='cancel_subscription'),
     path('customer/subscription/invoice/<int:subscription_id>/', dashboard_views.download_invoice, name='download_invoice'),
     path('customer/payments/', dashboard_views.payment_history, name='payment_history'),
+    path('customer/payments/export/', export_views.customer_payments_export, name='customer_payments_export'),
     path('customer/trainer/', dashboard_views.trainer_info, name='trainer_info'),
     path('customer/trainer/rate/<int:trainer_id>/', dashboard_views.rate_trainer, name='rate_trainer'),
     path('customer/trainer/schedule-session/', dashboard_views.schedule_session, name='schedule_session'),
@@ -57,21 +70,27 @@ urlpatterns = [
     path('customer/goals/', dashboard_views.goals_management, name='goals_management'),
     path('customer/resources/', dashboard_views.resources_downloads, name='resources_downloads'),
     path('customer/resources/download/<int:resource_id>/', dashboard_views.download_resource, name='download_resource'),
+    path('api/customer/resources/', dashboard_views.api_resources, name='api_resources'),
     path('customer/notifications/', dashboard_views.notifications_list, name='notifications_list'),
     # FIXED: Separate customer messages URL
     path('customer/messages/', dashboard_views.trainer_messages, name='customer_messages'),
     path('api/customer/notifications-count/', dashboard_views.api_notifications_count, name='api_notifications_count'),
     path('api/customer/subscription-status/', dashboard_views.api_subscription_status, name='api_subscription_status'),
+    path('api/resources/search/', search_views.api_resource_search, name='api_resource_search'),
 
     # TRAINER DASHBOARD URLs - Fixed URL names to avoid conflicts
     path('trainer/dashboard/', trainer_dashboard_views.trainer_dashboard, name='trainer_dashboard'),
     path('trainer/clients/', trainer_dashboard_views.trainer_clients, name='trainer_clients'),
     path('trainer/clients/<int:client_id>/', trainer_dashboard_views.trainer_client_detail, name='trainer_client_detail'),
+    path('api/trainer/clients/search/', trainer_dashboard_views.client_search_api, name='client_search'),
     path('trainer/clients/<int:client_id>/progress/', trainer_dashboard_views.view_client_progress, name='view_client_progress'),
     path('trainer/sessions/', trainer_dashboard_views.trainer_sessions, name='trainer_sessions'),
+    path('trainer/sessions/export/', export_views.trainer_sessions_export, name='trainer_sessions_export'),
     path('trainer/schedule/', trainer_dashboard_views.trainer_schedule, name='trainer_schedule'),
     path('trainer/sessions/<int:session_id>/update-status/', trainer_dashboard_views.update_session_status, name='update_session_status'),
     path('trainer/sessions/<int:session_id>/add-notes/', trainer_dashboard_views.add_session_notes, name='add_session_notes'),
+    path('trainer/series/<int:series_id>/update/', trainer_dashboard_views.update_session_series, name='update_session_series'),
+    path('trainer/series/<int:series_id>/cancel/', trainer_dashboard_views.cancel_session_series, name='cancel_session_series'),
     # FIXED: Trainer messages with different URL
     path('trainer/messages/', trainer_dashboard_views.trainer_messages, name='trainer_messages'),
     path('trainer/progress/', trainer_dashboard_views.trainer_progress, name='trainer_progress'),
@@ -79,4 +98,7 @@ urlpatterns = [
     path('trainer/reports/', trainer_dashboard_views.trainer_reports, name='trainer_reports'),
     path('trainer/profile/', trainer_dashboard_views.trainer_profile, name='trainer_profile'),
     path('api/trainer/dashboard-updates/', trainer_dashboard_views.trainer_dashboard_updates, name='trainer_dashboard_updates'),
+
+    # Calendar feeds
+    path('calendar/<str:token>/sessions.ics', calendar_views.calendar_feed, name='calendar_feed'),
 ]
@@ -3,11 +3,8 @@ from django.contrib.auth import authenticate, login, logout
 from .forms import CustomerSignupForm, TrainerSignupForm
 from .models import Trainer, Profile, Customer
 from django.contrib.auth.models import User
-import random
 
 # views.py
-import random, datetime
-from django.utils import timezone
 from django.core.mail import send_mail
 from django.contrib import messages
 
@@ -20,6 +17,10 @@ from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 import re
 from .models import TrainerRegistration
+from . import membership, otp_store
+from .page_cache import anonymous_page_cache
+from .ratelimit import rate_limit, reset as reset_rate_limit
+from .roles import get_role
 
 from . import trainer_dashboard_views
 
@@ -92,9 +93,10 @@ def trainer_signup(request):
                 username=username,
                 phone=phone,
                 address=address,
-                password=password,  # Will be hashed in the model's save method
                 status='pending'
             )
+            # Hashed once here; approval copies the hash onto the new User
+            trainer_registration.set_password(password)
             trainer_registration.save()
             
             messages.success(
@@ -129,13 +131,18 @@ def trainer_signup(request):
     return render(request, 'signup_trainer.html')
 
 
+@rate_limit('check_email', account=lambda request: request.GET.get('email', ''), methods=('GET',))
 def check_email_availability(request):
     """AJAX endpoint to check if email is available"""
     if request.method == 'GET':
         email = request.GET.get('email', '').strip().lower()
         
         if email:
-            exists = TrainerRegistration.objects.filter(email=email).exists()
+            # Most typed addresses are new: the filter answers those without a query
+            exists = membership.might_exist('email', email) and (
+                User.objects.filter(email__iexact=email).exists()
+                or TrainerRegistration.objects.filter(email=email).exists()
+            )
             return JsonResponse({
                 'available': not exists,
                 'message': 'Email is already registered' if exists else 'Email is available'
@@ -149,6 +156,7 @@ def check_email_availability(request):
     return JsonResponse({'error': 'Invalid request method'})
 
 
+@rate_limit('registration_status', account=lambda request: request.POST.get('email', ''))
 def registration_status(request):
     """Check registration status by email"""
     if request.method == 'POST':
@@ -192,34 +200,32 @@ def home(request):
     return render(request, 'index.html')
 
 
+def _send_signup_otp(request, data):
+    """Store the signup outside the session and email its OTP"""
+    pending, otp = otp_store.start_signup(data)
+    send_mail(
+        "Your OTP Code",
+        f"Your OTP is {otp}",
+        "noreply@yourdomain.com",
+        [data['email']],
+        fail_silently=False
+    )
+    messages.success(request, f"OTP sent to your email ({data['email']}).Your OTP is: {otp}")
+    return otp_store.set_signup_cookie(redirect("verify_otp"), pending)
+
+
 def signup_customer(request):
     if request.method == 'POST':
         form = CustomerSignupForm(request.POST)
         if form.is_valid():
             data = form.cleaned_data
-            # Save data in session instead of creating user
-            request.session['signup_data'] = {
+            return _send_signup_otp(request, {
                 'username': data['username'],
                 'email': data['email'],
                 'password': data['password'],
                 'phone': data['phone'],
                 'role': 'customer',
-            }
-
-            otp = str(random.randint(100000, 999999))
-            request.session['otp'] = otp
-            request.session['otp_expiry'] = (timezone.now() + datetime.timedelta(minutes=5)).isoformat()
-            request.session['otp_attempts'] = 0
-
-            send_mail(
-                "Your OTP Code",
-                f"Your OTP is {otp}",
-                "noreply@yourdomain.com",
-                [data['email']],
-                fail_silently=False
-            )
-            messages.success(request, f"OTP sent to your email ({data['email']}).Your OTP is: {otp}")
-            return redirect("verify_otp")
+            })
 
     else:
         form = CustomerSignupForm()
@@ -231,72 +237,57 @@ def signup_trainer(request):
         form = TrainerSignupForm(request.POST)
         if form.is_valid():
             data = form.cleaned_data
-            request.session['signup_data'] = {
+            return _send_signup_otp(request, {
                 'username': data['username'],
                 'email': data['email'],
                 'password': data['password'],
                 'phone': data['phone'],
                 'address': data['address'],
                 'role': 'trainer',
-            }
-
-            otp = str(random.randint(100000, 999999))
-            request.session['otp'] = otp
-            request.session['otp_expiry'] = (timezone.now() + datetime.timedelta(minutes=5)).isoformat()
-            request.session['otp_attempts'] = 0
-
-            send_mail(
-                "Your OTP Code",
-                f"Your OTP is {otp}",
-                "noreply@yourdomain.com",
-                [data['email']],
-                fail_silently=False
-            )
-            messages.success(request, f"OTP sent to your email ({data['email']}).Your OTP is: {otp}")
-            return redirect("verify_otp")
+            })
 
     else:
         form = TrainerSignupForm()
     return render(request, 'accounts/signup_trainer.html', {'form': form})
 
 
+@rate_limit('verify_otp', account=otp_store.get_signup_token, redirect_to='verify_otp')
 def verify_otp(request):
-    data = request.session.get("signup_data")
-    stored_otp = request.session.get("otp")
-    expiry_str = request.session.get("otp_expiry")
-    attempts = request.session.get("otp_attempts", 0)
-
-    if not data or not stored_otp or not expiry_str:
+    pending = otp_store.get_pending(request)
+    if pending is None:
         messages.error(request, "Session expired. Please sign up again.")
         return redirect("select_signup")
 
-    expiry = datetime.datetime.fromisoformat(expiry_str)
+    data = pending.data
+    expiry_str = pending.otp_expires_at.isoformat()
 
     if request.method == 'POST':
         entered_otp = request.POST.get("otp")
+        result = otp_store.check_otp(pending, entered_otp)
 
-        if timezone.now() > expiry:
+        if result == 'expired':
             messages.error(request, "OTP expired. Please resend OTP.")
             return redirect("verify_otp")
 
-        if attempts >= 5:
+        if result == 'locked':
+            otp_store.finish(pending)
             messages.error(request, "Too many failed attempts. Please start again.")
-            return redirect("select_signup")
+            return otp_store.clear_signup_cookie(redirect("select_signup"))
 
-        if entered_otp == stored_otp:
+        if result == 'ok':
              # Check if username or email already exists
             if User.objects.filter(username=data['username']).exists():
                 messages.error(request, "Username already exists. Please choose another.")
                 return redirect("select_signup")
 
-            if User.objects.filter(email=data['email']).exists():
+            if User.objects.filter(email__iexact=data['email']).exists():
                 messages.error(request, "Email already registered. Please login or use a different one.")
                 return redirect("select_signup")
-            # Create the user and profile
-            user = User.objects.create_user(
-                username=data['username'],
-                email=data['email'],
-                password=data['password']
+            # Create the user and profile; the password was hashed at signup
+            user = User.objects.create(
+                username=User.normalize_username(data['username']),
+                email=User.objects.normalize_email(data['email']),
+                password=data['password'],
             )
             profile = Profile.objects.create(
                 user=user,
@@ -316,13 +307,10 @@ def verify_otp(request):
                 fail_silently=False
             )
 
-            for key in ['signup_data', 'otp', 'otp_expiry', 'otp_attempts']:
-                request.session.pop(key, None)
-
+            otp_store.finish(pending)
             messages.success(request, "Account created successfully. Please login.")
-            return redirect("login")
+            return otp_store.clear_signup_cookie(redirect("login"))
         else:
-            request.session['otp_attempts'] = attempts + 1
             return render(request, "accounts/verify-otp.html", {
                 "invalid_otp": True,
                 "entered_otp": entered_otp,
@@ -336,29 +324,26 @@ def verify_otp(request):
     })
 
 
+@rate_limit('resend_otp', account=otp_store.get_signup_token, methods=None, redirect_to='verify_otp')
 def resend_otp(request):
-    data = request.session.get("signup_data")
-    if not data:
+    pending = otp_store.get_pending(request)
+    if pending is None:
         messages.error(request, "Session expired.")
         return redirect("select_signup")
-    otp = str(random.randint(100000, 999999))
-    expiry = timezone.now() + datetime.timedelta(minutes=5)
-    request.session["otp"] = otp
-    request.session["otp_expiry"] = expiry.isoformat()
-    request.session["otp_attempts"] = 0
+    otp = otp_store.renew_otp(pending)
     send_mail(
         "Your new OTP",
         f"Your OTP is: {otp}",
         "noreply@yourdomain.com",
-        [data["email"]],
+        [pending.email],
         fail_silently=False
     )
-    messages.success(request, f"OTP sent to your email ({data['email']}).")
+    messages.success(request, f"OTP sent to your email ({pending.email}).")
     return redirect("verify_otp")
 
 
 def dashboard(request):
-    role = request.user.profile.role
+    role = get_role(request.user).role
     if role == 'customer':
         return render(request, 'accounts/customer_dashboard.html')
     elif role == 'trainer':
@@ -371,10 +356,13 @@ def logout_view(request):
     return redirect('login')
 
 
+@anonymous_page_cache
 def select_signup(request):
     return render(request, 'accounts/select_signup.html')
 
 
+@anonymous_page_cache
+@rate_limit('login', account=lambda request: request.POST.get('username', ''), redirect_to='login')
 def login_view(request):
     if request.method == "POST":
         username = request.POST.get("username")
@@ -382,18 +370,18 @@ def login_view(request):
 
         user = authenticate(request, username=username, password=password)
         if user is not None:
+            reset_rate_limit('login', 'account', username.strip().lower())
             login(request, user)
-            if hasattr(user, "profile"):
-                role = getattr(user.profile, "role", "")
-                if role == "trainer":
-                    trainer = getattr(user.profile, "trainer", None)
-                    if trainer and not trainer.is_verified:
-                        logout(request)
-                        messages.error(request, "Your account is pending admin approval.")
-                        return redirect("login")
-                    return redirect("trainer_dashboard")
-                elif role == "customer":
-                    return redirect("customer_dashboard")
+            # Resolved once here and kept in the session for later requests
+            role = get_role(user, request.session)
+            if role.role == "trainer":
+                if role.trainer and not role.trainer.is_verified:
+                    logout(request)
+                    messages.error(request, "Your account is pending admin approval.")
+                    return redirect("login")
+                return redirect("trainer_dashboard")
+            elif role.role == "customer":
+                return redirect("customer_dashboard")
             return redirect("/")
         else:
             messages.error(request, "Invalid username or password.")
@@ -1,3 +1,4 @@
+import json
 import os
 
 """
@@ -45,14 +46,61 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Opt-in; removes itself unless PROFILING_ENABLED is set
+    'accounts.profiling.ProfilingMiddleware',
+    # Compresses the final body, so it must wrap everything that sets content
+    'accounts.middleware.ThresholdGZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.PublicPageCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # accounts.middleware.UserVersionETagMiddleware goes here when
+    # SHARED_CACHE is set (see Cache below)
+    'accounts.roles.RoleMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_LENGTH = 1024
+# Browser/proxy lifetime of anonymous pages listed in PUBLIC_CACHE_VIEWS
+PUBLIC_PAGE_MAX_AGE = 300
+# Server-side lifetime of anonymous full-page cache entries (see accounts.page_cache)
+PAGE_CACHE_TIMEOUT = 600
+# Keep the user's role and Customer/Trainer id in the session (see accounts.roles)
+ROLE_SESSION_CACHE = True
+
+# Brute-force throttling (see accounts.ratelimit): scope -> {'ip'|'account': (requests, seconds)}
+# Counters live in the cache, so without SHARED_CACHE each worker counts on
+# its own and a client gets up to `requests` per worker per window.
+RATE_LIMITS = {
+    'login': {'ip': (20, 300), 'account': (5, 300)},
+    'verify_otp': {'ip': (20, 300), 'account': (5, 300)},
+    'resend_otp': {'ip': (10, 3600), 'account': (3, 600)},
+    'check_email': {'ip': (60, 60), 'account': (10, 300)},
+    'registration_status': {'ip': (20, 300), 'account': (10, 300)},
+}
+# Header holding the client address when behind a reverse proxy, e.g. 'HTTP_X_FORWARDED_FOR'
+RATE_LIMIT_IP_HEADER = os.environ.get('RATE_LIMIT_IP_HEADER') or None
+
+# Dotted path of the resource search backend (see accounts.search); None picks
+# SQLite FTS5 when available and the ORM fallback otherwise
+RESOURCE_SEARCH_BACKEND = None
+
+# Per-view query/latency sampling, reported at /accounts/admin-tools/profiling/
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0.05'))
+PROFILING_BUFFER_SIZE = 5000
+
+# Chunked Resource uploads (see accounts.uploads); nginx's client_max_body_size
+# must allow one chunk plus headers
+RESOURCE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+RESOURCE_UPLOAD_MAX_SIZE = 20 * 1024 ** 3
+# Seconds without a new chunk before purge_stale_uploads discards an upload
+RESOURCE_UPLOAD_EXPIRY = 60 * 60 * 24
+
 ROOT_URLCONF = 'testing_Site.urls'
 
 TEMPLATES = [
@@ -84,6 +132,43 @@ DATABASES = {
     }
 }
 
+# Cache
+# Without REDIS_URL each process has its own LocMem cache, which is fine for
+# runserver but cannot be shared by several workers.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+
+# Version stamps, rate-limit counters and other state that every worker must
+# agree on only live in the cache when it is shared.
+SHARED_CACHE = bool(os.environ.get('REDIS_URL'))
+
+if SHARED_CACHE:
+    # Needs request.user and the message storage, and runs before
+    # RoleMiddleware so 304 responses skip the role query. It answers 304 from
+    # the cached version stamps, which a per-process cache would let go stale.
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('accounts.roles.RoleMiddleware'),
+        'accounts.middleware.UserVersionETagMiddleware',
+    )
+
+# Sessions
+# accounts.sessions is cached_db with coalesced writes: reads come from the
+# cache and the row is only rewritten when the data changes. It needs a cache
+# shared by all workers, so plain DB sessions stay the default without one.
+# 'django.contrib.sessions.backends.signed_cookies' needs no storage at all.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE',
+    'accounts.sessions' if os.environ.get('REDIS_URL') else 'django.contrib.sessions.backends.db',
+)
+# With SESSION_SAVE_EVERY_REQUEST, refresh the row's expiry at most this often
+SESSION_DB_WRITE_INTERVAL = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -104,6 +189,29 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing profile (see accounts/hashers.py). The preferred hasher
+# comes first; the others stay listed so existing hashes still verify and are
+# upgraded on the user's next login. Measure PASSWORD_HASHER_PARAMS for this
+# machine with `manage.py tune_password_hasher --budget-ms 100`.
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'scrypt')
+PASSWORD_HASHER_PARAMS = {
+    'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1},
+    'scrypt': {'work_factor': 2 ** 15, 'block_size': 8, 'parallelism': 1, 'maxmem': 64 * 1024 * 1024},
+    'pbkdf2_sha256': {'iterations': 1_000_000},
+}
+PASSWORD_HASHER_PARAMS.update(json.loads(os.environ.get('PASSWORD_HASHER_PARAMS', '{}')))
+_TUNED_HASHERS = {
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'accounts.hashers.TunedScryptPasswordHasher',
+    'pbkdf2': 'accounts.hashers.TunedPBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_TUNED_HASHERS[PASSWORD_HASHER_PROFILE]] + [
+    path for name, path in _TUNED_HASHERS.items() if name != PASSWORD_HASHER_PROFILE
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+# Hashes computed at once; bursts of logins queue instead of oversubscribing the CPU
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', '0')) or None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -132,6 +240,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
+
+# collectstatic writes content-hashed copies plus .gz/.br siblings here
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'accounts.static_assets.CompressedManifestStaticFilesStorage',
+    },
+}
 ## Email Configuration for Fitness Hub
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -142,4 +263,7 @@ EMAIL_HOST_PASSWORD = 'yjtkjjvdlgszobuq'  # Your App Password
 
 # Company Email Settings
 DEFAULT_FROM_EMAIL = 'Fitness Hub <ahadsharafat36@gmail.com>'
-EMAIL_SUBJECT_PREFIX = '[Fitness Hub] '
\ No newline at end of file
+EMAIL_SUBJECT_PREFIX = '[Fitness Hub] '
+
+# Batched notification emails are sent on a background thread after commit
+MAIL_QUEUE_ASYNC = True
@@ -1,17 +1,20 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import render, redirect
+from accounts.page_cache import anonymous_page_cache
 
+
+@anonymous_page_cache
 def smart_home(request):
     if request.user.is_authenticated:
         # Redirect logged-in users to their appropriate dashboard
-        if hasattr(request.user, 'profile'):
-            if request.user.profile.role == 'customer':
-                return redirect('customer_dashboard')
-            elif request.user.profile.role == 'trainer':
-                return redirect('trainer_dashboard')
+        role = request.role.role
+        if role == 'customer':
+            return redirect('customer_dashboard')
+        elif role == 'trainer':
+            return redirect('trainer_dashboard')
         return redirect('customer_dashboard')  # Default fallback
     else:
         # Show landing page for non-logged-in users
@@ -25,4 +28,10 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+else:
+    # Hashed, precompressed static files with immutable caching
+    from accounts.static_views import serve_static
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static),
+    ]
\ No newline at end of file